@@ -4,21 +4,57 @@ Shared versioning logic for document/email extractors.
 ``PDFExtractor`` and ``EmailExtractor`` previously duplicated ~80 lines of
 identical version-management code (folder creation, version numbering,
 diff computation, JSON saving).  This base class centralises that logic.
+
+Version numbers come from each trade's ``VersionManifest``; saving a
+version holds the manifest's lock, so concurrent ingest workers on the
+same trade are serialised.  Versions are stored delta-encoded by
+``VersionHistory``; ``extracted_terms.json`` holds the latest in full.
 """
 
 from __future__ import annotations
 
 import json
 import os
-import shutil
 from datetime import datetime
-from typing import Any, Dict
+from typing import Any, Dict, Iterator, Tuple
 
 from config import get_logger
+from version_history import VersionHistory, content_hash, write_atomic
+from version_manifest import get_manifest
 
 logger = get_logger(__name__)
 
 
+def iter_changes(old: Any, new: Any, path: Tuple[Any, ...] = ()) -> Iterator[Dict[str, Any]]:
+    """Yield the differences between two JSON values, path-addressed.
+
+    Dicts are compared key by key and lists index by index, recursing
+    only into children that differ (``==`` short-circuits in C on equal
+    subtrees).  Each change is ``{"path": [key or index, ...], "type":
+    "added" | "removed" | "modified", "old": ..., "new": ...}`` (only the
+    sides that exist).  A value whose type changes is one modification.
+    """
+    if isinstance(old, dict) and isinstance(new, dict):
+        for key, value in old.items():
+            if key not in new:
+                yield {"path": [*path, key], "type": "removed", "old": value}
+            elif value != new[key]:
+                yield from iter_changes(value, new[key], (*path, key))
+        for key, value in new.items():
+            if key not in old:
+                yield {"path": [*path, key], "type": "added", "new": value}
+    elif isinstance(old, list) and isinstance(new, list):
+        for index, (before, after) in enumerate(zip(old, new)):
+            if before != after:
+                yield from iter_changes(before, after, (*path, index))
+        for index in range(len(new), len(old)):
+            yield {"path": [*path, index], "type": "removed", "old": old[index]}
+        for index in range(len(old), len(new)):
+            yield {"path": [*path, index], "type": "added", "new": new[index]}
+    elif old != new:
+        yield {"path": list(path), "type": "modified", "old": old, "new": new}
+
+
 class BaseVersionedExtractor:
     """Base class providing trade-folder / version management."""
 
@@ -32,18 +68,11 @@ class BaseVersionedExtractor:
 
     def _get_trade_folder(self, trade_id: str) -> str:
         trade_folder = os.path.join(self.metadata_dir, trade_id)
-        if not os.path.exists(trade_folder):
-            os.makedirs(trade_folder)
-            os.makedirs(os.path.join(trade_folder, "versions"))
+        os.makedirs(os.path.join(trade_folder, "versions"), exist_ok=True)
         return trade_folder
 
     def _get_next_version(self, trade_folder: str) -> int:
-        versions_folder = os.path.join(trade_folder, "versions")
-        existing = [f for f in os.listdir(versions_folder) if f.startswith("v")]
-        if not existing:
-            return 1
-        latest = max(int(v.replace("v", "").split("_")[0]) for v in existing)
-        return latest + 1
+        return get_manifest(trade_folder).next_version()
 
     # ------------------------------------------------------------------
     # Diff computation
@@ -56,25 +85,40 @@ class BaseVersionedExtractor:
         version: int,
         timestamp: str,
     ) -> Dict[str, Any]:
-        """Compare *existing_data* to *new_data* and return a diff dict."""
+        """Compare *existing_data* to *new_data* and return a diff dict.
+
+        ``added`` / ``removed`` / ``modified`` are keyed by top-level field
+        (``modified`` holds the whole old and new values).  ``changes``
+        lists the same differences at the deepest level that changed — see
+        ``iter_changes``.  Equal documents and equal subtrees are skipped
+        with one equality check each, allocating nothing.
+        """
         differences: Dict[str, Any] = {
             "version": version,
             "timestamp": timestamp,
             "added": {},
             "removed": {},
             "modified": {},
+            "changes": [],
         }
+        if existing_data == new_data:
+            return differences
 
+        changes = differences["changes"]
         for key, value in existing_data.items():
             if key in new_data:
-                if value != new_data[key]:
-                    differences["modified"][key] = {"old": value, "new": new_data[key]}
+                new_value = new_data[key]
+                if value != new_value:
+                    differences["modified"][key] = {"old": value, "new": new_value}
+                    changes.extend(iter_changes(value, new_value, (key,)))
             else:
                 differences["removed"][key] = value
+                changes.append({"path": [key], "type": "removed", "old": value})
 
         for key, value in new_data.items():
             if key not in existing_data:
                 differences["added"][key] = value
+                changes.append({"path": [key], "type": "added", "new": value})
 
         return differences
 
@@ -103,33 +147,45 @@ class BaseVersionedExtractor:
             File-safe stem used for the version file (no extension).
         """
         trade_folder = self._get_trade_folder(trade_id)
-        current_version = self._get_next_version(trade_folder)
-
-        version_info["version"] = current_version
-        version_info["timestamp"] = datetime.now().isoformat()
-
-        terms_file = os.path.join(trade_folder, "extracted_terms.json")
-        version_file = os.path.join(
-            trade_folder,
-            "versions",
-            f"v{current_version}_{version_filename_stem}.json",
-        )
-        changes_file = os.path.join(trade_folder, "changes.json")
-
-        if os.path.exists(terms_file):
-            with open(terms_file, "r", encoding="utf-8") as fh:
-                existing = json.load(fh)
-
-            diffs = self.compute_differences(
-                existing.get("data", {}),
-                extracted_data,
-                current_version,
-                version_info["timestamp"],
+        manifest = get_manifest(trade_folder)
+        history = VersionHistory(trade_folder, manifest)
+
+        with manifest.locked():
+            latest = manifest.latest()
+            current_version = manifest.next_version()
+            version_info["version"] = current_version
+            version_info["timestamp"] = datetime.now().isoformat()
+
+            terms_file = os.path.join(trade_folder, "extracted_terms.json")
+            data_sha256 = content_hash(extracted_data)
+            updating = os.path.exists(terms_file)
+            diffs = None
+            if updating and latest is not None and latest.get("data_sha256") == data_sha256:
+                # Same content as the latest version: no need to read or walk it.
+                diffs = self.compute_differences(
+                    extracted_data, extracted_data, current_version, version_info["timestamp"],
+                )
+            elif updating:
+                with open(terms_file, "r", encoding="utf-8") as fh:
+                    existing = json.load(fh)
+                if latest is not None and existing.get("version") != latest["version"]:
+                    # The head copy is stale (e.g. a crash before it was written).
+                    existing = history.get(latest["version"])
+                diffs = self.compute_differences(
+                    existing.get("data", {}),
+                    extracted_data,
+                    current_version,
+                    version_info["timestamp"],
+                )
+            history.record(
+                version_info,
+                f"v{current_version}_{version_filename_stem}",
+                diffs,
+                data_sha256=data_sha256,
             )
-            self.save_to_json(diffs, changes_file)
-            self.save_to_json(version_info, version_file)
             self.save_to_json(version_info, terms_file)
 
+        if updating:
             logger.info("Updated to version %d for trade %s", current_version, trade_id)
             return {
                 "status": "updated",
@@ -138,10 +194,6 @@ class BaseVersionedExtractor:
                 "message": f"Updated to version {current_version} for Trade ID: {trade_id}",
             }
 
-        # First version
-        self.save_to_json(version_info, version_file)
-        self.save_to_json(version_info, terms_file)
-
         logger.info("Created version %d for trade %s", current_version, trade_id)
         return {
             "status": "created",
@@ -156,5 +208,4 @@ class BaseVersionedExtractor:
 
     @staticmethod
     def save_to_json(data: Any, output_file: str) -> None:
-        with open(output_file, "w", encoding="utf-8") as fh:
-            json.dump(data, fh, indent=4, ensure_ascii=False)
+        write_atomic(json.dumps(data, indent=4, ensure_ascii=False).encode("utf-8"), output_file)
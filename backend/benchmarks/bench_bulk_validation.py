@@ -0,0 +1,100 @@
+"""
+Benchmark: per-trade ``validate_against_risk_file`` vs. bulk validation.
+
+Writes a synthetic ``interest_risk_swap`` sheet of *rows* reference
+trades, builds *trades* swaps against it (some matching, some with
+mismatched fields, some unknown), checks that the bulk results equal the
+per-trade results, and prints timings.  The risk sheet is read once
+before timing, so both sides use the cached frame.
+
+Run from ``backend/``::
+
+    python -m benchmarks.bench_bulk_validation [--rows 10000] [--trades 10000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from typing import Any, Dict, List
+
+import pandas as pd
+
+from validators import base_validator, reference_data
+from validators.swap_validator import ECONOMIC_FIELDS
+
+SHEET = "interest_risk_swap"
+
+
+def synthetic_sheet(rows: int, seed: int = 7) -> pd.DataFrame:
+    rng = random.Random(seed)
+    data: Dict[str, List[Any]] = {"tradeId": [f"SWAP{i:06d}" for i in range(rows)]}
+    for field in ECONOMIC_FIELDS:
+        data[field] = [rng.choice(["USD", "EUR", "1000000", "0.025", "Quarterly", "ACT/360"]) for _ in range(rows)]
+    return pd.DataFrame(data)
+
+
+def synthetic_swaps(sheet: pd.DataFrame, count: int, seed: int = 11) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    records = sheet.to_dict("records")
+    swaps = []
+    for _ in range(count):
+        if rng.random() < 0.05:
+            swaps.append({"tradeId": f"UNKNOWN{rng.randint(0, 10**6)}"})
+            continue
+        swap = dict(rng.choice(records))
+        if rng.random() < 0.3:
+            swap[rng.choice(ECONOMIC_FIELDS)] = "changed"
+        swaps.append(swap)
+    return swaps
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=10_000, help="reference trades in the risk sheet")
+    parser.add_argument("--trades", type=int, default=10_000, help="swaps to validate")
+    args = parser.parse_args()
+
+    sheet = synthetic_sheet(args.rows)
+    swaps = synthetic_swaps(sheet, args.trades)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        risk_file = os.path.join(tmp, "risk_system.xlsx")
+        sheet.to_excel(risk_file, sheet_name=SHEET, index=False)
+        reference_data._read_risk_sheet(risk_file, SHEET)
+
+        load = base_validator.load_reference_swap
+        base_validator.load_reference_swap = lambda tid, sheet_name: load(tid, risk_file=risk_file, sheet_name=sheet_name)
+        try:
+            start = time.perf_counter()
+            expected = [
+                base_validator.validate_against_risk_file(swap, ECONOMIC_FIELDS, None, SHEET)
+                for swap in swaps
+            ]
+            per_trade = time.perf_counter() - start
+        finally:
+            base_validator.load_reference_swap = load
+
+        start = time.perf_counter()
+        actual = base_validator.validate_batch_against_risk_file(
+            swaps, ECONOMIC_FIELDS, None, SHEET, risk_file=risk_file,
+        )
+        bulk = time.perf_counter() - start
+
+    for (result, status), row in zip(expected, actual):
+        row = dict(row)
+        row.pop("tradeId")
+        if row.pop("status") != status or row != result:
+            raise SystemExit("Output mismatch between per-trade and bulk validation")
+
+    print(f"reference rows: {args.rows:,}  trades: {args.trades:,}")
+    print(f"per-trade loop : {per_trade * 1000:9.2f} ms")
+    print(f"bulk merge     : {bulk * 1000:9.2f} ms")
+    print(f"speedup        : {per_trade / bulk:9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
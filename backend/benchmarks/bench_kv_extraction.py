@@ -0,0 +1,171 @@
+"""
+Benchmark: per-key regex loop vs. ``KeyValueMatcher`` for PDF key-value extraction.
+
+Builds a synthetic multi-page term sheet, runs both the legacy per-page
+extraction (three ``re.search`` calls per key plus ``_clean_pairs`` with
+four ``re.sub`` calls per pair) and the precompiled matcher, checks that
+the outputs are identical, and prints timings.
+
+Run from ``backend/``::
+
+    python -m benchmarks.bench_kv_extraction [--pages 200] [--repeat 5] [--pdf path.pdf]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import re
+import time
+from typing import Dict, List, Tuple
+
+from extraction_schemas import get_matcher, load_schema
+from kv_matcher import KeyValueMatcher
+
+SCHEMA = load_schema("equity_trade")
+SECTIONS = SCHEMA.sections
+KEYS = [key for keys in SECTIONS.values() for key in keys]
+
+
+# ---------------------------------------------------------------------------
+# Legacy implementation (kept verbatim as the reference)
+# ---------------------------------------------------------------------------
+
+def legacy_extract(pages: List[str]) -> Tuple[Dict[str, str], str | None]:
+    all_kv_pairs: Dict[str, str] = {}
+    trade_id = None
+    for text in pages:
+        if not trade_id:
+            match = re.search(r"Trade ID:?\s*(TRADE-[^\s]+)", text)
+            trade_id = match.group(1) if match else None
+            if trade_id:
+                all_kv_pairs["Trade ID"] = trade_id
+
+        for _section, keys in SECTIONS.items():
+            for key in keys:
+                patterns = [
+                    rf"{key}:?\s*([^•\n]+)",
+                    rf"[•]\s*{key}:?\s*([^•\n]+)",
+                    rf"{key}\s*=\s*([^•\n]+)",
+                ]
+                for pattern in patterns:
+                    match = re.search(pattern, text, re.IGNORECASE)
+                    if match:
+                        value = match.group(1).strip()
+                        if value and len(value) > 1:
+                            all_kv_pairs[key] = value
+                            break
+
+        for key, value in re.findall(r"[•]\s*([^:]+):\s*([^•\n]+)", text):
+            key, value = key.strip(), value.strip()
+            if key and value and len(value) > 1 and key not in all_kv_pairs:
+                all_kv_pairs[key] = value
+
+    cleaned: Dict[str, str] = {}
+    for key, value in all_kv_pairs.items():
+        clean_key = re.sub(r"^\d+\.\s*", "", key)
+        clean_key = re.sub(r"^[•]\s*", "", clean_key).strip()
+        clean_value = re.sub(r"\s+", " ", value).strip()
+        clean_value = re.sub(r"\s*\d+\.\s*.*$", "", clean_value)
+        if clean_key and clean_value and len(clean_value) > 1:
+            cleaned[clean_key] = clean_value
+    return cleaned, trade_id
+
+
+def matcher_extract(pages: List[str], matcher: KeyValueMatcher) -> Tuple[Dict[str, str], str | None]:
+    all_kv_pairs: Dict[str, str] = {}
+    trade_id = None
+    for text in pages:
+        if not trade_id:
+            trade_id = matcher.trade_id(text)
+            if trade_id:
+                all_kv_pairs["Trade ID"] = trade_id
+        all_kv_pairs.update(matcher.match_keys(text))
+        for key, value in matcher.bullet_pairs(text):
+            if key and value and len(value) > 1 and key not in all_kv_pairs:
+                all_kv_pairs[key] = value
+    return matcher.clean_pairs(all_kv_pairs), trade_id
+
+
+# ---------------------------------------------------------------------------
+# Synthetic input
+# ---------------------------------------------------------------------------
+
+_FILLER = (
+    "The parties agree that the terms set out below are indicative only and subject "
+    "to final documentation. Payments are made in accordance with the calendar. "
+)
+
+
+def synthetic_pages(count: int, seed: int = 7) -> List[str]:
+    """Return *count* pages mixing known keys, bullets, ``=`` pairs and prose."""
+    rng = random.Random(seed)
+    pages = []
+    for page_no in range(count):
+        lines = []
+        if page_no == 0:
+            lines.append("Trade ID: TRADE-2024-0001")
+        for _ in range(40):
+            roll = rng.random()
+            key = rng.choice(KEYS)
+            if roll < 0.25:
+                lines.append(f"{key}: value {rng.randint(1, 9999)}")
+            elif roll < 0.40:
+                lines.append(f"• {key.lower()}: {rng.choice(['USD', 'EUR', 'x', ''])} {rng.randint(1, 99)}")
+            elif roll < 0.50:
+                lines.append(f"{key} = {rng.randint(10, 99)}.{rng.randint(0, 9)}")
+            elif roll < 0.60:
+                lines.append(f"• Extra Term {rng.randint(1, 30)}: detail {rng.randint(1, 99)}. more")
+            else:
+                lines.append(_FILLER * rng.randint(1, 3))
+        pages.append("\n".join(lines))
+    return pages
+
+
+def pdf_pages(path: str) -> List[str]:
+    import fitz  # PyMuPDF
+
+    with fitz.open(path) as doc:
+        return [page.get_text() for page in doc]
+
+
+# ---------------------------------------------------------------------------
+# Runner
+# ---------------------------------------------------------------------------
+
+def _best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pages", type=int, default=200, help="synthetic page count")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per implementation (best is reported)")
+    parser.add_argument("--pdf", help="benchmark the text of this PDF instead of synthetic pages")
+    args = parser.parse_args()
+
+    pages = pdf_pages(args.pdf) if args.pdf else synthetic_pages(args.pages)
+    matcher = get_matcher(SCHEMA)
+
+    expected = legacy_extract(pages)
+    actual = matcher_extract(pages, matcher)
+    if expected != actual or list(expected[0]) != list(actual[0]):
+        raise SystemExit("Output mismatch between legacy extraction and KeyValueMatcher")
+
+    legacy = _best_of(lambda: legacy_extract(pages), args.repeat)
+    fast = _best_of(lambda: matcher_extract(pages, matcher), args.repeat)
+
+    chars = sum(len(p) for p in pages)
+    print(f"pages: {len(pages)}  chars: {chars:,}  pairs: {len(expected[0])}")
+    print(f"legacy regex loop : {legacy * 1000:9.2f} ms")
+    print(f"KeyValueMatcher   : {fast * 1000:9.2f} ms")
+    print(f"speedup           : {legacy / fast:9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
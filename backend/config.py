@@ -36,6 +36,10 @@ METADATA_DIR = os.getenv("METADATA_DIR", str(BASE_DIR / "metadata"))
 EMAIL_METADATA_DIR = os.getenv("EMAIL_METADATA_DIR", str(BASE_DIR / "email_metadata"))
 DOWNLOAD_DIR = os.getenv("DOWNLOAD_DIR", str(BASE_DIR / "downloads"))
 
+# Trade versions are stored as diffs between full checkpoints taken every
+# this many versions (see version_history.py)
+VERSION_CHECKPOINT_EVERY = int(os.getenv("VERSION_CHECKPOINT_EVERY", "10"))
+
 # Risk system file — used by all validators
 RISK_FILE = os.getenv("RISK_FILE", str(BASE_DIR / "risk_system.xlsx"))
 
@@ -49,12 +53,40 @@ SHEET_CROSS_CURRENCY = "currency_risk_swap"
 # ---------------------------------------------------------------------------
 DATA_DIR = os.getenv("DATA_DIR", str(BASE_DIR / "data"))
 
+# Write-ahead log entries accumulated before a collection is compacted
+# back into its JSON snapshot.
+JSON_STORE_COMPACT_EVERY = int(os.getenv("JSON_STORE_COMPACT_EVERY", "1000"))
+
+# Where validators read reference trades: "excel" (RISK_FILE) or "sqlite"
+# (REFERENCE_DB, filled by ``python -m validators.reference_data``).
+REFERENCE_BACKEND = os.getenv("REFERENCE_BACKEND", "excel").strip().lower()
+REFERENCE_DB = os.getenv("REFERENCE_DB", os.path.join(DATA_DIR, "reference.db"))
+
+# Columnar snapshot of the risk workbook (see validators/risk_snapshot.py),
+# refreshed in the background when RISK_FILE changes (0 s disables refresh).
+RISK_SNAPSHOT_DIR = os.getenv("RISK_SNAPSHOT_DIR", os.path.join(DATA_DIR, "risk_snapshots"))
+RISK_SNAPSHOT_POLL_SECONDS = int(os.getenv("RISK_SNAPSHOT_POLL_SECONDS", "10"))
+
 # ---------------------------------------------------------------------------
 # External API keys
 # ---------------------------------------------------------------------------
 GROQ_API_KEY = os.getenv("GROQ_API_KEY", "")
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
 
+# Concurrent Groq requests per termsheet extraction, and retries per
+# request on rate limits / transient errors (with exponential backoff).
+GROQ_MAX_CONCURRENCY = int(os.getenv("GROQ_MAX_CONCURRENCY", "4"))
+GROQ_MAX_RETRIES = int(os.getenv("GROQ_MAX_RETRIES", "5"))
+
+# Cache of LLM classification / extraction results (0 entries disables it;
+# a TTL of 0 keeps entries until evicted).
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "5000"))
+LLM_CACHE_TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL_SECONDS", str(30 * 24 * 3600)))
+
+# Minimum lead of the best local keyword score over the runner-up for a
+# termsheet to be classified without an LLM call (above 1 = always ask the LLM).
+LOCAL_CLASSIFIER_THRESHOLD = float(os.getenv("LOCAL_CLASSIFIER_THRESHOLD", "0.3"))
+
 # ---------------------------------------------------------------------------
 # Email (IMAP)
 # ---------------------------------------------------------------------------
@@ -76,3 +108,23 @@ FLASK_TEXT_UPLOAD_URL = os.getenv("FLASK_TEXT_UPLOAD_URL", "http://localhost:500
 # Scheduler
 # ---------------------------------------------------------------------------
 SCHEDULER_INTERVAL_MINUTES = int(os.getenv("SCHEDULER_INTERVAL_MINUTES", "5"))
+
+# ---------------------------------------------------------------------------
+# PDF batch processing
+# ---------------------------------------------------------------------------
+# Worker processes used by ``main.process_pdf_files``; 0 means one per CPU,
+# 1 disables the process pool.
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", "0"))
+
+# On-disk cache of parsed PDF page text, keyed by file hash (0 MB disables)
+PDF_TEXT_CACHE_DIR = os.getenv("PDF_TEXT_CACHE_DIR", os.path.join(DATA_DIR, "pdf_text_cache"))
+PDF_TEXT_CACHE_MAX_MB = int(os.getenv("PDF_TEXT_CACHE_MAX_MB", "256"))
+
+# Threads running queued /extract jobs (see job_queue.py)
+EXTRACT_WORKERS = int(os.getenv("EXTRACT_WORKERS", "2"))
+# Finished jobs (and their uploaded files) are deleted after this long (0 keeps them)
+JOB_TTL_HOURS = float(os.getenv("JOB_TTL_HOURS", "168"))
+
+# Key schemas for PDF extraction, one JSON file per document family
+SCHEMA_DIR = os.getenv("SCHEMA_DIR", str(BASE_DIR / "schemas"))
+PDF_SCHEMA = os.getenv("PDF_SCHEMA", "equity_trade")
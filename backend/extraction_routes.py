@@ -2,29 +2,76 @@
 Termsheet extraction routes using Groq LLM.
 
 Classifies uploaded termsheets by derivative type and extracts
-structured parameters using chunked LLM processing.
+structured parameters using chunked LLM processing.  Chunks are sent to
+Groq concurrently; one process-wide semaphore keeps at most
+``GROQ_MAX_CONCURRENCY`` requests in flight across every job, batch and
+chunk pool.  Rate limits and transient errors are retried with backoff.  Results are
+memoised in the shared ``llm_cache`` so re-uploads skip the model.
+
+``/extract/batch`` takes many PDFs (or zips of PDFs) at once, parses them
+in a process pool and stores the resulting documents with one write.
 """
 
 from __future__ import annotations
 
 import json
 import os
+import random
 import re
-from typing import Any, Dict, List, Tuple
+import shutil
+import threading
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
 
 import groq
-import fitz  # PyMuPDF
 from flask import Blueprint, jsonify, request
 
-from config import GROQ_API_KEY, UPLOAD_FOLDER, get_logger
+from config import (
+    GROQ_API_KEY,
+    GROQ_MAX_CONCURRENCY,
+    GROQ_MAX_RETRIES,
+    get_logger,
+)
+from job_queue import get_job_queue, job_document_id, upload_dir
 from json_store import get_collection
+from llm_cache import get_llm_cache
+from local_classifier import LocalClassifier
+from pdf_text import file_sha256, iter_chunks, iter_pdf_pages, normalise_pages, read_pdf_texts, split_head
 
 logger = get_logger(__name__)
 
-# Initialize Groq client (only if API key is configured)
+# Initialize Groq client (only if API key is configured).  Retries are
+# handled by _chat_completion so that concurrent chunk calls back off together.
 _client = None
 if GROQ_API_KEY:
-    _client = groq.Client(api_key=GROQ_API_KEY)
+    _client = groq.Client(api_key=GROQ_API_KEY, max_retries=0)
+
+GROQ_MODEL = "llama3-70b-8192"
+# Bump when a prompt below changes, so cached answers are not reused.
+PROMPT_VERSION = "1"
+
+MAX_BATCH_FILES = 500
+# Total uncompressed size of the PDFs extracted from a batch's zips
+MAX_BATCH_UNCOMPRESSED_BYTES = 500 * 1024 * 1024
+
+CHUNK_SIZE = 6000
+CHUNK_OVERLAP = 1000
+# Leading characters used for classification.  At this size the LLM
+# classifier never needs its extra summarising call.
+CLASSIFY_MAX_CHARS = 10000
+
+_BACKOFF_BASE = 1.0   # seconds
+_BACKOFF_MAX = 30.0
+
+# Time before which no new Groq request should be sent, pushed forward
+# whenever any thread is rate limited.
+_cooldown_lock = threading.Lock()
+_cooldown_until = 0.0
+
+# Groq requests in flight in this process, whichever pool sends them
+_groq_slots = threading.BoundedSemaphore(max(1, GROQ_MAX_CONCURRENCY))
 
 extraction_bp = Blueprint("extraction_bp", __name__)
 
@@ -67,6 +114,8 @@ DERIVATIVE_PARAMETERS: Dict[str, List[str]] = {
     ],
 }
 
+_local_classifier = LocalClassifier(DERIVATIVE_PARAMETERS)
+
 
 def _get_client() -> groq.Client:
     """Return the Groq client, raising if not configured."""
@@ -77,10 +126,90 @@ def _get_client() -> groq.Client:
     return _client
 
 
-def classify_termsheet(text: str) -> str:
-    """Classify a termsheet into one of the six derivative types."""
+def _retry_after(exc: Exception) -> float | None:
+    """Seconds the server asked us to wait, from a ``Retry-After`` header."""
+    response = getattr(exc, "response", None)
+    if response is None:
+        return None
+    try:
+        return float(response.headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def _is_retryable(exc: Exception) -> bool:
+    return isinstance(
+        exc,
+        (groq.RateLimitError, groq.APIConnectionError, groq.APITimeoutError, groq.InternalServerError),
+    )
+
+
+def _chat_completion(**kwargs: Any) -> Any:
+    """``client.chat.completions.create`` with rate-limit-aware backoff.
+
+    Rate limits (429), timeouts, connection errors and 5xx responses are
+    retried up to ``GROQ_MAX_RETRIES`` times.  The wait honours
+    ``Retry-After`` when present, otherwise it is exponential with jitter.
+    A 429 also delays requests from other threads, so a burst of chunk
+    calls does not keep hitting the limit.  At most
+    ``GROQ_MAX_CONCURRENCY`` requests are sent at once; waits between
+    retries do not hold a slot.
+    """
+    global _cooldown_until
     client = _get_client()
 
+    for attempt in range(GROQ_MAX_RETRIES + 1):
+        with _cooldown_lock:
+            wait = _cooldown_until - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+
+        try:
+            with _groq_slots:
+                return client.chat.completions.create(**kwargs)
+        except Exception as exc:
+            if attempt >= GROQ_MAX_RETRIES or not _is_retryable(exc):
+                raise
+            delay = _retry_after(exc)
+            if delay is None:
+                delay = min(_BACKOFF_MAX, _BACKOFF_BASE * 2 ** attempt)
+                delay += random.uniform(0, delay / 2)
+            if isinstance(exc, groq.RateLimitError):
+                with _cooldown_lock:
+                    _cooldown_until = max(_cooldown_until, time.monotonic() + delay)
+            logger.warning(
+                "Groq request failed (%s), retry %d/%d in %.1fs",
+                type(exc).__name__, attempt + 1, GROQ_MAX_RETRIES, delay,
+            )
+            time.sleep(delay)
+
+    raise AssertionError("unreachable")
+
+
+def _has_values(parameters: Dict[str, Any]) -> bool:
+    return any(value is not None for value in parameters.values())
+
+
+def classify_termsheet(text: str) -> str:
+    """Classify a termsheet into one of the six derivative types (cached)."""
+    return get_llm_cache().get_or_compute(
+        "classify", text, GROQ_MODEL, PROMPT_VERSION,
+        lambda: _classify_termsheet(text),
+        cacheable=lambda derivative_type: derivative_type in DERIVATIVE_PARAMETERS,
+    )
+
+
+def classify_with_source(text: str) -> Dict[str, Any]:
+    """Classify locally when the keywords are conclusive, else via the LLM.
+
+    Returns ``derivative_type``, ``classified_by`` (``"local"`` / ``"llm"``)
+    and the local classifier's ``confidence``.
+    """
+    return _local_classifier.decide(text, classify_termsheet)
+
+
+def _classify_termsheet(text: str) -> str:
+
     classification_prompt = """
     Analyze this financial termsheet and classify it as ONE of the following derivative types:
 
@@ -104,8 +233,8 @@ def classify_termsheet(text: str) -> str:
             "Money Market Deposit, Single Spread Options, FX Digital.\n"
             "Focus on headings, transaction type descriptions, and key parameters.\n\nTermsheet:\n" + text
         )
-        sections_resp = client.chat.completions.create(
-            model="llama3-70b-8192",
+        sections_resp = _chat_completion(
+            model=GROQ_MODEL,
             messages=[{"role": "user", "content": sections_prompt}],
             temperature=0.0,
             max_tokens=2000,
@@ -114,8 +243,8 @@ def classify_termsheet(text: str) -> str:
     else:
         classification_text = text
 
-    response = client.chat.completions.create(
-        model="llama3-70b-8192",
+    response = _chat_completion(
+        model=GROQ_MODEL,
         messages=[{"role": "user", "content": classification_prompt + classification_text}],
         temperature=0.0,
         max_tokens=20,
@@ -135,20 +264,49 @@ def classify_termsheet(text: str) -> str:
 def extract_parameters_by_chunks(
     text: str,
     derivative_type: str,
-    chunk_size: int = 6000,
-    overlap: int = 1000,
+    chunk_size: int = CHUNK_SIZE,
+    overlap: int = CHUNK_OVERLAP,
 ) -> Dict[str, Any]:
     """Extract parameters by processing text in overlapping chunks."""
-    parameters = DERIVATIVE_PARAMETERS.get(derivative_type, [])
+    return extract_parameters_streaming([text], derivative_type, chunk_size, overlap)
 
-    if len(text) <= chunk_size:
-        return _extract_parameters_from_chunk(text, derivative_type, parameters)
 
-    chunks = [text[i : i + chunk_size] for i in range(0, len(text), chunk_size - overlap)]
+def extract_parameters_streaming(
+    pieces: Iterable[str],
+    derivative_type: str,
+    chunk_size: int = CHUNK_SIZE,
+    overlap: int = CHUNK_OVERLAP,
+) -> Dict[str, Any]:
+    """Extract parameters from text arriving as a stream of *pieces*.
+
+    Each chunk is sent to the LLM as soon as it has been read (Groq calls
+    from every pool share the ``GROQ_MAX_CONCURRENCY`` limit of
+    ``_chat_completion``), while later pages are still being parsed; a bounded number of chunks wait in memory.  Results are merged
+    in document order, so the first non-null value for each parameter
+    wins exactly as in a serial run.  Chunk results are cached, so a
+    re-upload of the same document makes no LLM calls.
+    """
+    parameters = DERIVATIVE_PARAMETERS.get(derivative_type, [])
+    workers = max(1, GROQ_MAX_CONCURRENCY)
+    # Chunks submitted but not finished; caps memory held by queued chunks.
+    slots = threading.BoundedSemaphore(workers * 2)
+
+    futures = []
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="groq-chunk") as pool:
+        for chunk in iter_chunks(pieces, chunk_size, overlap):
+            slots.acquire()
+            future = pool.submit(_extract_chunk_cached, chunk, derivative_type, parameters)
+            future.add_done_callback(lambda _: slots.release())
+            futures.append(future)
+        results = [future.result() for future in futures]
+
+    if not results:
+        return {param: None for param in parameters}
+    if len(results) == 1:
+        return results[0]
 
     merged: Dict[str, Any] = {}
-    for chunk in chunks:
-        result = _extract_parameters_from_chunk(chunk, derivative_type, parameters)
+    for result in results:
         for key, value in result.items():
             if key not in merged or (value is not None and merged[key] is None):
                 merged[key] = value
@@ -156,14 +314,21 @@ def extract_parameters_by_chunks(
     return {param: merged.get(param) for param in parameters}
 
 
+def _extract_chunk_cached(text: str, derivative_type: str, parameters: List[str]) -> Dict[str, Any]:
+    return get_llm_cache().get_or_compute(
+        "extract_chunk", text, GROQ_MODEL, PROMPT_VERSION,
+        lambda: _extract_parameters_from_chunk(text, derivative_type, parameters),
+        derivative_type=derivative_type,
+        cacheable=_has_values,
+    )
+
+
 def _extract_parameters_from_chunk(
     text: str,
     derivative_type: str,
     parameters: List[str],
 ) -> Dict[str, Any]:
     """Extract parameters from a single text chunk via LLM."""
-    client = _get_client()
-
     prompt = (
         f"Extract the following parameters from this {derivative_type} termsheet:\n\n"
         f"{', '.join(parameters)}\n\n"
@@ -173,8 +338,8 @@ def _extract_parameters_from_chunk(
         f"Termsheet chunk:\n{text}"
     )
 
-    response = client.chat.completions.create(
-        model="llama3-70b-8192",
+    response = _chat_completion(
+        model=GROQ_MODEL,
         messages=[{"role": "user", "content": prompt}],
         temperature=0.0,
         max_tokens=1500,
@@ -196,27 +361,163 @@ def _extract_parameters_from_chunk(
     return {param: None for param in parameters}
 
 
-def process_termsheet(path: str) -> Tuple[str, Dict[str, Any]]:
-    """Full pipeline: convert PDF → classify → extract → store."""
-    doc = fitz.open(path)
-    termsheet_text = " ".join(page.get_text() for page in doc)
-    doc.close()
-    termsheet_text = termsheet_text.replace("\n", " ").replace("\r", " ").strip()
+def _analyse_termsheet(
+    pieces: Iterable[str],
+    set_stage: Callable[[str], None],
+) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Classify from the head of the text stream, then extract from all of it."""
+    head, stream = split_head(pieces, CLASSIFY_MAX_CHARS, _local_classifier.is_confident)
+    set_stage("classifying")
+    classification = classify_with_source(head)
+    set_stage("extracting")
+    parameters = extract_parameters_streaming(stream, classification["derivative_type"])
+    return classification, parameters
 
-    derivative_type = classify_termsheet(termsheet_text)
-    parameters = extract_parameters_by_chunks(termsheet_text, derivative_type)
 
-    document = {
-        "derivative_type": derivative_type,
+def _termsheet_document(path: str, classification: Dict[str, Any], parameters: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "derivative_type": classification["derivative_type"],
+        "classified_by": classification["classified_by"],
         **parameters,
         "file_path": path,
         "status": "processing",
     }
 
-    result = termsheet_collection.insert_one(document)
-    logger.info("Document inserted with ID: %s", result.inserted_id)
 
-    return derivative_type, parameters
+def _job_document_id(job_id: str, path: str) -> str:
+    # The name as well as the hash: one batch may hold two copies of a PDF.
+    return job_document_id(job_id, f"{file_sha256(path)}/{os.path.basename(path)}")
+
+
+def _store_documents(documents: List[Dict[str, Any]]) -> List[Any]:
+    """Insert *documents* and return their IDs, skipping IDs already stored.
+
+    Documents of a job carry a ``job_document_id``, so a resumed job that
+    had already stored them does not insert them again.
+    """
+    new = [doc for doc in documents if "_id" not in doc or termsheet_collection.find_one({"_id": doc["_id"]}) is None]
+    if len(new) < len(documents):
+        logger.info("%d of %d documents were already stored", len(documents) - len(new), len(documents))
+    if new:
+        termsheet_collection.insert_many(new)
+    return [doc["_id"] for doc in documents]
+
+
+def process_termsheet(
+    path: str,
+    set_stage: Optional[Callable[[str], None]] = None,
+    job_id: Optional[str] = None,
+) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Full pipeline: convert PDF → classify → extract → store.
+
+    *set_stage* is called with ``"parsing"``, ``"classifying"``,
+    ``"extracting"`` and ``"storing"`` as the pipeline progresses.  With
+    *job_id* the document is stored under ``job_document_id``, once.
+    """
+    set_stage = set_stage or (lambda stage: None)
+
+    # Pages are parsed lazily: only enough to classify before the first
+    # LLM call, the rest while chunk extractions are in flight.
+    set_stage("parsing")
+    pages = normalise_pages(iter_pdf_pages(path), collapse_whitespace=False)
+
+    classification, parameters = _analyse_termsheet(pages, set_stage)
+
+    set_stage("storing")
+    document = _termsheet_document(path, classification, parameters)
+    if job_id is not None:
+        document["_id"] = _job_document_id(job_id, path)
+    [document_id] = _store_documents([document])
+    logger.info("Document inserted with ID: %s", document_id)
+
+    return classification, parameters
+
+
+def process_termsheet_batch(
+    paths: List[str],
+    set_stage: Optional[Callable[[str], None]] = None,
+    job_id: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Run many PDFs through the pipeline and store them with one write.
+
+    PDFs are parsed in a process pool (``PDF_WORKERS``), then classified
+    and extracted ``GROQ_MAX_CONCURRENCY`` files at a time; their Groq
+    calls still share the one ``GROQ_MAX_CONCURRENCY`` limit.  Every
+    successful document is inserted with a single ``insert_many`` (with
+    *job_id*, under ``job_document_id`` and only once).  Returns a manifest with one entry per input file, in input order.
+    """
+    set_stage = set_stage or (lambda stage: None)
+
+    set_stage("parsing")
+    texts = read_pdf_texts(paths)
+
+    def analyse(item: Tuple[str, Tuple[Optional[str], Optional[str]]]) -> Dict[str, Any]:
+        path, (raw_text, error) = item
+        entry: Dict[str, Any] = {"filename": os.path.basename(path), "status": "failed", "error": error}
+        if error is not None:
+            return entry
+        try:
+            classification, parameters = _analyse_termsheet(
+                normalise_pages([raw_text], collapse_whitespace=False), lambda stage: None,
+            )
+        except Exception as exc:
+            logger.exception("Error extracting %s", path)
+            entry["error"] = f"{type(exc).__name__}: {exc}"
+            return entry
+        entry.update({
+            "status": "succeeded",
+            "error": None,
+            "derivative_type": classification["derivative_type"],
+            "classified_by": classification["classified_by"],
+            "classification_confidence": classification["confidence"],
+            "parameters": parameters,
+            "_document": _termsheet_document(path, classification, parameters),
+        })
+        return entry
+
+    set_stage("extracting")
+    workers = max(1, min(GROQ_MAX_CONCURRENCY, len(paths)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="groq-batch") as pool:
+        results = list(pool.map(analyse, zip(paths, texts)))
+
+    set_stage("storing")
+    stored = [entry for entry in results if entry["status"] == "succeeded"]
+    if stored:
+        documents = [entry.pop("_document") for entry in stored]
+        if job_id is not None:
+            for document in documents:
+                document["_id"] = _job_document_id(job_id, document["file_path"])
+        for entry, doc_id in zip(stored, _store_documents(documents)):
+            entry["document_id"] = doc_id
+    logger.info("Batch extraction: %d of %d files stored", len(stored), len(results))
+
+    return {
+        "total": len(results),
+        "succeeded": len(stored),
+        "failed": len(results) - len(stored),
+        "results": results,
+    }
+
+
+def _run_extract_job(payload: Dict[str, Any], set_stage: Callable[[str], None]) -> Dict[str, Any]:
+    """Job handler for ``/extract`` uploads."""
+    classification, parameters = process_termsheet(payload["file_path"], set_stage, payload.get("job_id"))
+    return {
+        "message": "Termsheet processed successfully",
+        "derivative_type": classification["derivative_type"],
+        "classified_by": classification["classified_by"],
+        "classification_confidence": classification["confidence"],
+        "parameters": parameters,
+    }
+
+
+def _run_batch_job(payload: Dict[str, Any], set_stage: Callable[[str], None]) -> Dict[str, Any]:
+    """Job handler for ``/extract/batch`` uploads."""
+    return process_termsheet_batch(payload["file_paths"], set_stage, payload.get("job_id"))
+
+
+get_job_queue().register("extract_groq", _run_extract_job)
+get_job_queue().register("extract_batch_groq", _run_batch_job)
 
 
 # ---------------------------------------------------------------------------
@@ -225,26 +526,136 @@ def process_termsheet(path: str) -> Tuple[str, Dict[str, Any]]:
 
 @extraction_bp.route("/extract", methods=["POST"])
 def extract_termsheet():
-    """Extract and classify an uploaded termsheet PDF."""
+    """Queue extraction and classification of an uploaded termsheet PDF.
+
+    Returns ``202`` with a job ID at once; poll ``/jobs/<job_id>`` for the
+    stage and, when done, the result.
+    """
     try:
         file = request.files.get("file")
         if not file or not file.filename or not file.filename.lower().endswith(".pdf"):
             return jsonify({"error": "Invalid or no PDF uploaded"}), 400
 
-        save_path = os.path.join(UPLOAD_FOLDER, file.filename)
+        _get_client()  # fail fast with 503 if the LLM is not configured
+
+        save_path = os.path.join(upload_dir(), os.path.basename(file.filename))
         file.save(save_path)
 
-        derivative_type, parameters = process_termsheet(save_path)
+        job_id = get_job_queue().submit("extract_groq", {"file_path": save_path})
 
         return jsonify({
-            "message": "Termsheet processed successfully",
-            "derivative_type": derivative_type,
-            "parameters": parameters,
-        }), 200
+            "message": "Termsheet queued for extraction",
+            "job_id": job_id,
+            "status_url": f"/jobs/{job_id}",
+        }), 202
     except RuntimeError as exc:
         return jsonify({"error": str(exc)}), 503
     except Exception as exc:
-        logger.exception("Error processing termsheet")
+        logger.exception("Error queueing termsheet")
+        return jsonify({"error": str(exc)}), 500
+
+
+def _unique_upload_path(directory: str, filename: str, taken: set) -> str:
+    """Path in *directory* for *filename*, suffixed if already used in this batch."""
+    stem, ext = os.path.splitext(filename)
+    candidate, n = filename, 1
+    while candidate in taken:
+        n += 1
+        candidate = f"{stem} ({n}){ext}"
+    taken.add(candidate)
+    return os.path.join(directory, candidate)
+
+
+def _zip_pdf_members(archive: zipfile.ZipFile) -> List[zipfile.ZipInfo]:
+    return [
+        member for member in archive.infolist()
+        if not member.is_dir()
+        and not member.filename.startswith("__MACOSX/")
+        and os.path.basename(member.filename).lower().endswith(".pdf")
+    ]
+
+
+def _save_batch_uploads(files: List[Any]) -> List[str]:
+    """Save uploaded PDFs (and PDFs inside uploaded zips); return their paths.
+
+    Files go to a new directory of their own (``upload_dir()``), so they
+    never replace uploads that queued jobs still need.  Zips are checked
+    against ``MAX_BATCH_FILES`` and ``MAX_BATCH_UNCOMPRESSED_BYTES`` from
+    their member list before anything is extracted.  On any error the
+    directory is removed and the error re-raised.
+    """
+    batch_dir = upload_dir()
+    paths: List[str] = []
+    taken: set = set()
+    total_bytes = 0
+    try:
+        for file in files:
+            name = os.path.basename(file.filename or "")
+            if name.lower().endswith(".pdf"):
+                if len(paths) + 1 > MAX_BATCH_FILES:
+                    raise ValueError(f"A batch may contain at most {MAX_BATCH_FILES} PDFs")
+                path = _unique_upload_path(batch_dir, name, taken)
+                file.save(path)
+                paths.append(path)
+            elif name.lower().endswith(".zip"):
+                with zipfile.ZipFile(file.stream) as archive:
+                    members = _zip_pdf_members(archive)
+                    if len(paths) + len(members) > MAX_BATCH_FILES:
+                        raise ValueError(f"A batch may contain at most {MAX_BATCH_FILES} PDFs")
+                    # zipfile stops reading a member at its declared size
+                    total_bytes += sum(member.file_size for member in members)
+                    if total_bytes > MAX_BATCH_UNCOMPRESSED_BYTES:
+                        raise ValueError(
+                            f"Zip contents may total at most {MAX_BATCH_UNCOMPRESSED_BYTES // (1024 * 1024)} MB"
+                        )
+                    for member in members:
+                        path = _unique_upload_path(batch_dir, os.path.basename(member.filename), taken)
+                        with archive.open(member) as src, open(path, "wb") as dst:
+                            shutil.copyfileobj(src, dst)
+                        paths.append(path)
+    except BaseException:
+        shutil.rmtree(batch_dir, ignore_errors=True)
+        raise
+    if not paths:
+        shutil.rmtree(batch_dir, ignore_errors=True)
+    return paths
+
+
+@extraction_bp.route("/extract/batch", methods=["POST"])
+def extract_termsheet_batch():
+    """Queue a batch of termsheet PDFs (multipart ``files`` and/or zip archives).
+
+    Returns ``202`` with a job ID; the finished job's result is a manifest
+    with one entry per PDF.
+    """
+    try:
+        files = request.files.getlist("files") + request.files.getlist("file")
+        if not files:
+            return jsonify({"error": "No files uploaded"}), 400
+
+        _get_client()  # fail fast with 503 if the LLM is not configured
+
+        try:
+            paths = _save_batch_uploads(files)
+        except zipfile.BadZipFile:
+            return jsonify({"error": "Invalid zip archive"}), 400
+        except ValueError as exc:
+            return jsonify({"error": str(exc)}), 400
+        if not paths:
+            return jsonify({"error": "No PDF files found in upload"}), 400
+
+        job_id = get_job_queue().submit("extract_batch_groq", {"file_paths": paths})
+
+        return jsonify({
+            "message": f"{len(paths)} termsheets queued for extraction",
+            "job_id": job_id,
+            "status_url": f"/jobs/{job_id}",
+            "files": [os.path.basename(p) for p in paths],
+        }), 202
+    except RuntimeError as exc:
+        return jsonify({"error": str(exc)}), 503
+    except Exception as exc:
+        logger.exception("Error queueing termsheet batch")
         return jsonify({"error": str(exc)}), 500
 
 
@@ -256,8 +667,12 @@ def classify_only():
         if not data or "text" not in data:
             return jsonify({"error": "JSON body with 'text' field required"}), 400
 
-        derivative_type = classify_termsheet(data["text"])
-        return jsonify({"derivative_type": derivative_type}), 200
+        classification = classify_with_source(data["text"])
+        return jsonify({
+            "derivative_type": classification["derivative_type"],
+            "classified_by": classification["classified_by"],
+            "classification_confidence": classification["confidence"],
+        }), 200
     except RuntimeError as exc:
         return jsonify({"error": str(exc)}), 503
     except Exception as exc:
@@ -0,0 +1,130 @@
+"""
+Data-driven key schemas for PDF key-value extraction.
+
+Each document family (equity trades, interest rate swaps, …) has a JSON
+file in ``SCHEMA_DIR`` listing the keys to look for, grouped by section::
+
+    {
+        "family": "interest_rate_swap",
+        "trade_id_pattern": "Trade ID:?\\s*(TRADE-[^\\s]+)",
+        "sections": {"Dates": ["Effective Date", "Maturity Date"], ...}
+    }
+
+Schemas are re-read only when their file changes.  Compiled
+``KeyValueMatcher`` objects are cached by a hash of the schema's keys and
+trade-ID pattern, so families that share a key set — or a file that is
+touched without changing — reuse the same matcher.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from typing import Dict, List, Tuple
+
+from config import SCHEMA_DIR, get_logger
+from kv_matcher import DEFAULT_TRADE_ID_PATTERN, KeyValueMatcher
+
+logger = get_logger(__name__)
+
+_lock = threading.Lock()
+# (schema_dir, family) → (mtime, schema)
+_schema_cache: Dict[Tuple[str, str], Tuple[float, "ExtractionSchema"]] = {}
+# schema digest → compiled matcher
+_matcher_cache: Dict[str, KeyValueMatcher] = {}
+
+
+class ExtractionSchema:
+    """Keys (grouped by section) and trade-ID pattern for one document family."""
+
+    def __init__(
+        self,
+        family: str,
+        sections: Dict[str, List[str]],
+        trade_id_pattern: str = DEFAULT_TRADE_ID_PATTERN,
+        description: str = "",
+    ) -> None:
+        self.family = family
+        self.sections = sections
+        self.trade_id_pattern = trade_id_pattern
+        self.description = description
+
+    @property
+    def keys(self) -> List[str]:
+        """All keys in section order."""
+        return [key for keys in self.sections.values() for key in keys]
+
+    @property
+    def digest(self) -> str:
+        """Stable hash of everything that affects matching."""
+        payload = json.dumps([self.keys, self.trade_id_pattern], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    @classmethod
+    def from_dict(cls, data: Dict, family: str) -> "ExtractionSchema":
+        sections = data.get("sections")
+        if not isinstance(sections, dict) or not all(
+            isinstance(keys, list) and all(isinstance(k, str) and k.strip() for k in keys)
+            for keys in sections.values()
+        ):
+            raise ValueError(f"Schema '{family}' must map section names to lists of key strings")
+        return cls(
+            family=data.get("family", family),
+            sections=sections,
+            trade_id_pattern=data.get("trade_id_pattern", DEFAULT_TRADE_ID_PATTERN),
+            description=data.get("description", ""),
+        )
+
+
+def list_schemas(schema_dir: str = SCHEMA_DIR) -> List[str]:
+    """Return the families that have a schema file."""
+    if not os.path.isdir(schema_dir):
+        return []
+    return sorted(f[:-5] for f in os.listdir(schema_dir) if f.endswith(".json"))
+
+
+def load_schema(family: str, schema_dir: str = SCHEMA_DIR) -> ExtractionSchema:
+    """Load the schema for *family*, caching by file mtime.
+
+    Raises ``FileNotFoundError`` if there is no schema file and
+    ``ValueError`` if it is malformed.
+    """
+    path = os.path.join(schema_dir, f"{family}.json")
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        raise FileNotFoundError(f"No extraction schema '{family}' in {schema_dir}") from None
+
+    cache_key = (schema_dir, family)
+    with _lock:
+        cached = _schema_cache.get(cache_key)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+
+    with open(path, "r", encoding="utf-8") as fh:
+        try:
+            schema = ExtractionSchema.from_dict(json.load(fh), family)
+        except json.JSONDecodeError as exc:
+            raise ValueError(f"Invalid JSON in schema '{family}': {exc}") from exc
+
+    with _lock:
+        _schema_cache[cache_key] = (mtime, schema)
+    logger.debug("Loaded extraction schema %s (%d keys)", family, len(schema.keys))
+    return schema
+
+
+def get_matcher(schema: ExtractionSchema) -> KeyValueMatcher:
+    """Return the compiled matcher for *schema*, building it once per digest."""
+    digest = schema.digest
+    with _lock:
+        matcher = _matcher_cache.get(digest)
+    if matcher is not None:
+        return matcher
+
+    matcher = KeyValueMatcher(schema.keys, trade_id_pattern=schema.trade_id_pattern)
+    with _lock:
+        matcher = _matcher_cache.setdefault(digest, matcher)
+    logger.debug("Compiled matcher for schema %s (%s)", schema.family, digest[:12])
+    return matcher
@@ -12,6 +12,7 @@ from pathlib import Path
 from typing import Any, Dict, List, Optional, Set, Tuple
 
 from config import METADATA_DIR, get_logger
+from version_history import VersionHistory
 
 logger = get_logger(__name__)
 
@@ -307,12 +308,15 @@ def classify_term_sheet_from_file(file_path_str: str) -> Optional[Dict[str, List
     """Load, classify, and return results for a single JSON file."""
     file_path = Path(file_path_str)
     logger.info("Loading JSON from: %s", file_path.resolve())
+    return classify_term_sheet_data(load_json_data(file_path), str(file_path))
 
-    input_data = load_json_data(file_path)
+
+def classify_term_sheet_data(input_data: Any, source: str) -> Optional[Dict[str, List[Tuple[str, Dict[str, Any]]]]]:
+    """Classify already-loaded term sheet JSON; *source* names it in log messages."""
     normalized_input_keys = extract_all_keys_normalized(input_data)
 
     if not normalized_input_keys:
-        logger.error("Could not extract any keys from %s — cannot classify.", file_path)
+        logger.error("Could not extract any keys from %s — cannot classify.", source)
         return None
 
     logger.info("Found %d unique normalised keys.", len(normalized_input_keys))
@@ -344,18 +348,22 @@ def classify_termsheet() -> list:
         if not versions_folder.exists() or not versions_folder.is_dir():
             continue
 
-        for version_file in versions_folder.glob("*.json"):
+        # Versions are delta-encoded, so rebuild each one from the history.
+        history = VersionHistory(str(trade_id_folder))
+        for entry in history.versions():
+            name = entry.get("name") or Path(entry["file"]).stem
+            source = f"{trade_id_folder.name}/{name}"
             try:
-                logger.info("Processing: %s", version_file)
-                classification_result = classify_term_sheet_from_file(str(version_file))
+                logger.info("Processing: %s", source)
+                classification_result = classify_term_sheet_data(history.get(entry["version"]), source)
 
                 if classification_result:
                     classification_result["trade_id"] = trade_id_folder.name
-                    classification_result["version"] = version_file.stem
+                    classification_result["version"] = name
                     display_results(classification_result)
                     results.append(classification_result)
             except Exception:
-                logger.exception("Error processing %s", version_file)
+                logger.exception("Error processing %s", source)
 
     for result in results:
         logger.info(
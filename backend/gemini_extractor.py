@@ -2,7 +2,8 @@
 Termsheet extraction routes using Google Gemini LLM.
 
 Classifies uploaded termsheets by derivative type and extracts
-structured parameters using Google's Generative AI.
+structured parameters using Google's Generative AI.  Results are
+memoised in the shared ``llm_cache`` so re-uploads skip the model.
 """
 
 from __future__ import annotations
@@ -10,14 +11,17 @@ from __future__ import annotations
 import json
 import os
 import re
-from typing import Any, Dict, List, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import google.generativeai as genai
-import fitz  # PyMuPDF
 from flask import Blueprint, jsonify, request
 
-from config import GEMINI_API_KEY, UPLOAD_FOLDER, get_logger
+from config import GEMINI_API_KEY, get_logger
+from job_queue import get_job_queue, job_document_id, upload_dir
 from json_store import get_collection
+from llm_cache import get_llm_cache
+from local_classifier import LocalClassifier
+from pdf_text import file_sha256, iter_pdf_pages, normalise_pages, split_head
 
 logger = get_logger(__name__)
 
@@ -25,6 +29,12 @@ logger = get_logger(__name__)
 if GEMINI_API_KEY:
     genai.configure(api_key=GEMINI_API_KEY)
 
+GEMINI_MODEL = "gemini-1.5-pro"
+# Leading characters of a termsheet sent for classification
+CLASSIFY_MAX_CHARS = 15000
+# Bump when a prompt below changes, so cached answers are not reused.
+PROMPT_VERSION = "2"
+
 gemini_extractor_bp = Blueprint("gemini_extractor_bp", __name__)
 termsheet_collection = get_collection("termsheets")
 
@@ -65,16 +75,34 @@ DERIVATIVE_PARAMETERS: Dict[str, List[str]] = {
     ],
 }
 
+_local_classifier = LocalClassifier(DERIVATIVE_PARAMETERS)
+
 def _get_model():
     """Return the Gemini model, raising if not configured."""
     if not GEMINI_API_KEY:
         raise RuntimeError(
             "Gemini API key not configured. Set GEMINI_API_KEY in your .env file."
         )
-    return genai.GenerativeModel('gemini-1.5-pro')
+    return genai.GenerativeModel(GEMINI_MODEL)
 
 def classify_termsheet(text: str) -> str:
-    """Classify a termsheet into one of the six derivative types."""
+    """Classify a termsheet into one of the six derivative types (cached)."""
+    return get_llm_cache().get_or_compute(
+        "classify", text, GEMINI_MODEL, PROMPT_VERSION,
+        lambda: _classify_termsheet(text),
+        cacheable=lambda derivative_type: derivative_type in DERIVATIVE_PARAMETERS,
+    )
+
+def classify_with_source(text: str) -> Dict[str, Any]:
+    """Classify locally when the keywords are conclusive, else via the LLM.
+
+    Returns ``derivative_type``, ``classified_by`` (``"local"`` / ``"llm"``)
+    and the local classifier's ``confidence``.
+    """
+    return _local_classifier.decide(text, classify_termsheet)
+
+
+def _classify_termsheet(text: str) -> str:
     model = _get_model()
 
     classification_prompt = f"""
@@ -84,7 +112,7 @@ def classify_termsheet(text: str) -> str:
     Return ONLY the name of the derivative type that best matches. No explanation.
 
     Termsheet:
-    {text[:15000]}  # Gemini pro has a large context, but let's keep it reasonable
+    {text[:CLASSIFY_MAX_CHARS]}
     """
 
     response = model.generate_content(classification_prompt)
@@ -99,7 +127,15 @@ def classify_termsheet(text: str) -> str:
     return derivative_type
 
 def extract_parameters(text: str, derivative_type: str) -> Dict[str, Any]:
-    """Extract parameters from text via Gemini."""
+    """Extract parameters from text via Gemini (cached)."""
+    return get_llm_cache().get_or_compute(
+        "extract", text, GEMINI_MODEL, PROMPT_VERSION,
+        lambda: _extract_parameters(text, derivative_type),
+        derivative_type=derivative_type,
+        cacheable=lambda params: any(value is not None for value in params.values()),
+    )
+
+def _extract_parameters(text: str, derivative_type: str) -> Dict[str, Any]:
     model = _get_model()
     parameters = DERIVATIVE_PARAMETERS.get(derivative_type, [])
 
@@ -129,23 +165,41 @@ def extract_parameters(text: str, derivative_type: str) -> Dict[str, Any]:
         logger.warning("Could not parse Gemini response as JSON for %s", derivative_type)
         return {param: None for param in parameters}
 
-def process_termsheet(path: str) -> Tuple[str, Dict[str, Any]]:
-    """Full pipeline: convert PDF → classify → extract → store."""
-    doc = fitz.open(path)
-    termsheet_text = " ".join(page.get_text() for page in doc)
-    doc.close()
-    
-    # Pre-clean text
-    termsheet_text = re.sub(r'\s+', ' ', termsheet_text).strip()
+def process_termsheet(
+    path: str,
+    set_stage: Optional[Callable[[str], None]] = None,
+    job_id: Optional[str] = None,
+) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Full pipeline: convert PDF → classify → extract → store.
 
-    derivative_type = classify_termsheet(termsheet_text)
+    *set_stage* is called with ``"parsing"``, ``"classifying"``,
+    ``"extracting"`` and ``"storing"`` as the pipeline progresses.  With
+    *job_id* the document is stored under ``job_document_id``, once.
+    """
+    set_stage = set_stage or (lambda stage: None)
+
+    # Pages are parsed lazily and whitespace is collapsed as they stream;
+    # classification only waits for the leading CLASSIFY_MAX_CHARS.
+    set_stage("parsing")
+    pages = normalise_pages(iter_pdf_pages(path))
+    head, stream = split_head(pages, CLASSIFY_MAX_CHARS, _local_classifier.is_confident)
+
+    set_stage("classifying")
+    classification = classify_with_source(head)
+    derivative_type = classification["derivative_type"]
+
+    # Gemini extracts from the whole document in a single prompt.
+    termsheet_text = "".join(stream)
+    set_stage("extracting")
     parameters = extract_parameters(termsheet_text, derivative_type)
 
+    set_stage("storing")
     document = {
         "id": os.path.basename(path),
         "name": os.path.basename(path),
         "uploadDate": os.path.getmtime(path),
         "derivative_type": derivative_type,
+        "classified_by": classification["classified_by"],
         "parameters": parameters,
         "file_path": path,
         "status": "validated",
@@ -154,32 +208,56 @@ def process_termsheet(path: str) -> Tuple[str, Dict[str, Any]]:
         "expectedTerms": [{"term": k, "value": "TBD"} for k in parameters] 
     }
 
-    # Use insert_one for live storage
-    termsheet_collection.insert_one(document)
-    logger.info("Document inserted with ID: %s", document["id"])
+    if job_id is not None:
+        document["_id"] = job_document_id(job_id, f"{file_sha256(path)}/{os.path.basename(path)}")
+    if "_id" in document and termsheet_collection.find_one({"_id": document["_id"]}) is not None:
+        # A resumed job that had already stored its document
+        logger.info("Document %s was already stored", document["_id"])
+    else:
+        termsheet_collection.insert_one(document)
+        logger.info("Document inserted with ID: %s", document["id"])
+
+    return classification, parameters
+
+def _run_extract_job(payload: Dict[str, Any], set_stage: Callable[[str], None]) -> Dict[str, Any]:
+    """Job handler for ``/extract`` uploads."""
+    classification, parameters = process_termsheet(payload["file_path"], set_stage, payload.get("job_id"))
+    return {
+        "message": "Termsheet processed successfully via Gemini",
+        "derivative_type": classification["derivative_type"],
+        "classified_by": classification["classified_by"],
+        "classification_confidence": classification["confidence"],
+        "parameters": parameters,
+    }
 
-    return derivative_type, parameters
+get_job_queue().register("extract_gemini", _run_extract_job)
 
 @gemini_extractor_bp.route("/extract", methods=["POST"])
 def extract_termsheet():
-    """Extract and classify an uploaded termsheet PDF using Gemini."""
+    """Queue extraction and classification of an uploaded termsheet PDF using Gemini.
+
+    Returns ``202`` with a job ID at once; poll ``/jobs/<job_id>`` for the
+    stage and, when done, the result.
+    """
     try:
         file = request.files.get("file")
         if not file or not file.filename or not file.filename.lower().endswith(".pdf"):
             return jsonify({"error": "Invalid or no PDF uploaded"}), 400
 
-        save_path = os.path.join(UPLOAD_FOLDER, file.filename)
+        _get_model()  # fail fast with 503 if the LLM is not configured
+
+        save_path = os.path.join(upload_dir(), os.path.basename(file.filename))
         file.save(save_path)
 
-        derivative_type, parameters = process_termsheet(save_path)
+        job_id = get_job_queue().submit("extract_gemini", {"file_path": save_path})
 
         return jsonify({
-            "message": "Termsheet processed successfully via Gemini",
-            "derivative_type": derivative_type,
-            "parameters": parameters,
-        }), 200
+            "message": "Termsheet queued for extraction",
+            "job_id": job_id,
+            "status_url": f"/jobs/{job_id}",
+        }), 202
     except RuntimeError as exc:
         return jsonify({"error": str(exc)}), 503
     except Exception as exc:
-        logger.exception("Error processing termsheet with Gemini")
+        logger.exception("Error queueing termsheet for Gemini")
         return jsonify({"error": str(exc)}), 500
@@ -0,0 +1,218 @@
+"""
+Background job queue for long-running extraction requests.
+
+``/extract`` used to parse, classify and extract a PDF inside the request
+thread, which takes tens of seconds.  It now submits a job here and
+returns at once; a thread pool runs the job and clients poll
+``/jobs/<id>``.
+
+Jobs are stored in the ``jobs`` JSON collection::
+
+    {"_id": "<uuid>", "kind": "extract_groq", "status": "running",
+     "stage": "classifying", "payload": {...}, "result": null,
+     "error": null, "created_at": "...", "updated_at": "...",
+     "stage_history": [{"stage": "parsing", "at": "..."}, ...]}
+
+``status`` moves ``queued`` → ``running`` → ``succeeded`` / ``failed``.
+Handlers are registered per job kind.  ``resume()``, called once by the
+server at startup, queues again the jobs a previous process left
+``queued`` or ``running``, so work survives a restart; importing a module
+that registers a handler never starts a job.  A resumed job runs from
+the start, so handlers key what they store on the job
+(``job_document_id``): a job interrupted after storing writes the same
+documents again instead of duplicates.
+
+Uploaded files are saved under their own ``upload_dir()``, so a later
+upload with the same name cannot replace a file a pending job will read.
+``prune()`` deletes finished jobs older than ``JOB_TTL_HOURS``, with
+their upload directories.
+"""
+
+from __future__ import annotations
+
+import os
+import shutil
+import tempfile
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from config import EXTRACT_WORKERS, JOB_TTL_HOURS, UPLOAD_FOLDER, get_logger
+from json_store import get_collection
+
+logger = get_logger(__name__)
+
+# handler(payload, set_stage) -> JSON-serialisable result; the payload
+# also carries the job's ``job_id``
+JobHandler = Callable[[Dict[str, Any], Callable[[str], None]], Any]
+
+PENDING_STATUSES = ("queued", "running")
+FINISHED_STATUSES = ("succeeded", "failed")
+
+
+class JobQueue:
+    """Persistent job records executed by a thread pool."""
+
+    def __init__(self, collection_name: str = "jobs", workers: int = EXTRACT_WORKERS) -> None:
+        self._collection = get_collection(collection_name)
+        self._collection.create_index("status")
+        self._handlers: Dict[str, JobHandler] = {}
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="job")
+
+    def register(self, kind: str, handler: JobHandler) -> None:
+        """Register *handler* for jobs of *kind*."""
+        with self._lock:
+            self._handlers[kind] = handler
+
+    def resume(self) -> int:
+        """Queue again the jobs left ``queued`` or ``running`` by a previous process.
+
+        Call once at startup, after every handler is registered.  Returns
+        the number of jobs resumed.
+        """
+        # Collect before resubmitting, so a resumed job that starts running
+        # is not picked up a second time by the "running" query.
+        pending = [job for status in PENDING_STATUSES for job in self._collection.find({"status": status})]
+        resumed = 0
+        for job in sorted(pending, key=lambda j: j.get("created_at", "")):
+            if job.get("kind") not in self._handlers:
+                logger.warning("Not resuming job %s: no handler for kind '%s'", job["_id"], job.get("kind"))
+                continue
+            logger.info("Resuming %s job %s (was %s)", job["kind"], job["_id"], job["status"])
+            self._update(job["_id"], status="queued", stage="queued")
+            self._pool.submit(self._run, job["_id"])
+            resumed += 1
+        return resumed
+
+    def submit(self, kind: str, payload: Dict[str, Any]) -> str:
+        """Persist a new job and schedule it; return its ID."""
+        if kind not in self._handlers:
+            raise KeyError(f"No handler registered for job kind '{kind}'")
+
+        now = datetime.now().isoformat()
+        job_id = str(uuid.uuid4())
+        self._collection.insert_one({
+            "_id": job_id,
+            "kind": kind,
+            "status": "queued",
+            "stage": "queued",
+            "payload": payload,
+            "result": None,
+            "error": None,
+            "created_at": now,
+            "updated_at": now,
+            "stage_history": [],
+        })
+        self._pool.submit(self._run, job_id)
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return self._collection.find_one({"_id": job_id})
+
+    def prune(self, ttl_hours: float = JOB_TTL_HOURS) -> int:
+        """Delete finished jobs last updated over *ttl_hours* ago, and their uploads.
+
+        Returns the number of jobs deleted; ``ttl_hours <= 0`` deletes none.
+        """
+        if ttl_hours <= 0:
+            return 0
+        cutoff = datetime.now() - timedelta(hours=ttl_hours)
+        expired = [
+            job for status in FINISHED_STATUSES for job in self._collection.find({"status": status})
+            if _parse_time(job.get("updated_at")) < cutoff
+        ]
+        for job in expired:
+            for folder in _upload_dirs(job.get("payload") or {}):
+                shutil.rmtree(folder, ignore_errors=True)
+            self._collection.delete_one({"_id": job["_id"]})
+        if expired:
+            logger.info("Pruned %d finished jobs older than %g hours", len(expired), ttl_hours)
+        return len(expired)
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    def _update(self, job_id: str, **fields: Any) -> None:
+        fields["updated_at"] = datetime.now().isoformat()
+        self._collection.update_one({"_id": job_id}, {"$set": fields})
+
+    def _set_stage(self, job_id: str, stage: str) -> None:
+        job = self._collection.find_one({"_id": job_id}) or {}
+        history = job.get("stage_history", []) + [{"stage": stage, "at": datetime.now().isoformat()}]
+        self._update(job_id, stage=stage, stage_history=history)
+
+    def _run(self, job_id: str) -> None:
+        job = self.get(job_id)
+        if job is None or job["status"] != "queued":
+            return
+        handler = self._handlers[job["kind"]]
+
+        self._update(job_id, status="running")
+        try:
+            result = handler({**job["payload"], "job_id": job_id}, lambda stage: self._set_stage(job_id, stage))
+        except Exception as exc:
+            logger.exception("Job %s (%s) failed", job_id, job["kind"])
+            self._update(job_id, status="failed", stage="failed", error=f"{type(exc).__name__}: {exc}")
+            return
+        self._update(job_id, status="succeeded", stage="done", result=result)
+        logger.info("Job %s (%s) finished", job_id, job["kind"])
+
+
+_queue: JobQueue | None = None
+_queue_lock = threading.Lock()
+
+
+def get_job_queue() -> JobQueue:
+    """Return the process-wide job queue."""
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = JobQueue()
+        return _queue
+
+
+def _parse_time(value: Any) -> datetime:
+    try:
+        return datetime.fromisoformat(str(value))
+    except ValueError:
+        return datetime.min
+
+
+def _upload_dirs(payload: Dict[str, Any]) -> Iterator[str]:
+    """The ``upload_dir()`` folders holding a job's files (nothing outside them)."""
+    root = os.path.realpath(UPLOAD_FOLDER)
+    paths = list(payload.get("file_paths") or []) + [payload.get("file_path")]
+    folders = {os.path.realpath(os.path.dirname(path)) for path in paths if path}
+    for folder in sorted(folders):
+        if os.path.dirname(folder) == root and os.path.basename(folder).startswith("job-"):
+            yield folder
+
+
+def job_document_id(job_id: str, key: str) -> str:
+    """A stable document ``_id`` for what job *job_id* stores for *key* (e.g. a file hash)."""
+    return uuid.uuid5(uuid.NAMESPACE_URL, f"job/{job_id}/{key}").hex
+
+
+def upload_dir() -> str:
+    """Create and return a new directory under ``UPLOAD_FOLDER`` for one job's files."""
+    os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+    return tempfile.mkdtemp(prefix="job-", dir=UPLOAD_FOLDER)
+
+
+def job_response(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Public view of a job record (the payload stays server-side)."""
+    return {
+        "job_id": job["_id"],
+        "kind": job["kind"],
+        "status": job["status"],
+        "stage": job["stage"],
+        "result": job.get("result"),
+        "error": job.get("error"),
+        "created_at": job.get("created_at"),
+        "updated_at": job.get("updated_at"),
+        "stage_history": job.get("stage_history", []),
+    }
@@ -3,20 +3,59 @@ Lightweight JSON file-based store — drop-in replacement for MongoDB.
 
 Provides a ``JsonCollection`` class with the same API surface used
 by the route modules: ``find()``, ``find_one()``, ``insert_one()``,
-``update_one()``, ``delete_one()``.
+``insert_many()``, ``update_one()``, ``delete_one()``.
+
+Documents are held in memory, keyed by ``_id``.  Every mutation is
+appended as one JSON line to a write-ahead log (``<name>.wal``), so a
+write costs O(1) instead of re-serialising the whole collection.  Once
+the log grows past ``JSON_STORE_COMPACT_EVERY`` entries it is folded
+into the snapshot (``<name>.json``) by a background thread.  On startup
+the snapshot is loaded and any outstanding log entries are replayed.
+
+A collection is owned by one process: it holds an exclusive lock on
+``<name>.lock`` while open, and a second process opening the same
+collection gets ``CollectionLockedError`` instead of replaying (and
+removing) the live process's log.
+
+Equality queries are answered through hash indexes where possible:
+``_id`` is always a unique index, and further fields are declared with
+``create_index()``.  A small planner picks the most selective covering
+index and only falls back to a full scan when no queried field is
+indexed.
+
+``create_aggregate()`` keeps running per-group totals of a per-document
+measure (e.g. counts per trader) up to date on every insert, update and
+delete, so summary endpoints read them in O(groups) instead of scanning.
+
+``find_page()`` serves bounded slices for list endpoints: results can be
+projected to a subset of fields (or all but some, e.g.
+``["-extractedText"]``), ordered by one field, and resumed from an opaque
+keyset cursor, so a page never copies more than it returns.
 
 Data is persisted to ``backend/data/<collection_name>.json``.
 """
 
 from __future__ import annotations
 
+import base64
+import bisect
+import copy
+import heapq
+import itertools
 import json
 import os
+import shutil
+import tempfile
 import threading
 import uuid
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
 
-from config import DATA_DIR, get_logger
+from config import DATA_DIR, JSON_STORE_COMPACT_EVERY, get_logger
+
+try:
+    import fcntl
+except ImportError:  # Windows: in-process locking only
+    fcntl = None
 
 logger = get_logger(__name__)
 
@@ -26,37 +65,392 @@ _collections: Dict[str, "JsonCollection"] = {}
 
 def get_collection(name: str) -> "JsonCollection":
     """Return (or create) a named collection backed by a JSON file."""
-    if name not in _collections:
-        _collections[name] = JsonCollection(name)
-    return _collections[name]
+    with _lock:
+        if name not in _collections:
+            _collections[name] = JsonCollection(name)
+        return _collections[name]
+
+
+class DuplicateKeyError(ValueError):
+    """Raised when a write would violate a unique index."""
+
+
+class CollectionLockedError(RuntimeError):
+    """Raised when another process already has the collection open."""
+
+
+Projection = Union[Sequence[str], Dict[str, Any], None]
+SortSpec = Optional[Sequence[Tuple[str, int]]]
+# document -> {counter name: amount} contributed by that document
+Measure = Callable[[Dict[str, Any]], Dict[str, Union[int, float]]]
+
+
+def _sort_key(value: Any) -> Tuple[Any, ...]:
+    """Total-order key for mixed-type field values (None < numbers < strings < other)."""
+    if value is None:
+        return (0, 0)
+    if isinstance(value, (int, float)):
+        return (1, value)
+    if isinstance(value, str):
+        return (2, value)
+    return (3, json.dumps(value, sort_keys=True, default=str))
+
+
+def _encode_cursor(position: Tuple[Tuple[Any, ...], int], doc_id: Any) -> str:
+    raw = json.dumps({"k": list(position[0]), "s": position[1], "id": doc_id}, default=str)
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def _decode_cursor(cursor: str) -> Dict[str, Any]:
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return {"k": tuple(data["k"]), "s": int(data["s"]), "id": data.get("id")}
+    except (ValueError, KeyError, TypeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+
+
+def _hashable(value: Any) -> bool:
+    try:
+        hash(value)
+    except TypeError:
+        return False
+    return True
+
+
+class _HashIndex:
+    """Equality index mapping a field value to the ``_id``s that hold it.
+
+    Buckets are dicts used as ordered sets; an update moves a document to
+    the end of its new bucket, so callers order lookups by sequence number
+    to match a full scan.  Documents
+    whose value is unhashable (lists, dicts) are left out: they can never
+    equal a hashable query value, and unhashable query values bypass the
+    index.  Unique indexes ignore missing / ``None`` values.
+    """
+
+    def __init__(self, field: str, unique: bool = False) -> None:
+        self.field = field
+        self.unique = unique
+        self._buckets: Dict[Any, Dict[Any, None]] = {}
+
+    def add(self, doc: Dict[str, Any]) -> None:
+        value = doc.get(self.field)
+        if _hashable(value):
+            self._buckets.setdefault(value, {})[doc["_id"]] = None
+
+    def remove(self, doc: Dict[str, Any]) -> None:
+        value = doc.get(self.field)
+        if not _hashable(value):
+            return
+        bucket = self._buckets.get(value)
+        if bucket is not None:
+            bucket.pop(doc["_id"], None)
+            if not bucket:
+                del self._buckets[value]
+
+    def lookup(self, value: Any) -> Iterable[Any]:
+        return self._buckets.get(value, ())
+
+    def conflicts(self, doc: Dict[str, Any]) -> bool:
+        """Return True if *doc* would break this unique index."""
+        value = doc.get(self.field)
+        if not self.unique or value is None or not _hashable(value):
+            return False
+        return any(other != doc["_id"] for other in self._buckets.get(value, ()))
+
+
+class _Aggregate:
+    """Running totals of a per-document *measure*, grouped by one field.
+
+    Each group holds ``documents`` (how many documents it has) plus the
+    sum of every counter the measure returns.  Documents are added and
+    removed as they are written, so the totals always match a full scan.
+    Documents whose group value is missing or unhashable are left out.
+    """
+
+    def __init__(self, group_field: str, measure: Measure) -> None:
+        self.group_field = group_field
+        self.measure = measure
+        self._groups: Dict[Any, Dict[str, Union[int, float]]] = {}
+
+    def add(self, doc: Dict[str, Any]) -> None:
+        self._apply(doc, 1)
+
+    def remove(self, doc: Dict[str, Any]) -> None:
+        self._apply(doc, -1)
+
+    def _apply(self, doc: Dict[str, Any], sign: int) -> None:
+        key = doc.get(self.group_field)
+        if key is None or not _hashable(key):
+            return
+        totals = self._groups.setdefault(key, {"documents": 0})
+        totals["documents"] += sign
+        for counter, amount in self.measure(doc).items():
+            totals[counter] = totals.get(counter, 0) + sign * amount
+        if totals["documents"] <= 0:
+            del self._groups[key]
+
+    def get(self, key: Any) -> Optional[Dict[str, Union[int, float]]]:
+        totals = self._groups.get(key) if _hashable(key) else None
+        return dict(totals) if totals is not None else None
+
+    def all(self) -> Dict[Any, Dict[str, Union[int, float]]]:
+        return {key: dict(totals) for key, totals in self._groups.items()}
 
 
 class JsonCollection:
-    """A minimal MongoDB-like collection backed by a single JSON file."""
+    """A minimal MongoDB-like collection backed by a snapshot + write-ahead log."""
 
-    def __init__(self, name: str) -> None:
+    def __init__(self, name: str, compact_every: int = JSON_STORE_COMPACT_EVERY) -> None:
         self.name = name
         self._path = os.path.join(DATA_DIR, f"{name}.json")
+        self._wal_path = os.path.join(DATA_DIR, f"{name}.wal")
+        self._rotated_wal_path = self._wal_path + ".compacting"
+        self._lock_path = os.path.join(DATA_DIR, f"{name}.lock")
+        self._compact_every = max(1, compact_every)
+
+        self._lock = threading.RLock()
+        self._docs: Dict[Any, Dict[str, Any]] = {}
+        self._indexes: Dict[str, _HashIndex] = {}
+        self._aggregates: Dict[str, _Aggregate] = {}
+        # Insertion sequence numbers give a stable default order for keyset
+        # pagination.  ``_order_*`` are append-only parallel lists (bisectable
+        # by sequence); entries for deleted documents are pruned lazily.
+        self._seq: Dict[Any, int] = {}
+        self._next_seq = 0
+        self._order_seqs: List[int] = []
+        self._order_ids: List[Any] = []
+        self._wal_entries = 0
+        self._compacting = False
+
         os.makedirs(DATA_DIR, exist_ok=True)
-        if not os.path.exists(self._path):
-            self._write([])
+        self._lock_fh = self._acquire_process_lock()
+        self._load()
+        self._wal = open(self._wal_path, "a", encoding="utf-8")
 
     # ------------------------------------------------------------------
-    # Internal I/O
+    # Startup / recovery
     # ------------------------------------------------------------------
 
-    def _read(self) -> List[Dict[str, Any]]:
-        with _lock:
-            try:
-                with open(self._path, "r", encoding="utf-8") as fh:
-                    return json.load(fh)
-            except (json.JSONDecodeError, FileNotFoundError):
-                return []
+    def _acquire_process_lock(self):
+        """Lock ``<name>.lock`` for the life of the process, or fail fast.
+
+        The file stays open (and locked) until the process exits; ``_load``
+        removes the log files, which is only safe while no other process
+        is appending to them.
+        """
+        lock_fh = open(self._lock_path, "a")
+        if fcntl is None:
+            return lock_fh
+        try:
+            fcntl.flock(lock_fh, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_fh.close()
+            raise CollectionLockedError(
+                f"Collection {self.name} is open in another process ({self._lock_path})"
+            ) from None
+        return lock_fh
+
+    def _load(self) -> None:
+        """Load the snapshot, replay outstanding log entries, then fold them in."""
+        for doc in self._read_snapshot():
+            if "_id" not in doc:
+                doc["_id"] = uuid.uuid4().hex
+            if doc["_id"] in self._docs:
+                logger.warning("Duplicate _id %s in %s snapshot — keeping the last one", doc["_id"], self.name)
+            self._docs[doc["_id"]] = doc
+            self._assign_seq(doc["_id"])
+
+        replayed = 0
+        for path in (self._rotated_wal_path, self._wal_path):
+            replayed += self._replay(path)
+
+        if replayed or not os.path.exists(self._path):
+            self._write_snapshot(json.dumps(list(self._docs.values()), indent=2, ensure_ascii=False))
+        for path in (self._rotated_wal_path, self._wal_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+        logger.debug("Loaded %d documents into %s (%d log entries replayed)", len(self._docs), self.name, replayed)
+
+    def _read_snapshot(self) -> List[Dict[str, Any]]:
+        try:
+            with open(self._path, "r", encoding="utf-8") as fh:
+                docs = json.load(fh)
+        except FileNotFoundError:
+            return []
+        except json.JSONDecodeError:
+            logger.exception("Corrupt snapshot for %s — starting empty", self.name)
+            return []
+        return [d for d in docs if isinstance(d, dict)]
+
+    def _replay(self, path: str) -> int:
+        """Apply every entry in the log at *path*; entries are idempotent."""
+        if not os.path.exists(path):
+            return 0
+        count = 0
+        with open(path, "r", encoding="utf-8") as fh:
+            for lineno, line in enumerate(fh, 1):
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # A torn final line after a crash — everything before it is intact.
+                    logger.warning("Skipping unreadable log entry %s:%d", path, lineno)
+                    continue
+                self._apply(entry)
+                count += 1
+        return count
+
+    def _apply(self, entry: Dict[str, Any]) -> None:
+        op = entry.get("op")
+        if op == "insert":
+            doc = entry["doc"]
+            old = self._docs.get(doc["_id"])
+            if old is not None:
+                self._unindex(old)
+            self._docs[doc["_id"]] = doc
+            self._assign_seq(doc["_id"])
+            self._index(doc)
+        elif op == "update":
+            old = self._docs.get(entry["_id"])
+            if old is not None:
+                doc = {**old, **entry["set"]}
+                self._docs[entry["_id"]] = doc
+                self._reindex(old, doc, entry["set"])
+        elif op == "delete":
+            old = self._docs.pop(entry["_id"], None)
+            if old is not None:
+                self._seq.pop(entry["_id"], None)
+                self._unindex(old)
+        else:
+            logger.warning("Unknown log operation %r in %s", op, self.name)
+
+    # ------------------------------------------------------------------
+    # Index maintenance
+    # ------------------------------------------------------------------
 
-    def _write(self, docs: List[Dict[str, Any]]) -> None:
-        with _lock:
-            with open(self._path, "w", encoding="utf-8") as fh:
-                json.dump(docs, fh, indent=2, ensure_ascii=False, default=str)
+    def _assign_seq(self, doc_id: Any) -> None:
+        if doc_id in self._seq:
+            return
+        self._seq[doc_id] = self._next_seq
+        self._order_seqs.append(self._next_seq)
+        self._order_ids.append(doc_id)
+        self._next_seq += 1
+
+    def _prune_order(self) -> None:
+        """Drop sequence entries for deleted documents once they dominate."""
+        if len(self._order_ids) <= 2 * len(self._seq):
+            return
+        live = [(s, i) for s, i in zip(self._order_seqs, self._order_ids) if self._seq.get(i) == s]
+        self._order_seqs = [s for s, _ in live]
+        self._order_ids = [i for _, i in live]
+
+    def _index(self, doc: Dict[str, Any]) -> None:
+        for index in self._indexes.values():
+            index.add(doc)
+        for aggregate in self._aggregates.values():
+            aggregate.add(doc)
+
+    def _unindex(self, doc: Dict[str, Any]) -> None:
+        for index in self._indexes.values():
+            index.remove(doc)
+        for aggregate in self._aggregates.values():
+            aggregate.remove(doc)
+
+    def _reindex(self, old: Dict[str, Any], new: Dict[str, Any], changed: Dict[str, Any]) -> None:
+        for field in changed:
+            index = self._indexes.get(field)
+            if index is not None and old.get(field) != new.get(field):
+                index.remove(old)
+                index.add(new)
+        # A measure may read any field, so aggregates always re-count.
+        for aggregate in self._aggregates.values():
+            aggregate.remove(old)
+            aggregate.add(new)
+
+    def _check_unique(self, doc: Dict[str, Any], fields: Iterable[str]) -> None:
+        for field in fields:
+            index = self._indexes.get(field)
+            if index is not None and index.conflicts(doc):
+                raise DuplicateKeyError(
+                    f"Duplicate value {doc.get(field)!r} for unique field {field!r} in {self.name}"
+                )
+
+    # ------------------------------------------------------------------
+    # Internal I/O
+    # ------------------------------------------------------------------
+
+    def _log(self, entry: Dict[str, Any]) -> Dict[str, Any]:
+        """Append *entry* to the write-ahead log and return its JSON-normalised form.
+
+        Must be called with ``self._lock`` held.  The returned entry has been
+        through ``json.dumps(default=str)`` so in-memory state matches what a
+        restart would reload.
+        """
+        return self._log_many([entry])[0]
+
+    def _log_many(self, entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Append several entries with a single write and flush."""
+        lines = [json.dumps(entry, ensure_ascii=False, default=str) for entry in entries]
+        self._wal.write("".join(line + "\n" for line in lines))
+        self._wal.flush()
+        self._wal_entries += len(lines)
+        return [json.loads(line) for line in lines]
+
+    def _maybe_compact(self) -> None:
+        """Start a background compaction once the log is long enough."""
+        if self._wal_entries < self._compact_every or self._compacting:
+            return
+        self._compacting = True
+        self._prune_order()
+        # Documents are replaced, never mutated in place, so a shallow copy of
+        # the values is a consistent snapshot that can be serialised unlocked.
+        docs = list(self._docs.values())
+        self._wal.close()
+        if os.path.exists(self._rotated_wal_path):
+            # A failed compaction left its log behind, not yet in the
+            # snapshot: fold this log into it rather than overwrite it.
+            with open(self._wal_path, "rb") as src, open(self._rotated_wal_path, "ab") as dst:
+                shutil.copyfileobj(src, dst)
+                dst.flush()
+                os.fsync(dst.fileno())
+            os.remove(self._wal_path)
+        else:
+            os.replace(self._wal_path, self._rotated_wal_path)
+        self._wal = open(self._wal_path, "a", encoding="utf-8")
+        self._wal_entries = 0
+        threading.Thread(
+            target=self._compact,
+            args=(docs,),
+            name=f"json-store-compact-{self.name}",
+            daemon=True,
+        ).start()
+
+    def _compact(self, docs: List[Dict[str, Any]]) -> None:
+        try:
+            self._write_snapshot(json.dumps(docs, indent=2, ensure_ascii=False))
+            os.remove(self._rotated_wal_path)
+            logger.debug("Compacted %s (%d documents)", self.name, len(docs))
+        except Exception:
+            # The rotated log is kept and replayed on the next startup.
+            logger.exception("Compaction failed for %s", self.name)
+        finally:
+            with self._lock:
+                self._compacting = False
+
+    def _write_snapshot(self, payload: str) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=DATA_DIR, prefix=f"{self.name}.", suffix=".json.tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                fh.write(payload)
+                fh.flush()
+                os.fsync(fh.fileno())
+            os.replace(tmp_path, self._path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
 
     # ------------------------------------------------------------------
     # Query helpers
@@ -70,61 +464,384 @@ class JsonCollection:
                 return False
         return True
 
+    def _plan(self, query: Dict[str, Any]) -> Tuple[str, Iterable[Dict[str, Any]]]:
+        """Pick an access path for *query* and return ``(plan, candidates)``.
+
+        Candidates are a superset of the matches, in insertion order like a
+        full scan; callers still filter them with ``_matches`` for the
+        fields the chosen index does not cover.
+        """
+        if "_id" in query and _hashable(query["_id"]):
+            doc = self._docs.get(query["_id"])
+            return "_id", ([doc] if doc is not None else [])
+
+        best: Optional[Tuple[str, Iterable[Any]]] = None
+        for field, value in query.items():
+            index = self._indexes.get(field)
+            if index is None or not _hashable(value):
+                continue
+            ids = index.lookup(value)
+            if best is None or len(ids) < len(best[1]):
+                best = (field, ids)
+
+        if best is None:
+            return "scan", self._docs.values()
+        ids = sorted(best[1], key=self._seq.__getitem__)
+        return best[0], [self._docs[_id] for _id in ids]
+
+    def _iter_matches(self, query: Optional[Dict[str, Any]]) -> Iterable[Dict[str, Any]]:
+        if not query:
+            return iter(self._docs.values())
+        plan, candidates = self._plan(query)
+        logger.debug("Query on %s using plan %s", self.name, plan)
+        return (d for d in candidates if self._matches(d, query))
+
+    def _first_match(self, query: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        return next(iter(self._iter_matches(query)), None)
+
+    def _position(self, doc: Dict[str, Any], field: Optional[str]) -> Tuple[Tuple[Any, ...], int]:
+        key = _sort_key(doc.get(field)) if field else ()
+        return key, self._seq[doc["_id"]]
+
+    def _resolve_cursor(self, cursor: str, field: Optional[str]) -> Tuple[Tuple[Any, ...], int]:
+        """Turn a cursor into a keyset position.
+
+        The sequence number of a document that still exists is taken live,
+        because sequence numbers are reassigned when the store restarts.
+        """
+        data = _decode_cursor(cursor)
+        seq = self._seq.get(data["id"], data["s"]) if _hashable(data["id"]) else data["s"]
+        return data["k"], seq
+
+    def _select(
+        self,
+        query: Optional[Dict[str, Any]],
+        sort: SortSpec,
+        limit: int,
+        after: Optional[str],
+    ) -> List[Dict[str, Any]]:
+        """Return references to the matching documents for one page.
+
+        Must be called with ``self._lock`` held.  Memory is O(limit) for
+        sorted pages (via a bounded heap) and for insertion-order pages
+        (via early exit); only the result references are materialised.
+        """
+        field: Optional[str] = None
+        direction = 1
+        if sort:
+            if len(sort) > 1:
+                raise ValueError("Sorting on more than one field is not supported")
+            field, direction = sort[0]
+            direction = -1 if direction < 0 else 1
+
+        bound = self._resolve_cursor(after, field) if after else None
+
+        if field is None:
+            if not query:
+                start = bisect.bisect_right(self._order_seqs, bound[1]) if bound else 0
+                ids = itertools.islice(self._order_ids, start, None)
+                candidates: Iterable[Dict[str, Any]] = (
+                    self._docs[i] for s, i in zip(itertools.islice(self._order_seqs, start, None), ids)
+                    if self._seq.get(i) == s
+                )
+            else:
+                candidates = self._iter_matches(query)
+                if bound:
+                    candidates = (d for d in candidates if self._seq[d["_id"]] > bound[1])
+            if limit:
+                candidates = itertools.islice(candidates, limit)
+            return list(candidates)
+
+        candidates = self._iter_matches(query)
+        if bound:
+            if direction > 0:
+                candidates = (d for d in candidates if self._position(d, field) > bound)
+            else:
+                candidates = (d for d in candidates if self._position(d, field) < bound)
+
+        def key(d: Dict[str, Any]) -> Tuple[Tuple[Any, ...], int]:
+            return self._position(d, field)
+
+        if limit:
+            pick = heapq.nsmallest if direction > 0 else heapq.nlargest
+            return pick(limit, candidates, key=key)
+        return sorted(candidates, key=key, reverse=direction < 0)
+
+    @staticmethod
+    def _compile_projection(projection: Projection) -> Tuple[bool, List[str], bool]:
+        """``(exclude, fields, keep_id)`` for a projection.
+
+        A list names the fields to keep, or — when every entry starts with
+        ``-`` — the fields to drop.  A dict follows pymongo: ``{field: 1}``
+        keeps, ``{field: 0}`` drops; ``_id`` may be dropped either way.
+        Raises ``ValueError`` for a projection mixing both.
+        """
+        if isinstance(projection, dict):
+            keep_id = bool(projection.get("_id", 1))
+            flags = {f: bool(keep) for f, keep in projection.items() if f != "_id"}
+            if len(set(flags.values())) > 1:
+                raise ValueError("A projection cannot both include and exclude fields")
+            exclude = not any(flags.values()) and (bool(flags) or not keep_id)
+            return exclude, list(flags), keep_id
+
+        names = [f for f in projection if f]
+        dropped = [f[1:] for f in names if f.startswith("-")]
+        if dropped and len(dropped) != len(names):
+            raise ValueError("A projection cannot both include and exclude fields")
+        if dropped:
+            return True, [f for f in dropped if f != "_id"], "_id" not in dropped
+        return False, [f for f in names if f != "_id"], True
+
+    @classmethod
+    def _project(cls, doc: Dict[str, Any], projection: Projection) -> Dict[str, Any]:
+        """Deep-copy *doc*, keeping only the projected fields (``_id`` by default)."""
+        if not projection:
+            return copy.deepcopy(doc)
+        exclude, fields, keep_id = cls._compile_projection(projection)
+        if exclude:
+            dropped = set(fields)
+            if not keep_id:
+                dropped.add("_id")
+            return {f: copy.deepcopy(v) for f, v in doc.items() if f not in dropped}
+        out: Dict[str, Any] = {"_id": doc["_id"]} if keep_id and "_id" in doc else {}
+        for f in fields:
+            if f in doc:
+                out[f] = copy.deepcopy(doc[f])
+        return out
+
+    # ------------------------------------------------------------------
+    # Index and aggregate management
+    # ------------------------------------------------------------------
+
+    def create_index(self, field: str, unique: bool = False) -> str:
+        """Declare a hash index on *field* (idempotent) and return its name.
+
+        Building a unique index over data that already holds duplicates
+        logs an error and keeps the index non-unique, so a bad row cannot
+        stop the server from starting.
+        """
+        with self._lock:
+            existing = self._indexes.get(field)
+            if existing is not None and existing.unique == unique:
+                return field
+
+            index = _HashIndex(field, unique=False)
+            for doc in self._docs.values():
+                index.add(doc)
+
+            if unique:
+                dupes = [
+                    value for value, ids in index._buckets.items()
+                    if value is not None and len(ids) > 1
+                ]
+                if dupes:
+                    logger.error(
+                        "Cannot enforce unique index %s.%s — duplicate values %s",
+                        self.name, field, dupes[:5],
+                    )
+                else:
+                    index.unique = True
+
+            self._indexes[field] = index
+            logger.debug("Created %sindex on %s.%s", "unique " if index.unique else "", self.name, field)
+            return field
+
+    def create_aggregate(self, name: str, group_field: str, measure: Measure) -> str:
+        """Declare running totals of *measure* per value of *group_field*.
+
+        *measure* maps a document to ``{counter: amount}``; it must depend
+        only on the document.  The totals are built from the current
+        documents and then maintained on every write.  Redeclaring *name*
+        rebuilds it.
+        """
+        with self._lock:
+            aggregate = _Aggregate(group_field, measure)
+            for doc in self._docs.values():
+                aggregate.add(doc)
+            self._aggregates[name] = aggregate
+            logger.debug("Created aggregate %s on %s.%s", name, self.name, group_field)
+            return name
+
+    def aggregate(self, name: str, key: Any) -> Optional[Dict[str, Union[int, float]]]:
+        """Return the totals of aggregate *name* for group *key*, or ``None``.
+
+        Raises ``KeyError`` if no aggregate *name* was declared.
+        """
+        with self._lock:
+            return self._aggregates[name].get(key)
+
+    def aggregates(self, name: str) -> Dict[Any, Dict[str, Union[int, float]]]:
+        """Return the totals of aggregate *name* for every group."""
+        with self._lock:
+            return self._aggregates[name].all()
+
     # ------------------------------------------------------------------
     # Public API (MongoDB-compatible subset)
     # ------------------------------------------------------------------
 
-    def find(self, query: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
-        """Return all documents matching *query* (or all if query is None)."""
-        docs = self._read()
-        if not query:
-            return docs
-        return [d for d in docs if self._matches(d, query)]
+    def find(
+        self,
+        query: Optional[Dict[str, Any]] = None,
+        projection: Projection = None,
+        sort: SortSpec = None,
+        limit: int = 0,
+    ) -> List[Dict[str, Any]]:
+        """Return all documents matching *query* (or all if query is None).
+
+        *projection* (a field list, ``-field`` exclusions, or a
+        pymongo-style ``{field: 1}`` / ``{field: 0}`` dict),
+        *sort* (``[(field, 1 | -1)]``) and *limit* behave like pymongo's.
+        """
+        docs, _ = self.find_page(query, projection=projection, sort=sort, limit=limit)
+        return list(docs)
+
+    def find_page(
+        self,
+        query: Optional[Dict[str, Any]] = None,
+        *,
+        projection: Projection = None,
+        sort: SortSpec = None,
+        limit: int = 0,
+        after: Optional[str] = None,
+    ) -> Tuple[Iterator[Dict[str, Any]], Optional[str]]:
+        """Return ``(documents, next_cursor)`` for one page of results.
+
+        *documents* is a lazy iterator that copies (and projects) each
+        document only as it is consumed, so a caller streaming the result
+        never holds more than one copied document.  *next_cursor* is an
+        opaque token to pass back as *after*, or ``None`` on the last page.
+
+        Raises ``ValueError`` for a malformed cursor, an unsupported sort
+        or a projection that both includes and excludes fields.
+        """
+        if projection:
+            self._compile_projection(projection)  # validate before the page is consumed
+        field = sort[0][0] if sort else None
+        with self._lock:
+            page = self._select(query, sort, limit + 1 if limit else 0, after)
+            next_cursor = None
+            if limit and len(page) > limit:
+                page = page[:limit]
+                last = page[-1]
+                next_cursor = _encode_cursor(self._position(last, field), last["_id"])
+        # Stored documents are replaced, never mutated, so copying them
+        # outside the lock is safe.
+        return (self._project(d, projection) for d in page), next_cursor
+
+    def cursor_after(self, doc_id: Any, sort: SortSpec = None) -> str:
+        """Return a cursor positioned just after the document *doc_id*.
+
+        Raises ``KeyError`` if no such document exists.
+        """
+        field = sort[0][0] if sort else None
+        with self._lock:
+            doc = self._docs.get(doc_id) if _hashable(doc_id) else None
+            if doc is None:
+                raise KeyError(doc_id)
+            return _encode_cursor(self._position(doc, field), doc_id)
 
     def find_one(self, query: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Return the first document matching *query*, or None."""
-        for doc in self._read():
-            if self._matches(doc, query):
-                return doc
-        return None
+        with self._lock:
+            return copy.deepcopy(self._first_match(query))
 
     def insert_one(self, document: Dict[str, Any]) -> "_InsertResult":
         """Insert a document, auto-generating an ``_id`` if missing."""
         if "_id" not in document:
             document["_id"] = uuid.uuid4().hex
-        docs = self._read()
-        docs.append(document)
-        self._write(docs)
+        with self._lock:
+            if document["_id"] in self._docs:
+                raise DuplicateKeyError(f"Duplicate _id {document['_id']!r} in {self.name}")
+            self._check_unique(document, document.keys())
+            entry = self._log({"op": "insert", "doc": document})
+            self._apply(entry)
+            self._maybe_compact()
         logger.debug("Inserted document %s into %s", document["_id"], self.name)
         return _InsertResult(document["_id"])
 
-    def update_one(self, query: Dict[str, Any], update: Dict[str, Any]) -> "_UpdateResult":
-        """Update the first document matching *query*."""
-        docs = self._read()
-        matched = 0
-        modified = 0
+    def insert_many(self, documents: Sequence[Dict[str, Any]]) -> "_InsertManyResult":
+        """Insert several documents with one log write.
+
+        The batch is all-or-nothing: if any document has a duplicate
+        ``_id`` or breaks a unique index (against stored documents or an
+        earlier one in the batch), nothing is inserted.
+        """
+        for document in documents:
+            if "_id" not in document:
+                document["_id"] = uuid.uuid4().hex
+        if not documents:
+            return _InsertManyResult([])
+
+        with self._lock:
+            unique = [index for index in self._indexes.values() if index.unique]
+            seen_ids: set = set()
+            seen: Dict[str, set] = {index.field: set() for index in unique}
+            for document in documents:
+                if document["_id"] in self._docs or document["_id"] in seen_ids:
+                    raise DuplicateKeyError(f"Duplicate _id {document['_id']!r} in {self.name}")
+                seen_ids.add(document["_id"])
+                self._check_unique(document, document.keys())
+                for index in unique:
+                    value = document.get(index.field)
+                    if value is None or not _hashable(value):
+                        continue
+                    if value in seen[index.field]:
+                        raise DuplicateKeyError(
+                            f"Duplicate value {value!r} for unique field {index.field!r} in {self.name}"
+                        )
+                    seen[index.field].add(value)
+
+            entries = self._log_many([{"op": "insert", "doc": document} for document in documents])
+            for entry in entries:
+                self._apply(entry)
+            self._maybe_compact()
+        logger.debug("Inserted %d documents into %s", len(documents), self.name)
+        return _InsertManyResult([document["_id"] for document in documents])
+
+    def update_one(
+        self,
+        query: Dict[str, Any],
+        update: Dict[str, Any],
+        upsert: bool = False,
+    ) -> "_UpdateResult":
+        """Update the first document matching *query*.
+
+        With *upsert*, a missing document is inserted from the query's
+        fields plus the update.
+        """
         set_data = update.get("$set", update)
-
-        for doc in docs:
-            if self._matches(doc, query):
-                matched = 1
-                doc.update(set_data)
-                modified = 1
-                break
-
-        if modified:
-            self._write(docs)
-        return _UpdateResult(matched, modified)
+        with self._lock:
+            doc = self._first_match(query)
+            if doc is None:
+                if not upsert:
+                    return _UpdateResult(0, 0)
+                result = self.insert_one({**query, **set_data})
+                return _UpdateResult(0, 0, upserted_id=result.inserted_id)
+            self._check_unique({**doc, **set_data}, set_data.keys())
+            entry = self._log({"op": "update", "_id": doc["_id"], "set": set_data})
+            self._apply(entry)
+            self._maybe_compact()
+        return _UpdateResult(1, 1)
 
     def delete_one(self, query: Dict[str, Any]) -> "_DeleteResult":
         """Delete the first document matching *query*."""
-        docs = self._read()
-        for i, doc in enumerate(docs):
-            if self._matches(doc, query):
-                docs.pop(i)
-                self._write(docs)
-                return _DeleteResult(1)
-        return _DeleteResult(0)
+        with self._lock:
+            doc = self._first_match(query)
+            if doc is None:
+                return _DeleteResult(0)
+            self._apply(self._log({"op": "delete", "_id": doc["_id"]}))
+            self._maybe_compact()
+        return _DeleteResult(1)
+
+    def close(self) -> None:
+        """Close the log and release the collection's lock.
+
+        The collection must not be used afterwards (``get_collection``
+        keeps returning it; this is for tools and tests that reopen it).
+        """
+        with self._lock:
+            self._wal.close()
+            self._lock_fh.close()
 
 
 # ------------------------------------------------------------------
@@ -137,10 +854,17 @@ class _InsertResult:
         self.acknowledged = True
 
 
+class _InsertManyResult:
+    def __init__(self, inserted_ids: List[str]) -> None:
+        self.inserted_ids = inserted_ids
+        self.acknowledged = True
+
+
 class _UpdateResult:
-    def __init__(self, matched_count: int, modified_count: int) -> None:
+    def __init__(self, matched_count: int, modified_count: int, upserted_id: Optional[str] = None) -> None:
         self.matched_count = matched_count
         self.modified_count = modified_count
+        self.upserted_id = upserted_id
 
 
 class _DeleteResult:
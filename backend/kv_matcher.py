@@ -0,0 +1,217 @@
+"""
+Precompiled key-value matcher for term sheet page text.
+
+``PDFExtractor`` used to build and run three regexes per known key per
+page (``Key: value``, ``• Key: value`` and ``Key = value``) and then a
+bullet-pair ``findall``.  ``KeyValueMatcher`` compiles everything once
+and locates every occurrence of every key in a single scan, then
+resolves each key's value with short anchored matches at the positions
+found.
+
+The scan runs case-sensitively over a lower-cased copy of the page,
+which is several times faster than an ``IGNORECASE`` alternation.  Every
+hit is re-checked against the exact case-insensitive key pattern, and
+pages where lower-casing would shift offsets (or schemas with non-ASCII
+keys) fall back to an ``IGNORECASE`` scan.  Keys are compiled into a prefix trie rather than a
+flat ``a|b|c`` alternation, so the scan cost grows with key length, not
+with the number of keys in the schema.
+
+The output is identical to the per-key regex loop: for each key, the
+``Key: value`` form is tried first at the leftmost occurrence where it
+matches, then the bulleted form, then ``Key = value``; a value must be
+longer than one character after stripping.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+# Tails of the three legacy patterns, anchored just after a key occurrence
+_COLON_TAIL = re.compile(r":?\s*([^•\n]+)")
+_EQUALS_TAIL = re.compile(r"\s*=\s*([^•\n]+)")
+
+_BULLET_PAIR = re.compile(r"[•]\s*([^:]+):\s*([^•\n]+)")
+DEFAULT_TRADE_ID_PATTERN = r"Trade ID:?\s*(TRADE-[^\s]+)"
+
+# Characters that ``re.IGNORECASE`` equates with an ASCII letter although
+# ``str.lower()`` does not map them to it.
+_ASCII_FOLD_CHARS = "İıſ"
+_ASCII_FOLD = str.maketrans(dict.fromkeys("İı", "i") | {"ſ": "s"})
+
+_KEY_PREFIX = re.compile(r"^(?:\d+\.\s*)?(?:[•]\s*)?")
+_WHITESPACE = re.compile(r"\s+")
+_TRAILING_NUMBERED = re.compile(r"\s*\d+\.\s*.*$")
+
+
+def _trie_pattern(words: Iterable[str]) -> str:
+    """Return a regex matching any of *words*, factored into a prefix trie.
+
+    ``sre`` tries the branches of ``a|b|c`` one by one at each text
+    position; in the trie form at most one branch can match the next
+    character, so the work per position is bounded by key length.  Greedy
+    optional groups make the longest word at a position win.
+    """
+    trie: Dict[str, Any] = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node: Dict[str, Any]) -> str:
+        branches = [re.escape(ch) + build(child) for ch, child in node.items() if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+
+class KeyValueMatcher:
+    """Find values for a fixed list of *keys* in page text."""
+
+    def __init__(self, keys: Sequence[str], trade_id_pattern: str = DEFAULT_TRADE_ID_PATTERN) -> None:
+        self.keys: List[str] = list(dict.fromkeys(keys))
+        self._key_res = {k: re.compile(re.escape(k), re.IGNORECASE) for k in self.keys}
+        self._trade_id = re.compile(trade_id_pattern)
+
+        # Zero-width lookaheads so overlapping occurrences are all reported;
+        # each hit captures the longest key starting at that position.
+        self._slow_scan = None
+        self._fast_scan = None
+        if self.keys:
+            self._slow_scan = re.compile("(?=({}))".format(_trie_pattern(self.keys)), re.IGNORECASE)
+            if all(k.isascii() and len(k.lower()) == len(k) for k in self.keys):
+                self._fast_scan = re.compile("(?=({}))".format(_trie_pattern(k.lower() for k in self.keys)))
+
+        # A key occurring at a position implies every key that is a
+        # (case-insensitive) prefix of it may occur there too.
+        by_lower: Dict[str, List[str]] = {}
+        for key in self.keys:
+            by_lower.setdefault(key.lower(), []).append(key)
+        self._prefix_keys: Dict[str, List[str]] = {
+            lower: [k for n in range(1, len(lower) + 1) for k in by_lower.get(lower[:n], ())]
+            for lower in by_lower
+        }
+
+    # ------------------------------------------------------------------
+    # Scanning
+    # ------------------------------------------------------------------
+
+    def _occurrences(self, text: str) -> Dict[str, List[int]]:
+        """Return the start offsets of every key occurrence, in text order."""
+        if self._slow_scan is None:
+            return {}
+        if self._fast_scan is not None:
+            # str.translate is slow; only pay for it when a folded char is present.
+            if any(ch in text for ch in _ASCII_FOLD_CHARS):
+                folded = text.translate(_ASCII_FOLD).lower()
+            else:
+                folded = text.lower()
+            if len(folded) == len(text):
+                return self._fast_occurrences(text, folded)
+        return self._slow_occurrences(text)
+
+    def _fast_occurrences(self, text: str, folded: str) -> Dict[str, List[int]]:
+        # Lower-case ASCII trie branches are disjoint, so the captured key
+        # determines exactly which keys can start at this position.
+        found: Dict[str, List[int]] = {}
+        for match in self._fast_scan.finditer(folded):
+            pos = match.start()
+            for key in self._prefix_keys[match.group(1)]:
+                if self._key_res[key].match(text, pos):
+                    found.setdefault(key, []).append(pos)
+        return found
+
+    def _slow_occurrences(self, text: str) -> Dict[str, List[int]]:
+        # Under IGNORECASE several branches may match and the capture need
+        # not be the longest key, so every key is verified at each hit.
+        found: Dict[str, List[int]] = {}
+        for match in self._slow_scan.finditer(text):
+            pos = match.start()
+            for key in self.keys:
+                if self._key_res[key].match(text, pos):
+                    found.setdefault(key, []).append(pos)
+        return found
+
+    @staticmethod
+    def _after_bullet(text: str, pos: int) -> bool:
+        """True if ``[•]\\s*`` ends exactly at *pos*."""
+        i = pos - 1
+        while i >= 0 and text[i].isspace():
+            i -= 1
+        return i >= 0 and text[i] == "•"
+
+    def _resolve(self, text: str, key: str, positions: List[int]) -> Optional[str]:
+        """Apply the three legacy patterns, in order, at the known positions."""
+        end = len(key)
+
+        for pos in positions:
+            match = _COLON_TAIL.match(text, pos + end)
+            if match:
+                value = match.group(1).strip()
+                if len(value) > 1:
+                    return value
+                break
+
+        for pos in positions:
+            if not self._after_bullet(text, pos):
+                continue
+            match = _COLON_TAIL.match(text, pos + end)
+            if match:
+                value = match.group(1).strip()
+                if len(value) > 1:
+                    return value
+                break
+
+        for pos in positions:
+            match = _EQUALS_TAIL.match(text, pos + end)
+            if match:
+                value = match.group(1).strip()
+                if len(value) > 1:
+                    return value
+                break
+
+        return None
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def match_keys(self, text: str) -> Dict[str, str]:
+        """Return ``{key: value}`` for the known keys found in *text*, in key order."""
+        occurrences = self._occurrences(text)
+        values: Dict[str, str] = {}
+        for key in self.keys:
+            positions = occurrences.get(key)
+            if positions:
+                value = self._resolve(text, key, positions)
+                if value is not None:
+                    values[key] = value
+        return values
+
+    @staticmethod
+    def bullet_pairs(text: str) -> Iterable[tuple]:
+        """Yield stripped ``(key, value)`` pairs from ``• Key: value`` lines."""
+        for key, value in _BULLET_PAIR.findall(text):
+            yield key.strip(), value.strip()
+
+    def trade_id(self, text: str) -> Optional[str]:
+        match = self._trade_id.search(text)
+        return match.group(1) if match else None
+
+    @staticmethod
+    def clean_pairs(pairs: Dict[str, str]) -> Dict[str, str]:
+        """Strip numbering / bullets from keys and normalise whitespace in values."""
+        cleaned: Dict[str, str] = {}
+        for key, value in pairs.items():
+            clean_key = _KEY_PREFIX.sub("", key, count=1).strip()
+
+            clean_value = _WHITESPACE.sub(" ", value).strip()
+            clean_value = _TRAILING_NUMBERED.sub("", clean_value)
+
+            if clean_key and clean_value and len(clean_value) > 1:
+                cleaned[clean_key] = clean_value
+        return cleaned
@@ -0,0 +1,194 @@
+"""
+Content-addressed cache for LLM classification and extraction results.
+
+Classifying and extracting a termsheet costs several seconds and API
+quota per call, and the same PDF is often uploaded or re-run more than
+once.  Results are cached in the ``llm_cache`` JSON collection under a
+key derived from:
+
+* the SHA-256 of the whitespace-normalised termsheet text,
+* the kind of call (``"classify"`` / ``"extract"``),
+* the derivative type (for extraction),
+* the model name, and
+* the prompt version — bump a module's ``PROMPT_VERSION`` whenever its
+  prompt changes so old answers are not reused.
+
+Entries expire after ``LLM_CACHE_TTL_SECONDS`` and the least recently
+used ones are evicted beyond ``LLM_CACHE_MAX_ENTRIES``.  Hit / miss
+counters are kept per process and exposed via ``stats()``.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+from config import LLM_CACHE_MAX_ENTRIES, LLM_CACHE_TTL_SECONDS, get_logger
+from json_store import get_collection
+
+logger = get_logger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def text_sha256(text: str) -> str:
+    """Hash of *text* with runs of whitespace collapsed and ends stripped."""
+    normalised = _WHITESPACE.sub(" ", text).strip()
+    return hashlib.sha256(normalised.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """Persistent LRU / TTL cache of LLM results."""
+
+    def __init__(
+        self,
+        collection_name: str = "llm_cache",
+        max_entries: int = LLM_CACHE_MAX_ENTRIES,
+        ttl_seconds: float = LLM_CACHE_TTL_SECONDS,
+    ) -> None:
+        self._collection = get_collection(collection_name)
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "expired": 0, "evicted": 0}
+
+        # key → None, least recently used first
+        self._lru: "OrderedDict[str, None]" = OrderedDict()
+        entries = sorted(self._collection.find(), key=lambda d: d.get("last_used", 0))
+        for entry in entries:
+            self._lru[entry["_id"]] = None
+        with self._lock:
+            self._evict()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    @staticmethod
+    def make_key(kind: str, text: str, model: str, prompt_version: str, derivative_type: str = "") -> str:
+        payload = json.dumps([kind, text_sha256(text), derivative_type, model, prompt_version])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    # ------------------------------------------------------------------
+    # Internal helpers (call with self._lock held)
+    # ------------------------------------------------------------------
+
+    def _expired(self, entry: Dict[str, Any], now: float) -> bool:
+        return self.ttl_seconds > 0 and now - entry.get("created_at", 0) > self.ttl_seconds
+
+    def _drop(self, key: str) -> None:
+        self._lru.pop(key, None)
+        self._collection.delete_one({"_id": key})
+
+    def _evict(self) -> None:
+        while len(self._lru) > max(self.max_entries, 0):
+            key = next(iter(self._lru))
+            self._drop(key)
+            self._counters["evicted"] += 1
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value for *key*, or ``None`` on a miss."""
+        if not self.enabled:
+            return None
+        now = time.time()
+        with self._lock:
+            entry = self._collection.find_one({"_id": key}) if key in self._lru else None
+            if entry is not None and self._expired(entry, now):
+                self._drop(key)
+                self._counters["expired"] += 1
+                entry = None
+            if entry is None:
+                self._counters["misses"] += 1
+                return None
+            self._counters["hits"] += 1
+            self._lru.move_to_end(key)
+            self._collection.update_one({"_id": key}, {"$set": {"last_used": now}})
+            return entry["value"]
+
+    def put(self, key: str, value: Any, **meta: Any) -> None:
+        """Store *value* under *key*; *meta* is saved alongside for inspection."""
+        if not self.enabled:
+            return
+        now = time.time()
+        with self._lock:
+            self._collection.update_one(
+                {"_id": key},
+                {"$set": {**meta, "value": value, "created_at": now, "last_used": now}},
+                upsert=True,
+            )
+            self._lru[key] = None
+            self._lru.move_to_end(key)
+            self._evict()
+
+    def get_or_compute(
+        self,
+        kind: str,
+        text: str,
+        model: str,
+        prompt_version: str,
+        compute: Callable[[], Any],
+        derivative_type: str = "",
+        cacheable: Callable[[Any], bool] = lambda value: True,
+    ) -> Any:
+        """Return the cached result, or call *compute* and cache what it returns.
+
+        Results rejected by *cacheable* (e.g. a response that could not be
+        parsed) are returned but not stored, so the next call retries.
+        """
+        key = self.make_key(kind, text, model, prompt_version, derivative_type)
+        value = self.get(key)
+        if value is not None:
+            logger.debug("LLM cache hit: %s %s (%s)", kind, derivative_type or "-", key[:12])
+            return value
+
+        value = compute()
+        if value is not None and cacheable(value):
+            self.put(
+                key, value,
+                kind=kind, model=model, prompt_version=prompt_version,
+                derivative_type=derivative_type, text_sha256=text_sha256(text),
+            )
+        return value
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+            size = len(self._lru)
+        lookups = counters["hits"] + counters["misses"]
+        return {
+            **counters,
+            "entries": size,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hit_rate": round(counters["hits"] * 100.0 / lookups, 2) if lookups else 0,
+        }
+
+    def clear(self) -> int:
+        """Remove every entry; return how many were removed."""
+        with self._lock:
+            keys = list(self._lru)
+            for key in keys:
+                self._drop(key)
+            return len(keys)
+
+
+_cache: LLMCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> LLMCache:
+    """Return the process-wide cache shared by the Groq and Gemini routes."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = LLMCache()
+        return _cache
@@ -0,0 +1,156 @@
+"""
+Local keyword classifier for termsheet text.
+
+Decides the derivative type of a termsheet without calling an LLM when
+the text makes it obvious.  Each type is scored from two signals:
+
+* **Parameter coverage** — the share of the type's parameter names (from
+  ``DERIVATIVE_PARAMETERS``) that appear in the text, weighted by inverse
+  document frequency so names unique to one type ("Amortization
+  Schedule", "Strike Rate") count more than shared ones ("Effective
+  Date").
+* **Product cues** — whether the product name itself ("cross currency
+  swap", "digital option", …) appears.
+
+The confidence of a decision is the top score's lead over the runner-up.
+Callers classify locally at or above ``LOCAL_CLASSIFIER_THRESHOLD`` and
+otherwise fall back to the LLM.
+"""
+
+from __future__ import annotations
+
+import math
+import re
+from typing import Any, Callable, Dict, List, Set
+
+from config import LOCAL_CLASSIFIER_THRESHOLD, get_logger
+
+logger = get_logger(__name__)
+
+# Phrases naming each product; matched on normalised text (see _normalise).
+PRODUCT_CUES: Dict[str, List[str]] = {
+    "Interest Rate Swap": ["interest rate swap", "irs", "vanilla swap", "fixed float swap"],
+    "Cross Currency Swap": ["cross currency swap", "cross currency", "ccs", "currency swap"],
+    "Amortised Schedule Swap": [
+        "amortizing swap", "amortized swap", "amortization schedule", "amortizing notional",
+        "amortizing schedule swap", "amortized schedule swap",
+    ],
+    "Money Market Deposit": ["money market deposit", "money market", "term deposit", "fixed deposit"],
+    "Single Spread Options": ["spread option", "single spread option"],
+    "FX Digital": ["fx digital", "digital option", "binary option", "fx binary"],
+}
+
+_PARAMETER_WEIGHT = 0.5
+_CUE_WEIGHT = 0.5
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+_PARENTHETICAL = re.compile(r"\([^)]*\)")
+
+
+def _normalise(text: str) -> str:
+    """Lower-case, fold British spellings and reduce to single-spaced words."""
+    text = text.lower().replace("amortis", "amortiz")
+    return " " + _NON_ALNUM.sub(" ", text).strip() + " "
+
+
+def _parameter_phrases(parameter: str) -> Set[str]:
+    """``"Termination Date/Maturity"`` → ``{"termination date", "maturity"}``."""
+    parameter = _PARENTHETICAL.sub(" ", parameter)
+    return {p.strip() for p in (_normalise(part) for part in parameter.split("/")) if p.strip()}
+
+
+class LocalClassifier:
+    """IDF-weighted keyword scorer built from a type → parameter-names map."""
+
+    def __init__(
+        self,
+        derivative_parameters: Dict[str, List[str]],
+        product_cues: Dict[str, List[str]] = PRODUCT_CUES,
+    ) -> None:
+        self.types = list(derivative_parameters)
+        self._phrases: Dict[str, Set[str]] = {
+            t: set().union(*(_parameter_phrases(p) for p in params)) if params else set()
+            for t, params in derivative_parameters.items()
+        }
+        self._cues: Dict[str, Set[str]] = {
+            t: {_normalise(c).strip() for c in product_cues.get(t, [])} for t in self.types
+        }
+
+        doc_freq: Dict[str, int] = {}
+        for phrases in self._phrases.values():
+            for phrase in phrases:
+                doc_freq[phrase] = doc_freq.get(phrase, 0) + 1
+        n_types = len(self.types)
+        self._idf = {p: math.log(1 + n_types / df) for p, df in doc_freq.items()}
+        self._max_weight = {t: sum(self._idf[p] for p in phrases) for t, phrases in self._phrases.items()}
+
+        # One scan finds every known phrase; longest alternatives first.
+        vocabulary = set(self._idf).union(*self._cues.values())
+        alternation = "|".join(re.escape(p) for p in sorted(vocabulary, key=len, reverse=True))
+        self._scan = re.compile(f"(?= ({alternation}) )") if vocabulary else None
+
+    def _found(self, text: str) -> Set[str]:
+        if self._scan is None:
+            return set()
+        return {m.group(1) for m in self._scan.finditer(_normalise(text))}
+
+    def scores(self, text: str) -> Dict[str, float]:
+        """Return a score in ``[0, 1]`` per derivative type."""
+        found = self._found(text)
+        scores: Dict[str, float] = {}
+        for t in self.types:
+            weight = self._max_weight[t]
+            coverage = sum(self._idf[p] for p in self._phrases[t] & found) / weight if weight else 0.0
+            cue = 1.0 if self._cues[t] & found else 0.0
+            scores[t] = round(_PARAMETER_WEIGHT * coverage + _CUE_WEIGHT * cue, 4)
+        return scores
+
+    def classify(self, text: str) -> Dict[str, object]:
+        """Return the best type, its confidence and the per-type scores.
+
+        ``confidence`` is the margin between the best and second-best
+        score, so a document that looks like two products is never
+        confident.
+        """
+        scores = self.scores(text)
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        best, best_score = ranked[0] if ranked else (None, 0.0)
+        runner_up = ranked[1][1] if len(ranked) > 1 else 0.0
+        return {
+            "derivative_type": best,
+            "confidence": round(best_score - runner_up, 4),
+            "scores": scores,
+        }
+
+    def is_confident(self, text: str, threshold: float = LOCAL_CLASSIFIER_THRESHOLD) -> bool:
+        """True if *text* alone is enough to classify locally."""
+        return self.classify(text)["confidence"] >= threshold
+
+    def decide(
+        self,
+        text: str,
+        fallback: Callable[[str], str],
+        threshold: float = LOCAL_CLASSIFIER_THRESHOLD,
+    ) -> Dict[str, Any]:
+        """Classify locally when confident, otherwise via *fallback* (the LLM).
+
+        Returns ``derivative_type``, ``classified_by`` (``"local"`` or
+        ``"llm"``) and the local ``confidence``.
+        """
+        local = self.classify(text)
+        if local["derivative_type"] is not None and local["confidence"] >= threshold:
+            logger.info(
+                "Classified locally as %s (confidence %.2f)", local["derivative_type"], local["confidence"],
+            )
+            return {
+                "derivative_type": local["derivative_type"],
+                "classified_by": "local",
+                "confidence": local["confidence"],
+            }
+
+        logger.info("Local confidence %.2f below %.2f — asking the LLM", local["confidence"], threshold)
+        return {
+            "derivative_type": fallback(text),
+            "classified_by": "llm",
+            "confidence": local["confidence"],
+        }
@@ -1,21 +1,95 @@
 """
 Batch processor for PDF files in the files directory.
+
+Extraction (PyMuPDF parsing + regex matching) is CPU-bound and runs in a
+process pool.  Saving versions stays in the calling process and happens
+serially in arrival order, so version numbers per trade ID come out the
+same as a one-file-at-a-time run.
+
+A ``PdfLedger`` records every file handled.  Files whose size and mtime
+are unchanged are skipped without being opened, and files whose content
+hash was already processed (e.g. the same PDF re-sent under another name)
+are recorded as duplicates instead of creating a new version.
 """
 
 from __future__ import annotations
 
+import multiprocessing
 import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Dict, Iterable, List, Optional, Tuple
 
-from config import FILES_DIR, get_logger
+from config import FILES_DIR, PDF_SCHEMA, PDF_WORKERS, get_logger
 from pdf_kv import PDFExtractor
+from pdf_ledger import PdfLedger
+from pdf_text import file_sha256
 
 logger = get_logger(__name__)
 
+# (extracted_pairs, trade_id, error) — exactly one of pairs / error is set
+ExtractionResult = Tuple[Optional[Dict[str, str]], Optional[str], Optional[str]]
+
+# One extractor per schema family, built lazily in each worker process
+_worker_extractors: Dict[str, PDFExtractor] = {}
+
+
+def _extract_file(job: Tuple[str, str], schema: str = PDF_SCHEMA) -> ExtractionResult:
+    """Worker entry point: extract one ``(path, sha256)`` without touching the metadata store."""
+    pdf_path, sha256 = job
+    try:
+        extractor = _worker_extractors.get(schema)
+        if extractor is None:
+            extractor = _worker_extractors[schema] = PDFExtractor(schema)
+        pairs, trade_id = extractor.extract_all_kv_pairs(pdf_path, save_to_file=False, sha256=sha256)
+        return pairs, trade_id, None
+    except Exception as exc:
+        return None, None, f"{type(exc).__name__}: {exc}"
+
+
+def _resolve_workers(workers: int | None, file_count: int) -> int:
+    if workers is None:
+        workers = PDF_WORKERS
+    if workers <= 0:
+        workers = os.cpu_count() or 1
+    return max(1, min(workers, file_count))
+
+
+def _extract_all(jobs: List[Tuple[str, str]], workers: int, schema: str) -> Iterable[ExtractionResult]:
+    """Yield extraction results in the same order as *jobs* (``(path, sha256)`` pairs)."""
+    extract = partial(_extract_file, schema=schema)
+    if workers == 1:
+        yield from map(extract, jobs)
+        return
+
+    # "spawn" rather than fork: this runs inside the Flask/APScheduler
+    # process, and forking a multi-threaded process can deadlock.  Workers
+    # re-import the main script (server.py), which builds nothing outside
+    # create_app(), and never open the JSON collections themselves.
+    ctx = multiprocessing.get_context("spawn")
+    chunksize = max(1, len(jobs) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+        yield from pool.map(extract, jobs, chunksize=chunksize)
+
+
+def process_pdf_files(
+    workers: int | None = None, force: bool = False, schema: str = PDF_SCHEMA,
+) -> None:
+    """Find all new or changed PDFs in the files directory and process them.
 
-def process_pdf_files() -> None:
-    """Find all PDFs in the files directory and process them."""
+    Parameters
+    ----------
+    workers : int, optional
+        Size of the extraction process pool.  Defaults to ``PDF_WORKERS``;
+        ``0`` means one per CPU and ``1`` processes files serially.
+    force : bool
+        Ignore the ledger and reprocess every PDF.
+    schema : str
+        Extraction schema family (a file in ``SCHEMA_DIR``).  Defaults to
+        ``PDF_SCHEMA``.
+    """
     try:
-        extractor = PDFExtractor()
+        extractor = PDFExtractor(schema)
 
         if not os.path.exists(FILES_DIR):
             logger.error("Files directory not found: %s", FILES_DIR)
@@ -27,12 +101,72 @@ def process_pdf_files() -> None:
             logger.info("No PDF files found in %s", FILES_DIR)
             return
 
-        logger.info("Found %d PDF files to process.", len(pdf_files))
+        ledger = PdfLedger()
+        stats = {f: os.stat(os.path.join(FILES_DIR, f)) for f in pdf_files}
+
+        # Oldest first, so later amendments of a trade get later versions
+        pdf_files.sort(key=lambda f: (stats[f].st_mtime, f))
+
+        to_process: List[str] = []
+        hashes: Dict[str, str] = {}
+        # Same content seen more than once in this run: first filename → later copies
+        copies: Dict[str, List[str]] = {}
+        first_by_hash: Dict[str, str] = {}
+        skipped = 0
 
         for filename in pdf_files:
+            if not force and ledger.is_unchanged(filename, stats[filename]):
+                skipped += 1
+                continue
+
+            sha = file_sha256(os.path.join(FILES_DIR, filename))
+            hashes[filename] = sha
+
+            if not force:
+                original = ledger.find_processed(sha)
+                if original is not None:
+                    # Either a copy of another file, or this file touched
+                    # without a content change — refresh its stat either way.
+                    same_file = original["_id"] == filename
+                    if not same_file:
+                        logger.info("Skipping %s — same content as %s", filename, original["_id"])
+                    ledger.record(
+                        filename, stats[filename], sha,
+                        trade_id=original.get("trade_id"),
+                        version=original.get("version"),
+                        duplicate_of=None if same_file else original["_id"],
+                    )
+                    skipped += 1
+                    continue
+                if sha in first_by_hash:
+                    copies[first_by_hash[sha]].append(filename)
+                    skipped += 1
+                    continue
+
+            first_by_hash[sha] = filename
+            copies[filename] = []
+            to_process.append(filename)
+
+        if not to_process:
+            logger.info("No new or changed PDF files (%d unchanged or duplicate).", skipped)
+            return
+
+        jobs = [(os.path.join(FILES_DIR, f), hashes[f]) for f in to_process]
+        workers = _resolve_workers(workers, len(to_process))
+        logger.info(
+            "Found %d PDF files to process, %d unchanged or duplicate (%d worker(s)).",
+            len(to_process), skipped, workers,
+        )
+
+        for filename, (pairs, trade_id, error) in zip(to_process, _extract_all(jobs, workers, schema)):
+            sha = hashes[filename]
+            if error is not None:
+                logger.error("Error processing %s: %s", filename, error)
+                ledger.record(filename, stats[filename], sha, error=error)
+                continue
             try:
                 logger.info("Processing %s...", filename)
-                result = extractor.process_new_document(filename)
+                result = extractor.save_extraction(filename, pairs, trade_id)
                 logger.info(
                     "[OK] %s — saved in metadata/%s/ (version %s)",
                     result["message"],
@@ -41,11 +175,23 @@ def process_pdf_files() -> None:
                 )
                 if result["status"] == "updated":
                     logger.info("Changes file created with modifications")
-            except Exception:
+            except Exception as exc:
                 logger.exception("Error processing %s", filename)
+                ledger.record(filename, stats[filename], sha, error=f"{type(exc).__name__}: {exc}")
                 continue
 
+            ledger.record(
+                filename, stats[filename], sha,
+                trade_id=result["trade_id"], version=result["version"],
+            )
+            for copy_name in copies[filename]:
+                logger.info("Skipping %s — same content as %s", copy_name, filename)
+                ledger.record(
+                    copy_name, stats[copy_name], sha,
+                    trade_id=result["trade_id"], version=result["version"], duplicate_of=filename,
+                )
+
         logger.info("All files processed successfully!")
 
     except Exception:
-        logger.exception("Error during PDF batch processing")
\ No newline at end of file
+        logger.exception("Error during PDF batch processing")
@@ -2,18 +2,19 @@
 PDF key-value pair extractor with version management.
 
 Extracts structured data from PDF term sheets, tracks versions,
-and computes diffs between document revisions.
+and computes diffs between document revisions.  The keys looked for come
+from a per-family schema file (see ``extraction_schemas``).
 """
 
 from __future__ import annotations
 
 import os
-import re
-
-import fitz  # PyMuPDF
 
 from base_extractor import BaseVersionedExtractor
-from config import FILES_DIR, METADATA_DIR, get_logger
+from config import FILES_DIR, METADATA_DIR, PDF_SCHEMA, get_logger
+from extraction_schemas import get_matcher, load_schema
+from kv_matcher import KeyValueMatcher
+from pdf_text import iter_pdf_pages
 
 logger = get_logger(__name__)
 
@@ -21,16 +22,10 @@ logger = get_logger(__name__)
 class PDFExtractor(BaseVersionedExtractor):
     """Extract key-value pairs from PDFs and manage versioned metadata."""
 
-    SECTIONS = {
-        "Parties Involved": ["Buyer", "Seller", "Broker"],
-        "Instrument Details": ["Security Name", "Ticker Symbol", "ISIN", "Exchange"],
-        "Trade Details": ["Trade Type", "Order Type", "Quantity", "Price per Share", "Total Trade Value"],
-        "Settlement Details": ["Settlement Date", "Settlement Method", "Currency", "Clearing House"],
-        "Fees and Costs": ["Brokerage Fee", "Exchange Fee", "Other Charges"],
-    }
-
-    def __init__(self) -> None:
+    def __init__(self, schema: str = PDF_SCHEMA) -> None:
         super().__init__(metadata_dir=METADATA_DIR)
+        self.schema = load_schema(schema)
+        self.matcher = get_matcher(self.schema)
         self.files_dir = FILES_DIR
         os.makedirs(self.files_dir, exist_ok=True)
 
@@ -46,7 +41,14 @@ class PDFExtractor(BaseVersionedExtractor):
             raise FileNotFoundError(f"File {filename} not found in {self.files_dir}")
 
         extracted_pairs, trade_id = self.extract_all_kv_pairs(pdf_path, save_to_file=False)
+        return self.save_extraction(filename, extracted_pairs, trade_id)
 
+    def save_extraction(self, filename: str, extracted_pairs: dict, trade_id: str | None) -> dict:
+        """Store already-extracted *extracted_pairs* as a new version.
+
+        Split from ``process_new_document`` so batch mode can extract in
+        worker processes and save serially in the parent.
+        """
         if not trade_id:
             raise ValueError("Could not extract Trade ID from the document")
 
@@ -68,47 +70,31 @@ class PDFExtractor(BaseVersionedExtractor):
     # PDF extraction
     # ------------------------------------------------------------------
 
-    @staticmethod
-    def extract_trade_id(text: str) -> str | None:
-        match = re.search(r"Trade ID:?\s*(TRADE-[^\s]+)", text)
-        return match.group(1) if match else None
+    def extract_trade_id(self, text: str) -> str | None:
+        return self.matcher.trade_id(text)
 
-    def extract_all_kv_pairs(self, pdf_path: str, save_to_file: bool = True):
-        doc = fitz.open(pdf_path)
+    def extract_all_kv_pairs(self, pdf_path: str, save_to_file: bool = True, sha256: str | None = None):
+        """Extract pairs page by page; page text comes from the shared cache.
+
+        *sha256* is the PDF's content hash when the caller already has it.
+        """
         all_kv_pairs: dict[str, str] = {}
         trade_id: str | None = None
 
-        for page in doc:
-            text = page.get_text()
+        for text in iter_pdf_pages(pdf_path, sha256):
 
             if not trade_id:
                 trade_id = self.extract_trade_id(text)
                 if trade_id:
                     all_kv_pairs["Trade ID"] = trade_id
 
-            for _section, keys in self.SECTIONS.items():
-                for key in keys:
-                    patterns = [
-                        rf"{key}:?\s*([^•\n]+)",
-                        rf"[•]\s*{key}:?\s*([^•\n]+)",
-                        rf"{key}\s*=\s*([^•\n]+)",
-                    ]
-                    for pattern in patterns:
-                        match = re.search(pattern, text, re.IGNORECASE)
-                        if match:
-                            value = match.group(1).strip()
-                            if value and len(value) > 1:
-                                all_kv_pairs[key] = value
-                                break
+            all_kv_pairs.update(self.matcher.match_keys(text))
 
             # Additional bullet-style key-value pairs
-            for key, value in re.findall(r"[•]\s*([^:]+):\s*([^•\n]+)", text):
-                key, value = key.strip(), value.strip()
+            for key, value in self.matcher.bullet_pairs(text):
                 if key and value and len(value) > 1 and key not in all_kv_pairs:
                     all_kv_pairs[key] = value
 
-        doc.close()
-
         cleaned = self._clean_pairs(all_kv_pairs)
 
         if save_to_file and trade_id:
@@ -118,14 +104,4 @@ class PDFExtractor(BaseVersionedExtractor):
 
     @staticmethod
     def _clean_pairs(pairs: dict[str, str]) -> dict[str, str]:
-        cleaned: dict[str, str] = {}
-        for key, value in pairs.items():
-            clean_key = re.sub(r"^\d+\.\s*", "", key)
-            clean_key = re.sub(r"^[•]\s*", "", clean_key).strip()
-
-            clean_value = re.sub(r"\s+", " ", value).strip()
-            clean_value = re.sub(r"\s*\d+\.\s*.*$", "", clean_value)
-
-            if clean_key and clean_value and len(clean_value) > 1:
-                cleaned[clean_key] = clean_value
-        return cleaned
\ No newline at end of file
+        return KeyValueMatcher.clean_pairs(pairs)
\ No newline at end of file
@@ -0,0 +1,76 @@
+"""
+Persistent ledger of PDFs already turned into versions.
+
+The scheduled ``process_pdf_files`` job sees every PDF still sitting in
+``FILES_DIR`` on every run.  The ledger lets it skip files whose size and
+mtime have not changed without reading them, and recognise renamed or
+re-sent copies by content hash so they do not create new versions.
+
+Entries live in the ``pdf_ledger`` JSON collection, one per filename::
+
+    {"_id": "<filename>", "sha256": "...", "size": 1234, "mtime": 1.7e9,
+     "trade_id": "TRADE-1", "version": 3, "duplicate_of": null, "error": null}
+"""
+
+from __future__ import annotations
+
+import os
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from config import get_logger
+from json_store import get_collection
+
+logger = get_logger(__name__)
+
+
+class PdfLedger:
+    """Record of processed PDFs keyed by filename, indexed by content hash."""
+
+    def __init__(self, collection_name: str = "pdf_ledger") -> None:
+        self._collection = get_collection(collection_name)
+        self._collection.create_index("sha256")
+
+    def is_unchanged(self, filename: str, stat: os.stat_result) -> bool:
+        """True if *filename* was already handled with this exact size and mtime."""
+        entry = self._collection.find_one({"_id": filename})
+        return (
+            entry is not None
+            and entry.get("size") == stat.st_size
+            and entry.get("mtime") == stat.st_mtime
+        )
+
+    def find_processed(self, sha256: str) -> Optional[Dict[str, Any]]:
+        """Return the entry that successfully produced a version for this content."""
+        return self._collection.find_one({"sha256": sha256, "duplicate_of": None, "error": None})
+
+    def record(
+        self,
+        filename: str,
+        stat: os.stat_result,
+        sha256: str,
+        *,
+        trade_id: str | None = None,
+        version: int | None = None,
+        duplicate_of: str | None = None,
+        error: str | None = None,
+    ) -> None:
+        """Create or replace the ledger entry for *filename*.
+
+        Failed extractions are recorded too (with *error*), so an unchanged
+        file that cannot be parsed is not retried on every run.
+        """
+        self._collection.update_one(
+            {"_id": filename},
+            {"$set": {
+                "sha256": sha256,
+                "size": stat.st_size,
+                "mtime": stat.st_mtime,
+                "trade_id": trade_id,
+                "version": version,
+                "duplicate_of": duplicate_of,
+                "error": error,
+                "recorded_at": datetime.now().isoformat(),
+            }},
+            upsert=True,
+        )
@@ -0,0 +1,334 @@
+"""
+Plain-text extraction from PDF files.
+
+Kept free of Flask / LLM imports so it can be the target of a spawned
+process pool: parsing a PDF with PyMuPDF is CPU-bound, and a batch of
+uploads is read in parallel across cores.  Spawned workers also
+re-import the server's main script, which is why ``server.py`` builds
+nothing (scheduler, collections, job resumption) outside
+``create_app()``.
+
+For single documents the text can also be streamed: ``iter_pdf_pages``
+reads one page at a time, ``normalise_pages`` cleans whitespace across
+page boundaries without building the whole string, ``split_head`` takes
+just enough leading text to classify, and ``iter_chunks`` cuts the
+stream into the same overlapping chunks as slicing the full text.
+
+Parsed page text is cached on disk, keyed by the SHA-256 of the PDF, so a
+document seen by the scheduler, ``/extract`` and batch uploads is parsed
+once.  Each entry is a file of zlib-compressed page frames that can be
+read back lazily; the least recently used entries are evicted once the
+cache exceeds ``PDF_TEXT_CACHE_MAX_MB``.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import itertools
+import multiprocessing
+import os
+import re
+import struct
+import tempfile
+import threading
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+import fitz  # PyMuPDF
+
+from config import PDF_TEXT_CACHE_DIR, PDF_TEXT_CACHE_MAX_MB, PDF_WORKERS, get_logger
+
+logger = get_logger(__name__)
+
+# (text, error) — exactly one is set
+TextResult = Tuple[Optional[str], Optional[str]]
+
+_WHITESPACE = re.compile(r"\s+")
+_LINE_BREAKS = str.maketrans("\r\n", "  ")
+
+
+_HASH_BLOCK_SIZE = 1 << 20
+
+_CACHE_MAGIC = b"PTC1"
+_FRAME_HEADER = struct.Struct(">I")
+
+
+def file_sha256(path: str) -> str:
+    """Return the hex SHA-256 of the file at *path*, read in 1 MiB blocks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(_HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+# ---------------------------------------------------------------------------
+# Page text cache
+# ---------------------------------------------------------------------------
+
+class _PageWriter:
+    """Writes one cache entry to a temp file; published only on ``commit``."""
+
+    def __init__(self, cache: "PageTextCache", sha256: str) -> None:
+        self._cache = cache
+        self._sha256 = sha256
+        fd, self._tmp_path = tempfile.mkstemp(dir=cache.directory, suffix=".tmp")
+        self._fh = os.fdopen(fd, "wb")
+        self._fh.write(_CACHE_MAGIC)
+        self._committed = False
+
+    def add(self, page: str) -> None:
+        frame = zlib.compress(page.encode("utf-8"))
+        self._fh.write(_FRAME_HEADER.pack(len(frame)))
+        self._fh.write(frame)
+
+    def commit(self) -> None:
+        self._fh.close()
+        os.replace(self._tmp_path, self._cache.path(self._sha256))
+        self._committed = True
+        self._cache.evict()
+
+    def __enter__(self) -> "_PageWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        # Not committed (an error, or the reader stopped early): discard.
+        if not self._committed:
+            self._fh.close()
+            try:
+                os.remove(self._tmp_path)
+            except OSError:
+                pass
+
+
+class PageTextCache:
+    """On-disk, size-bounded LRU cache of per-page PDF text."""
+
+    def __init__(self, directory: str = PDF_TEXT_CACHE_DIR, max_mb: int = PDF_TEXT_CACHE_MAX_MB) -> None:
+        self.directory = directory
+        self.max_bytes = max_mb * 1024 * 1024
+        if self.enabled:
+            os.makedirs(directory, exist_ok=True)
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def path(self, sha256: str) -> str:
+        return os.path.join(self.directory, f"{sha256}.pages")
+
+    def read(self, sha256: str) -> Optional[Iterator[str]]:
+        """Return a lazy iterator over the cached pages, or ``None`` on a miss."""
+        path = self.path(sha256)
+        try:
+            fh = open(path, "rb")
+        except OSError:
+            return None
+        if fh.read(len(_CACHE_MAGIC)) != _CACHE_MAGIC:
+            fh.close()
+            self._discard(path)
+            return None
+        try:
+            os.utime(path)  # mtime doubles as the LRU timestamp
+        except OSError:
+            pass
+        return self._frames(fh, path)
+
+    def _frames(self, fh, path: str) -> Iterator[str]:
+        with fh:
+            while True:
+                header = fh.read(_FRAME_HEADER.size)
+                if not header:
+                    return
+                try:
+                    (size,) = _FRAME_HEADER.unpack(header)
+                    yield zlib.decompress(fh.read(size)).decode("utf-8")
+                except (struct.error, zlib.error, UnicodeDecodeError):
+                    logger.warning("Corrupt page text cache entry %s — discarding", path)
+                    self._discard(path)
+                    raise
+
+    def writer(self, sha256: str) -> _PageWriter:
+        return _PageWriter(self, sha256)
+
+    def evict(self) -> None:
+        """Delete least recently used entries until the cache fits its budget."""
+        try:
+            entries = [e for e in os.scandir(self.directory) if e.name.endswith(".pages")]
+        except OSError:
+            return
+        stats = []
+        for entry in entries:
+            try:
+                st = entry.stat()
+            except OSError:
+                continue
+            stats.append((st.st_mtime, st.st_size, entry.path))
+        total = sum(size for _, size, _ in stats)
+        for _, size, path in sorted(stats):
+            if total <= self.max_bytes:
+                break
+            self._discard(path)
+            total -= size
+
+    @staticmethod
+    def _discard(path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+_cache: PageTextCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_page_cache() -> PageTextCache:
+    """Return the process-wide page text cache."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = PageTextCache()
+        return _cache
+
+
+# ---------------------------------------------------------------------------
+# Reading
+# ---------------------------------------------------------------------------
+
+def _parse_pages(path: str) -> Iterator[str]:
+    with fitz.open(path) as doc:
+        for page in doc:
+            yield page.get_text()
+
+
+def iter_pdf_pages(path: str, sha256: Optional[str] = None) -> Iterator[str]:
+    """Yield the raw text of each page, from the cache or by parsing lazily.
+
+    *sha256* is the file's content hash if the caller already has it.  A
+    parse is written to the cache only if every page was read.
+    """
+    cache = get_page_cache()
+    if not cache.enabled:
+        yield from _parse_pages(path)
+        return
+
+    sha256 = sha256 or file_sha256(path)
+    cached = cache.read(sha256)
+    if cached is not None:
+        yield from cached
+        return
+
+    with cache.writer(sha256) as writer:
+        for page in _parse_pages(path):
+            writer.add(page)
+            yield page
+        writer.commit()
+
+
+def read_pdf_text(path: str) -> str:
+    """Return the text of every page of the PDF at *path*, joined by spaces."""
+    return " ".join(iter_pdf_pages(path))
+
+
+def normalise_pages(pages: Iterable[str], collapse_whitespace: bool = True) -> Iterator[str]:
+    """Yield pieces whose concatenation is the normalised, space-joined text.
+
+    With *collapse_whitespace* the result equals
+    ``re.sub(r"\\s+", " ", " ".join(pages)).strip()``; without it,
+    ``" ".join(pages)`` with CR / LF turned into spaces, then stripped.
+    Trailing whitespace of a page is held back until the next non-blank
+    page, so the final strip needs no look-ahead.
+    """
+    held = ""
+    started = False
+    for n, page in enumerate(pages):
+        piece = held + (page if n == 0 else " " + page)
+        piece = _WHITESPACE.sub(" ", piece) if collapse_whitespace else piece.translate(_LINE_BREAKS)
+        if not started:
+            piece = piece.lstrip()
+            if not piece:
+                held = ""
+                continue
+            started = True
+        body = piece.rstrip()
+        held = piece[len(body):]
+        if body:
+            yield body
+
+
+def split_head(
+    pieces: Iterable[str],
+    max_chars: int,
+    enough: Optional[Callable[[str], bool]] = None,
+) -> Tuple[str, Iterator[str]]:
+    """Read pieces until *max_chars* are buffered or ``enough(head)`` is true.
+
+    Returns ``(head, stream)``: *head* is at most *max_chars* leading
+    characters, and *stream* yields the complete text (the pieces already
+    read, then the rest) so nothing is lost for later stages.
+    """
+    pieces = iter(pieces)
+    consumed: List[str] = []
+    size = 0
+    for piece in pieces:
+        consumed.append(piece)
+        size += len(piece)
+        if size >= max_chars or (enough is not None and enough("".join(consumed))):
+            break
+    head = "".join(consumed)[:max_chars]
+    return head, itertools.chain(consumed, pieces)
+
+
+def iter_chunks(pieces: Iterable[str], chunk_size: int, overlap: int) -> Iterator[str]:
+    """Yield ``text[i : i + chunk_size]`` for ``i`` in steps of ``chunk_size - overlap``.
+
+    *text* is the concatenation of *pieces*; each chunk is yielded as soon
+    as enough of the stream has been read.  The last chunk is the first
+    one that reaches the end of the text, so text of at most
+    ``chunk_size`` characters is a single chunk.
+    """
+    step = chunk_size - overlap
+    if step <= 0:
+        raise ValueError("overlap must be smaller than chunk_size")
+    buffer = ""
+    for piece in pieces:
+        buffer += piece
+        # A chunk is only final once text beyond it has been seen.
+        while len(buffer) > chunk_size:
+            yield buffer[:chunk_size]
+            buffer = buffer[step:]
+    if buffer:
+        yield buffer
+
+
+def _read_pdf_text_safe(path: str) -> TextResult:
+    try:
+        return read_pdf_text(path), None
+    except Exception as exc:
+        return None, f"{type(exc).__name__}: {exc}"
+
+
+def read_pdf_texts(paths: List[str], workers: int | None = None) -> List[TextResult]:
+    """Read many PDFs, in parallel processes when there is more than one.
+
+    Returns ``(text, error)`` per path, in input order; one unreadable
+    file does not fail the others.  *workers* defaults to
+    ``PDF_WORKERS`` (0 = one per CPU).
+    """
+    if workers is None:
+        workers = PDF_WORKERS
+    if workers <= 0:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(paths)))
+
+    if workers == 1:
+        return [_read_pdf_text_safe(path) for path in paths]
+
+    # "spawn": the caller runs inside the multi-threaded Flask process.
+    # Workers only parse; they never open the JSON collections.
+    ctx = multiprocessing.get_context("spawn")
+    chunksize = max(1, len(paths) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+        return list(pool.map(_read_pdf_text_safe, paths, chunksize=chunksize))
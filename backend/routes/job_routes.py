@@ -0,0 +1,25 @@
+"""
+Background job status routes.
+"""
+
+from flask import Blueprint, jsonify
+
+from config import get_logger
+from job_queue import get_job_queue, job_response
+
+logger = get_logger(__name__)
+
+job_bp = Blueprint("job_bp", __name__)
+
+
+@job_bp.route("/jobs/<job_id>", methods=["GET"])
+def get_job(job_id):
+    """Return the status, current stage and (when finished) result of a job."""
+    try:
+        job = get_job_queue().get(job_id)
+        if not job:
+            return jsonify({"error": "Job not found"}), 404
+        return jsonify(job_response(job)), 200
+    except Exception as exc:
+        logger.exception("Error fetching job %s", job_id)
+        return jsonify({"error": str(exc)}), 500
@@ -6,10 +6,37 @@ from flask import Blueprint, jsonify, request
 
 from config import get_logger
 from json_store import get_collection
+from llm_cache import get_llm_cache
 
 logger = get_logger(__name__)
 
+TRADER_STATS = "trader_validation"
+
+
+def _validation_counts(sheet):
+    """A termsheet's contribution to its trader's statistics."""
+    unvalidated = sum(
+        1 for value in sheet.values()
+        if isinstance(value, dict) and "validated" in value and not value["validated"]
+    )
+    return {"fully_validated": 0 if unvalidated else 1, "unvalidated_fields": unvalidated}
+
+
+def _trader_stats(totals):
+    total_documents = totals["documents"] if totals else 0
+    fully_validated_count = totals["fully_validated"] if totals else 0
+    validation_rate = (fully_validated_count * 100.0 / total_documents) if total_documents else 0
+    return {
+        "total_documents": total_documents,
+        "validation_rate": round(validation_rate, 2),
+        "total_unvalidated_fields": totals["unvalidated_fields"] if totals else 0,
+    }
+
+
 termsheet_collection = get_collection("termsheets")
+termsheet_collection.create_index("traderId")
+# Per-trader totals, kept current by the store on every termsheet write
+termsheet_collection.create_aggregate(TRADER_STATS, "traderId", _validation_counts)
 stats_bp = Blueprint("stats_bp", __name__)
 
 
@@ -21,30 +48,40 @@ def trader_statistics():
         if not trader_email:
             return jsonify({"error": "Trader email is required"}), 400
 
-        trader_termsheets = list(termsheet_collection.find({"traderId": trader_email}))
-        total_documents = len(trader_termsheets)
+        return jsonify(_trader_stats(termsheet_collection.aggregate(TRADER_STATS, trader_email))), 200
 
-        fully_validated_count = 0
-        total_unvalidated_fields = 0
+    except Exception as exc:
+        logger.exception("Error computing trader statistics")
+        return jsonify({"error": str(exc)}), 500
 
-        for sheet in trader_termsheets:
-            validated = True
-            for value in sheet.values():
-                if isinstance(value, dict) and "validated" in value:
-                    if not value["validated"]:
-                        validated = False
-                        total_unvalidated_fields += 1
-            if validated:
-                fully_validated_count += 1
 
-        validation_rate = (fully_validated_count * 100.0 / total_documents) if total_documents else 0
+@stats_bp.route("/trader_stats/all", methods=["GET"])
+def all_trader_statistics():
+    """Return validation statistics for every trader with termsheets, keyed by trader ID."""
+    try:
+        totals = termsheet_collection.aggregates(TRADER_STATS)
+        return jsonify({str(trader): _trader_stats(t) for trader, t in totals.items()}), 200
+    except Exception as exc:
+        logger.exception("Error computing statistics for all traders")
+        return jsonify({"error": str(exc)}), 500
 
-        return jsonify({
-            "total_documents": total_documents,
-            "validation_rate": round(validation_rate, 2),
-            "total_unvalidated_fields": total_unvalidated_fields,
-        }), 200
 
+@stats_bp.route("/llm_cache_stats", methods=["GET"])
+def llm_cache_statistics():
+    """Return hit / miss counters and size of the LLM result cache."""
+    try:
+        return jsonify(get_llm_cache().stats()), 200
     except Exception as exc:
-        logger.exception("Error computing trader statistics")
+        logger.exception("Error reading LLM cache statistics")
+        return jsonify({"error": str(exc)}), 500
+
+
+@stats_bp.route("/llm_cache", methods=["DELETE"])
+def clear_llm_cache():
+    """Drop every cached LLM result."""
+    try:
+        removed = get_llm_cache().clear()
+        return jsonify({"message": "LLM cache cleared", "removed": removed}), 200
+    except Exception as exc:
+        logger.exception("Error clearing LLM cache")
         return jsonify({"error": str(exc)}), 500
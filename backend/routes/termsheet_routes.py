@@ -2,17 +2,40 @@
 Termsheet CRUD and validation routes.
 """
 
-from flask import Blueprint, jsonify, request
+import json
+from collections import Counter
+
+from flask import Blueprint, Response, jsonify, request, stream_with_context
 
 from config import get_logger
 from json_store import get_collection
-from validators.swap_validator import validate_swap_against_risk_file
+from validators.registry import validate_trade, validate_trades
+from validators.swap_validator import validate_swap_against_risk_file, validate_swaps_against_risk_file
 
 logger = get_logger(__name__)
 
 termsheet_collection = get_collection("termsheets")
 termsheet_bp = Blueprint("termsheet_bp", __name__)
 
+# Page size of termsheet listings without ``limit``, and the upper bound on ``limit``
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+# Upper bound on the number of swaps in one bulk validation request; the
+# payload, its columns and every result are held in memory at once
+MAX_VALIDATE_BATCH = 10_000
+
+
+def _batch_summary(results):
+    """Counts of a bulk validation's per-trade results by outcome."""
+    return {
+        "total": len(results),
+        "valid": sum(1 for r in results if r.get("valid")),
+        "with_anomalies": sum(1 for r in results if r["status"] == 200 and not r["valid"]),
+        "not_found": sum(1 for r in results if r["status"] == 404),
+        "rejected": sum(1 for r in results if r["status"] == 400),
+    }
+
 
 @termsheet_bp.route("/add_termsheet", methods=["POST"])
 def add_termsheet():
@@ -34,12 +57,72 @@ def add_termsheet():
 
 @termsheet_bp.route("/termsheets", methods=["GET"])
 def get_all_termsheets():
-    """Return all termsheets."""
+    """Return one page of termsheets as a JSON array.
+
+    Query parameters (all optional):
+
+    - ``limit``: page size, a positive integer (default
+      ``DEFAULT_PAGE_SIZE``, capped at ``MAX_PAGE_SIZE``)
+    - ``cursor``: opaque token from a previous page's ``X-Next-Cursor`` header
+    - ``after_id``: start after the termsheet with this ``_id`` instead
+    - ``fields``: comma-separated fields to return (``_id`` is always
+      included), or fields to leave out, each prefixed with ``-`` (e.g.
+      ``-extractedText``)
+    - ``sort``: field to order by; prefix with ``-`` for descending
+
+    The array is streamed one document at a time.  When more results
+    remain, the response carries an ``X-Next-Cursor`` header.
+    """
     try:
-        termsheets = list(termsheet_collection.find())
-        for ts in termsheets:
-            ts["_id"] = str(ts["_id"])
-        return jsonify(termsheets), 200
+        limit_arg = request.args.get("limit", "").strip()
+        if not limit_arg:
+            limit = DEFAULT_PAGE_SIZE
+        else:
+            try:
+                limit = int(limit_arg)
+            except ValueError:
+                limit = 0
+            if limit < 1:
+                return jsonify({"error": "limit must be a positive integer"}), 400
+        limit = min(limit, MAX_PAGE_SIZE)
+
+        # ``_id`` is always returned, so "-_id" is ignored
+        fields = [f.strip() for f in request.args.get("fields", "").split(",") if f.strip() not in ("", "-_id")]
+
+        sort = None
+        sort_arg = request.args.get("sort", "").strip()
+        if sort_arg:
+            sort = [(sort_arg.lstrip("-"), -1 if sort_arg.startswith("-") else 1)]
+
+        cursor = request.args.get("cursor")
+        after_id = request.args.get("after_id")
+        if cursor is None and after_id:
+            try:
+                cursor = termsheet_collection.cursor_after(after_id, sort)
+            except KeyError:
+                return jsonify({"error": f"Unknown after_id: {after_id}"}), 400
+
+        try:
+            docs, next_cursor = termsheet_collection.find_page(
+                projection=fields or None,
+                sort=sort,
+                limit=limit,
+                after=cursor,
+            )
+        except ValueError as exc:
+            return jsonify({"error": str(exc)}), 400
+
+        def generate():
+            yield "["
+            for i, ts in enumerate(docs):
+                ts["_id"] = str(ts["_id"])
+                yield ("," if i else "") + json.dumps(ts, default=str)
+            yield "]"
+
+        response = Response(stream_with_context(generate()), status=200, mimetype="application/json")
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+        return response
     except Exception as exc:
         logger.exception("Error fetching termsheets")
         return jsonify({"error": str(exc)}), 500
@@ -57,4 +140,62 @@ def validate_swap():
         return jsonify(result), status
     except Exception as exc:
         logger.exception("Error validating swap")
-        return jsonify({"error": str(exc)}), 500
\ No newline at end of file
+        return jsonify({"error": str(exc)}), 500
+
+
+@termsheet_bp.route("/validate_swap/batch", methods=["POST"])
+def validate_swap_batch():
+    """Validate many Interest Rate Swaps against the risk system at once.
+
+    The body is a JSON array of swaps, or ``{"swaps": [...]}``.  Each
+    result carries the swap's ``tradeId``, the single-swap response fields
+    and the ``status`` ``/validate_swap`` would have returned; ``summary``
+    counts them.
+    """
+    try:
+        data = request.get_json()
+        swaps = data.get("swaps") if isinstance(data, dict) else data
+        if not isinstance(swaps, list) or not swaps:
+            return jsonify({"error": "Expected a non-empty list of swaps"}), 400
+        if len(swaps) > MAX_VALIDATE_BATCH:
+            return jsonify({"error": f"At most {MAX_VALIDATE_BATCH} swaps per request"}), 400
+
+        results = validate_swaps_against_risk_file(swaps)
+        return jsonify({"summary": _batch_summary(results), "results": results}), 200
+    except Exception as exc:
+        logger.exception("Error validating swap batch")
+        return jsonify({"error": str(exc)}), 500
+
+
+@termsheet_bp.route("/validate", methods=["POST"])
+def validate():
+    """Validate trades of any supported instrument against the risk system.
+
+    The validator is chosen per trade from its ``derivative_type`` or
+    ``instrumentType``.  A single JSON object gets the single-trade
+    response and status.  A JSON array, or ``{"trades": [...]}``, is
+    validated in bulk (instruments may be mixed) and answered like
+    ``/validate_swap/batch``, with each result's ``derivative_type``.
+    """
+    try:
+        data = request.get_json()
+        if not data:
+            return jsonify({"error": "No data provided"}), 400
+
+        if isinstance(data, dict) and "trades" not in data:
+            result, status = validate_trade(data)
+            return jsonify(result), status
+
+        trades = data.get("trades") if isinstance(data, dict) else data
+        if not isinstance(trades, list) or not trades:
+            return jsonify({"error": "Expected a trade or a non-empty list of trades"}), 400
+        if len(trades) > MAX_VALIDATE_BATCH:
+            return jsonify({"error": f"At most {MAX_VALIDATE_BATCH} trades per request"}), 400
+
+        results = validate_trades(trades)
+        summary = _batch_summary(results)
+        summary["by_derivative_type"] = dict(Counter(r["derivative_type"] for r in results if "derivative_type" in r))
+        return jsonify({"summary": summary, "results": results}), 200
+    except Exception as exc:
+        logger.exception("Error validating trades")
+        return jsonify({"error": str(exc)}), 500
@@ -5,11 +5,12 @@ Trader CRUD routes.
 from flask import Blueprint, jsonify, request
 
 from config import get_logger
-from json_store import get_collection
+from json_store import DuplicateKeyError, get_collection
 
 logger = get_logger(__name__)
 
 trader_collection = get_collection("traders")
+trader_collection.create_index("email", unique=True)
 trader_bp = Blueprint("trader_bp", __name__)
 
 
@@ -29,6 +30,8 @@ def create_trader():
             "message": "Trader created successfully!",
             "trader_id": str(result.inserted_id),
         }), 201
+    except DuplicateKeyError:
+        return jsonify({"error": "Trader with this email already exists"}), 400
     except Exception as exc:
         logger.exception("Error creating trader")
         return jsonify({"error": str(exc)}), 500
@@ -73,6 +76,8 @@ def update_trader(trader_id):
         if result.matched_count == 0:
             return jsonify({"error": "Trader not found"}), 404
         return jsonify({"message": "Trader updated successfully!"}), 200
+    except DuplicateKeyError:
+        return jsonify({"error": "Trader with this email already exists"}), 400
     except Exception as exc:
         logger.exception("Error updating trader %s", trader_id)
         return jsonify({"error": str(exc)}), 500
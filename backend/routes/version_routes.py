@@ -0,0 +1,116 @@
+"""
+Version history routes: list a trade's versions, read it as of a version
+or timestamp, and diff two versions.
+
+Every route takes ``source`` — ``pdf`` (``metadata/``, the default) or
+``email`` (``email_metadata/``).
+"""
+
+from flask import Blueprint, jsonify, request
+
+from config import get_logger
+from version_index import get_version_index, parse_timestamp, version_summary
+
+logger = get_logger(__name__)
+
+version_bp = Blueprint("version_bp", __name__)
+
+
+def _source():
+    source = request.args.get("source", "pdf")
+    return source if source in get_version_index().roots else None
+
+
+def _history(trade_id):
+    """``(history, None)`` or ``(None, error response)``."""
+    source = _source()
+    if source is None:
+        return None, (jsonify({"error": f"Unknown source; expected one of {sorted(get_version_index().roots)}"}), 400)
+    history = get_version_index().history(source, trade_id)
+    if history is None:
+        return None, (jsonify({"error": f"No versions found for trade {trade_id}"}), 404)
+    return history, None
+
+
+@version_bp.route("/versions", methods=["GET"])
+def list_versioned_trades():
+    """Return every versioned trade with its version count and latest version."""
+    try:
+        source = _source()
+        if source is None:
+            return jsonify({"error": f"Unknown source; expected one of {sorted(get_version_index().roots)}"}), 400
+        return jsonify(get_version_index().summaries(source)), 200
+    except Exception as exc:
+        logger.exception("Error listing versioned trades")
+        return jsonify({"error": str(exc)}), 500
+
+
+@version_bp.route("/versions/<trade_id>", methods=["GET"])
+def list_trade_versions(trade_id):
+    """Return the versions of a trade, oldest first."""
+    try:
+        history, error = _history(trade_id)
+        if error:
+            return error
+        return jsonify({
+            "trade_id": trade_id,
+            "versions": [version_summary(entry) for entry in history.versions()],
+        }), 200
+    except Exception as exc:
+        logger.exception("Error listing versions of %s", trade_id)
+        return jsonify({"error": str(exc)}), 500
+
+
+@version_bp.route("/versions/<trade_id>/<int:version>", methods=["GET"])
+def get_trade_version(trade_id, version):
+    """Return a trade as saved in *version*."""
+    try:
+        history, error = _history(trade_id)
+        if error:
+            return error
+        version_info = get_version_index().get(history, version)
+        if version_info is None:
+            return jsonify({"error": f"Trade {trade_id} has no version {version}"}), 404
+        return jsonify(version_info), 200
+    except Exception as exc:
+        logger.exception("Error reading version %s of %s", version, trade_id)
+        return jsonify({"error": str(exc)}), 500
+
+
+@version_bp.route("/versions/<trade_id>/as_of", methods=["GET"])
+def get_trade_as_of(trade_id):
+    """Return the latest version of a trade saved at or before ``timestamp`` (ISO 8601)."""
+    try:
+        history, error = _history(trade_id)
+        if error:
+            return error
+        timestamp = parse_timestamp(request.args.get("timestamp", ""))
+        if timestamp is None:
+            return jsonify({"error": "timestamp must be an ISO 8601 date or datetime"}), 400
+        version_info = get_version_index().as_of(history, timestamp)
+        if version_info is None:
+            return jsonify({"error": f"Trade {trade_id} has no version at or before {timestamp.isoformat()}"}), 404
+        return jsonify(version_info), 200
+    except Exception as exc:
+        logger.exception("Error reading %s as of a timestamp", trade_id)
+        return jsonify({"error": str(exc)}), 500
+
+
+@version_bp.route("/versions/<trade_id>/diff", methods=["GET"])
+def diff_trade_versions(trade_id):
+    """Return the differences between versions ``from`` and ``to`` of a trade."""
+    try:
+        history, error = _history(trade_id)
+        if error:
+            return error
+        from_version = request.args.get("from", type=int)
+        to_version = request.args.get("to", type=int)
+        if from_version is None or to_version is None:
+            return jsonify({"error": "from and to version numbers are required"}), 400
+        differences = get_version_index().diff(history, from_version, to_version)
+        if differences is None:
+            return jsonify({"error": f"Trade {trade_id} has no version {from_version} or {to_version}"}), 404
+        return jsonify(differences), 200
+    except Exception as exc:
+        logger.exception("Error diffing versions of %s", trade_id)
+        return jsonify({"error": str(exc)}), 500
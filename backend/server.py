@@ -1,13 +1,15 @@
 """
 Termsheet Validator — Flask application entry point.
 
-Registers blueprints, sets up scheduled jobs, and configures upload routes.
+``create_app()`` registers blueprints, sets up scheduled jobs, and
+configures upload routes.
 """
 
 from __future__ import annotations
 
 import json
 import os
+from datetime import datetime
 
 from flask import Flask, jsonify, request
 from flask_apscheduler import APScheduler
@@ -15,6 +17,8 @@ from flask_cors import CORS
 
 from config import (
     DATA_DIR,
+    JOB_TTL_HOURS,
+    RISK_SNAPSHOT_POLL_SECONDS,
     SCHEDULER_INTERVAL_MINUTES,
     TEXT_FOLDER,
     UPLOAD_FOLDER,
@@ -24,75 +28,129 @@ from config import (
 logger = get_logger(__name__)
 
 # ---------------------------------------------------------------------------
-# Ensure directories exist
+# Scheduled jobs
 # ---------------------------------------------------------------------------
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-os.makedirs(TEXT_FOLDER, exist_ok=True)
-os.makedirs(DATA_DIR, exist_ok=True)
-
-# ---------------------------------------------------------------------------
-# App factory
-# ---------------------------------------------------------------------------
-
-
-class _SchedulerConfig:
-    SCHEDULER_API_ENABLED = True
 
 
-app = Flask(__name__)
-app.config.from_object(_SchedulerConfig())
-CORS(app)
-
-# ---------------------------------------------------------------------------
-# Scheduler
-# ---------------------------------------------------------------------------
-scheduler = APScheduler()
-scheduler.init_app(app)
-scheduler.start()
-
-
-@scheduler.task("interval", id="fetch_and_send_pdfs", minutes=SCHEDULER_INTERVAL_MINUTES)
 def _scheduled_fetch_pdfs():
     from fetch_and_send import fetch_and_send_pdfs
 
     fetch_and_send_pdfs()
 
 
-@scheduler.task("interval", id="fetch_and_process_emails", minutes=SCHEDULER_INTERVAL_MINUTES)
 def _scheduled_fetch_emails():
     from fetch_and_send_text import fetch_and_process_emails
 
     fetch_and_process_emails()
 
 
-@scheduler.task("interval", id="process_pdf_files", minutes=SCHEDULER_INTERVAL_MINUTES)
 def _scheduled_process_pdfs():
     from main import process_pdf_files
 
     process_pdf_files()
 
 
+def _scheduled_prune_jobs():
+    from job_queue import get_job_queue
+
+    get_job_queue().prune()
+
+
+def _scheduled_refresh_risk_snapshot():
+    from validators.reference_data import refresh_risk_cache
+
+    refresh_risk_cache()
+
+
+class _SchedulerConfig:
+    SCHEDULER_API_ENABLED = True
+
+
+def _start_scheduler(app: Flask) -> APScheduler:
+    scheduler = APScheduler()
+    scheduler.init_app(app)
+    scheduler.add_job(
+        id="fetch_and_send_pdfs", func=_scheduled_fetch_pdfs,
+        trigger="interval", minutes=SCHEDULER_INTERVAL_MINUTES,
+    )
+    scheduler.add_job(
+        id="fetch_and_process_emails", func=_scheduled_fetch_emails,
+        trigger="interval", minutes=SCHEDULER_INTERVAL_MINUTES,
+    )
+    scheduler.add_job(
+        id="process_pdf_files", func=_scheduled_process_pdfs,
+        trigger="interval", minutes=SCHEDULER_INTERVAL_MINUTES,
+    )
+    if JOB_TTL_HOURS > 0:
+        scheduler.add_job(
+            id="prune_jobs", func=_scheduled_prune_jobs,
+            trigger="interval", hours=1, next_run_time=datetime.now(),
+        )
+    if RISK_SNAPSHOT_POLL_SECONDS > 0:
+        scheduler.add_job(
+            id="refresh_risk_snapshot", func=_scheduled_refresh_risk_snapshot,
+            trigger="interval", seconds=RISK_SNAPSHOT_POLL_SECONDS, next_run_time=datetime.now(),
+        )
+    scheduler.start()
+    return scheduler
+
+
 # ---------------------------------------------------------------------------
-# Blueprints
+# App factory
 # ---------------------------------------------------------------------------
-from routes.termsheet_routes import termsheet_bp  # noqa: E402
-from routes.trader_routes import trader_bp  # noqa: E402
-from routes.stats_routes import stats_bp  # noqa: E402
-from extraction_routes import extraction_bp  # noqa: E402
-from gemini_extractor import gemini_extractor_bp  # noqa: E402
-
-app.register_blueprint(termsheet_bp)
-app.register_blueprint(trader_bp)
-app.register_blueprint(stats_bp)
-app.register_blueprint(extraction_bp)
-app.register_blueprint(gemini_extractor_bp)
+
+
+def create_app() -> Flask:
+    """Build the app: directories, scheduler, blueprints and routes.
+
+    Nothing happens at import time.  The PDF pools start workers with
+    "spawn", which re-imports this module as ``__mp_main__`` in every
+    worker; those imports must not start a scheduler or open the JSON
+    collections.
+    """
+    os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+    os.makedirs(TEXT_FOLDER, exist_ok=True)
+    os.makedirs(DATA_DIR, exist_ok=True)
+
+    app = Flask(__name__)
+    app.config.from_object(_SchedulerConfig())
+    CORS(app, expose_headers=["X-Next-Cursor"])
+
+    _start_scheduler(app)
+
+    from routes.termsheet_routes import termsheet_bp
+    from routes.trader_routes import trader_bp
+    from routes.stats_routes import stats_bp
+    from routes.job_routes import job_bp
+    from routes.version_routes import version_bp
+    from extraction_routes import extraction_bp
+    from gemini_extractor import gemini_extractor_bp
+
+    app.register_blueprint(termsheet_bp)
+    app.register_blueprint(trader_bp)
+    app.register_blueprint(stats_bp)
+    app.register_blueprint(job_bp)
+    app.register_blueprint(version_bp)
+    app.register_blueprint(extraction_bp)
+    app.register_blueprint(gemini_extractor_bp)
+
+    # The blueprints above registered the job handlers; pick up where the
+    # previous process stopped.
+    from job_queue import get_job_queue
+
+    get_job_queue().resume()
+
+    app.add_url_rule("/health", view_func=health_check, methods=["GET"])
+    app.add_url_rule("/upload", view_func=upload_file, methods=["POST"])
+    app.add_url_rule("/upload_text", view_func=upload_text, methods=["POST"])
+    return app
+
 
 # ---------------------------------------------------------------------------
 # Health check
 # ---------------------------------------------------------------------------
 
 
-@app.route("/health", methods=["GET"])
 def health_check():
     """Quick health check — always returns 200 if the server is running."""
     return jsonify({"status": "ok"}), 200
@@ -103,7 +161,6 @@ def health_check():
 # ---------------------------------------------------------------------------
 
 
-@app.route("/upload", methods=["POST"])
 def upload_file():
     """Accept a PDF file upload and save to the uploads directory."""
     file = request.files.get("file")
@@ -117,7 +174,6 @@ def upload_file():
     return jsonify({"message": "File received and saved"}), 200
 
 
-@app.route("/upload_text", methods=["POST"])
 def upload_text():
     """Accept termsheet text data (subject + key-value pairs) as JSON."""
     data = request.get_json()
@@ -144,4 +200,6 @@ def upload_text():
 # Run
 # ---------------------------------------------------------------------------
 if __name__ == "__main__":
-    app.run(debug=True)
+    # No reloader: its watcher process would build the app too, starting a
+    # second scheduler and taking the collection locks from the server.
+    create_app().run(debug=True, use_reloader=False)
@@ -0,0 +1,27 @@
+import atexit
+import os
+import shutil
+import sys
+import tempfile
+
+import pytest
+
+# Tests import backend modules the way server.py does (backend/ on sys.path).
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+# Route modules open their collections at import; keep them (and anything
+# else config points at) out of the real data folders.
+_SCRATCH = tempfile.mkdtemp(prefix="termsheet-tests-")
+atexit.register(shutil.rmtree, _SCRATCH, ignore_errors=True)
+for _name in ("DATA_DIR", "UPLOAD_FOLDER", "TEXT_FOLDER", "METADATA_DIR", "EMAIL_METADATA_DIR"):
+    os.environ[_name] = os.path.join(_SCRATCH, _name.lower())
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """Point the JSON store at a fresh directory."""
+    import json_store
+
+    monkeypatch.setattr(json_store, "DATA_DIR", str(tmp_path))
+    return tmp_path
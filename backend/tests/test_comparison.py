@@ -0,0 +1,78 @@
+import math
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from validators.comparison import ComparisonPlan, display
+
+FIELDS = ["notional_amount", "fixed_rate", "maturity_date", "reset_dates", "currency"]
+TYPES = {"notional_amount": "number", "fixed_rate": "number", "maturity_date": "date", "reset_dates": "json"}
+VALUES = [
+    "", " ", None, math.nan, pd.NaT, "nan", 0, 1, 1.0, "1", " 1 ", "1,000,000", 1_000_000.0,
+    "0.05", 0.05, "2024-01-05", pd.Timestamp("2024-01-05"), "05 Jan 2024", ["2024-01", "2024-02"],
+    '["2024-01","2024-02"]', {"a": 1}, True, "yes", "USD", " USD", "usd",
+]
+
+
+@pytest.fixture
+def plan():
+    return ComparisonPlan(FIELDS, ["notional_amount"], TYPES)
+
+
+def _per_row(plan, rows, field):
+    """What ``columns`` must return: each row's own key map applied."""
+    return [row.get(plan.key_map(row)[field], "") for row in rows]
+
+
+def test_columns_resolve_keys_per_key_set(plan):
+    rows = [
+        {"Notional_Amount": 1, "fixed_rate": 2, "currency": "USD", "reset_dates": [1, 2]},
+        {"notional_amount": 3, "FIXED_RATE": 4},
+        {"Notional_Amount": 5, "fixed_rate": 6, "currency": "EUR", "reset_dates": [3]},
+        {},
+        {"notional_amount": 7, "NOTIONAL_AMOUNT": 8, "maturity_date": "2024-01-05",
+         "fixed_rate": 1, "reset_dates": [], "currency": "GBP"},
+    ]
+    columns = plan.columns(rows)
+    assert list(columns) == FIELDS
+    for field in FIELDS:
+        assert columns[field].dtype == object and columns[field].shape == (len(rows),)
+        assert list(columns[field]) == _per_row(plan, rows, field)
+    assert columns["notional_amount"][4] == 7  # first matching key wins
+    assert columns["reset_dates"][0] == [1, 2]  # list values stay whole
+
+
+def test_columns_of_no_rows(plan):
+    assert {field: len(values) for field, values in plan.columns([]).items()} == dict.fromkeys(FIELDS, 0)
+
+
+def test_columns_with_a_single_field():
+    plan = ComparisonPlan(["rate"])
+    assert list(plan.columns([{"Rate": 1}, {}, {"rate": 2}])["rate"]) == [1, "", 2]
+
+
+def test_mismatches_match_pairwise_equality(plan):
+    rng = random.Random(15)
+    for field in FIELDS:
+        current = np.array([None] * 400, dtype=object)
+        reference = np.array([None] * 400, dtype=object)
+        for i in range(400):
+            current[i] = rng.choice(VALUES)
+            reference[i] = display(rng.choice(VALUES))  # the reference side holds strings
+        expected = [i for i in range(400) if not plan.equal(field, current[i], reference[i])]
+        assert list(plan.mismatches(field, current, reference)) == expected, field
+
+
+def test_mismatches_agree_with_compare(plan):
+    rng = random.Random(16)
+    rows = [{field: rng.choice(VALUES) for field in FIELDS if rng.random() < 0.8} for _ in range(300)]
+    refs = [{field: display(rng.choice(VALUES)) for field in FIELDS} for _ in range(300)]
+    columns = plan.columns(rows)
+    reported = {i: [] for i in range(len(rows))}
+    for field in FIELDS:
+        ref_values = np.array([ref[field] for ref in refs], dtype=object)
+        for i in plan.mismatches(field, columns[field], ref_values):
+            reported[int(i)].append(plan.anomaly(field, columns[field][i], ref_values[i]))
+    assert reported == {i: plan.compare(row, ref) for i, (row, ref) in enumerate(zip(rows, refs))}
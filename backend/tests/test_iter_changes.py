@@ -0,0 +1,147 @@
+import copy
+import random
+
+import pytest
+
+from base_extractor import BaseVersionedExtractor, iter_changes
+
+
+def _changes(old, new):
+    return list(iter_changes(old, new))
+
+
+def _apply(value, changes):
+    """Apply path-addressed *changes* to a copy of *value*."""
+    root = {"": copy.deepcopy(value)}
+    # Removals first, from the highest list index down, so indexes stay valid.
+    removals = sorted((c for c in changes if c["type"] == "removed"), key=lambda c: c["path"], reverse=True)
+    for change in removals + [c for c in changes if c["type"] != "removed"]:
+        path = ["", *change["path"]]
+        parent = root
+        for key in path[:-1]:
+            parent = parent[key]
+        key = path[-1]
+        if change["type"] == "removed":
+            del parent[key]
+        elif change["type"] == "added" and isinstance(parent, list):
+            parent.insert(key, change["new"])
+        else:
+            parent[key] = change["new"]
+    return root[""]
+
+
+def test_equal_values_have_no_changes():
+    value = {"a": [1, {"b": [2, 3]}], "c": None}
+    assert _changes(value, copy.deepcopy(value)) == []
+
+
+def test_nested_paths():
+    old = {"legs": [{"rate": 1.0, "dates": ["2024-01", "2024-02"]}, {"rate": 2.0}], "ccy": "EUR"}
+    new = {"legs": [{"rate": 1.5, "dates": ["2024-01", "2024-03"]}, {"rate": 2.0, "fixed": True}], "ccy": "EUR"}
+    assert _changes(old, new) == [
+        {"path": ["legs", 0, "rate"], "type": "modified", "old": 1.0, "new": 1.5},
+        {"path": ["legs", 0, "dates", 1], "type": "modified", "old": "2024-02", "new": "2024-03"},
+        {"path": ["legs", 1, "fixed"], "type": "added", "new": True},
+    ]
+
+
+def test_keys_added_and_removed():
+    assert _changes({"a": 1, "b": {"x": 1}}, {"b": {}, "c": [1]}) == [
+        {"path": ["a"], "type": "removed", "old": 1},
+        {"path": ["b", "x"], "type": "removed", "old": 1},
+        {"path": ["c"], "type": "added", "new": [1]},
+    ]
+
+
+def test_list_grows_and_shrinks():
+    assert _changes([1, 2], [1, 3, 4, 5]) == [
+        {"path": [1], "type": "modified", "old": 2, "new": 3},
+        {"path": [2], "type": "added", "new": 4},
+        {"path": [3], "type": "added", "new": 5},
+    ]
+    assert _changes({"l": [1, 2, 3]}, {"l": [1]}) == [
+        {"path": ["l", 1], "type": "removed", "old": 2},
+        {"path": ["l", 2], "type": "removed", "old": 3},
+    ]
+    assert _changes([], [[]]) == [{"path": [0], "type": "added", "new": []}]
+
+
+@pytest.mark.parametrize("old, new", [
+    ({"a": 1}, [1]),
+    ([1], {"0": 1}),
+    ("1", 1),
+    (1, None),
+])
+def test_type_change_is_one_modification(old, new):
+    changes = _changes({"x": old}, {"x": new})
+    assert changes == [{"path": ["x"], "type": "modified", "old": old, "new": new}]
+
+
+def test_type_change_is_reported_where_it_happens():
+    old = {"a": {"b": {"c": 1}, "l": [1, 2]}}
+    new = {"a": {"b": "c", "l": {"0": 1}}}
+    assert _changes(old, new) == [
+        {"path": ["a", "b"], "type": "modified", "old": {"c": 1}, "new": "c"},
+        {"path": ["a", "l"], "type": "modified", "old": [1, 2], "new": {"0": 1}},
+    ]
+
+
+def test_equal_numbers_of_different_types_are_equal():
+    # Equality is Python's, so 1 and 1.0 do not count as a change.
+    assert _changes({"a": 1}, {"a": 1.0}) == []
+
+
+def _random_value(rng, depth=0):
+    roll = rng.random()
+    if depth < 3 and roll < 0.3:
+        return {f"k{rng.randint(0, 4)}": _random_value(rng, depth + 1) for _ in range(rng.randint(0, 4))}
+    if depth < 3 and roll < 0.55:
+        return [_random_value(rng, depth + 1) for _ in range(rng.randint(0, 4))]
+    return rng.choice([None, True, 0, 1, 2.5, "a", "b"])
+
+
+def _mutate(rng, value, depth=0):
+    if rng.random() < 0.15 or depth > 3:
+        return _random_value(rng, depth)
+    if isinstance(value, dict):
+        value = dict(value)
+        for key in list(value):
+            if rng.random() < 0.2:
+                del value[key]
+            elif rng.random() < 0.5:
+                value[key] = _mutate(rng, value[key], depth + 1)
+        if rng.random() < 0.3:
+            value[f"k{rng.randint(0, 6)}"] = _random_value(rng, depth + 1)
+        return value
+    if isinstance(value, list):
+        value = [_mutate(rng, item, depth + 1) if rng.random() < 0.4 else item for item in value]
+        if rng.random() < 0.3:
+            del value[rng.randint(0, len(value)):]
+        if rng.random() < 0.3:
+            value.extend(_random_value(rng, depth + 1) for _ in range(rng.randint(1, 3)))
+        return value
+    return value
+
+
+def test_changes_rebuild_the_new_value():
+    rng = random.Random(25)
+    for _ in range(500):
+        old = {"doc": _random_value(rng)}
+        new = {"doc": _mutate(rng, old["doc"])}
+        changes = _changes(old, new)
+        assert _apply(old, changes) == new
+        assert (changes == []) == (old == new)
+
+
+def test_compute_differences_lists_changes_under_each_field():
+    old = {"Notional": {"value": 1}, "Legs": [1, 2], "Old": True}
+    new = {"Notional": {"value": 2}, "Legs": [1], "New": "x"}
+    diff = BaseVersionedExtractor.compute_differences(old, new, 2, "t")
+    assert diff["modified"] == {"Notional": {"old": {"value": 1}, "new": {"value": 2}}, "Legs": {"old": [1, 2], "new": [1]}}
+    assert diff["removed"] == {"Old": True} and diff["added"] == {"New": "x"}
+    assert diff["changes"] == [
+        {"path": ["Notional", "value"], "type": "modified", "old": 1, "new": 2},
+        {"path": ["Legs", 1], "type": "removed", "old": 2},
+        {"path": ["Old"], "type": "removed", "old": True},
+        {"path": ["New"], "type": "added", "new": "x"},
+    ]
@@ -0,0 +1,238 @@
+import json
+import os
+import signal
+import subprocess
+import sys
+import textwrap
+import threading
+import time
+
+import pytest
+
+from json_store import CollectionLockedError, DuplicateKeyError, JsonCollection
+
+from conftest import BACKEND_DIR
+
+
+def _wait_for_compaction(col, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while col._compacting:
+        assert time.monotonic() < deadline, "compaction did not finish"
+        time.sleep(0.01)
+
+
+def _reopen(col, **kwargs):
+    col.close()
+    return JsonCollection(col.name, **kwargs)
+
+
+def _run(data_dir, code, wait=True):
+    """Run *code* in a separate Python process using *data_dir*."""
+    env = {**os.environ, "DATA_DIR": str(data_dir), "PYTHONPATH": BACKEND_DIR}
+    proc = subprocess.Popen(
+        [sys.executable, "-c", textwrap.dedent(code)],
+        env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True,
+    )
+    if wait:
+        proc.wait(timeout=60)
+    return proc
+
+
+def _snapshot_ids(data_dir, name):
+    with open(data_dir / f"{name}.json", encoding="utf-8") as fh:
+        return sorted(doc["_id"] for doc in json.load(fh))
+
+
+# ---------------------------------------------------------------------------
+# Write-ahead log
+# ---------------------------------------------------------------------------
+
+def test_log_is_replayed_on_reopen(data_dir):
+    col = JsonCollection("t")
+    col.insert_one({"_id": "a", "n": 1})
+    col.insert_many([{"_id": "b", "n": 2}, {"_id": "c", "n": 3}])
+    col.update_one({"_id": "a"}, {"$set": {"n": 10}})
+    col.delete_one({"_id": "b"})
+    assert (data_dir / "t.wal").stat().st_size > 0
+
+    col = _reopen(col)
+    assert col.find(sort=[("_id", 1)]) == [{"_id": "a", "n": 10}, {"_id": "c", "n": 3}]
+    # The log was folded into the snapshot on startup.
+    assert _snapshot_ids(data_dir, "t") == ["a", "c"]
+    assert not (data_dir / "t.wal").exists() or (data_dir / "t.wal").stat().st_size == 0
+
+
+def test_torn_final_line_is_dropped(data_dir):
+    col = JsonCollection("t")
+    col.insert_one({"_id": "a"})
+    col.insert_one({"_id": "b"})
+    col.close()
+    with open(data_dir / "t.wal", "a", encoding="utf-8") as fh:
+        fh.write('{"op": "insert", "doc": {"_id": "c"')  # crash mid-write
+
+    col = JsonCollection("t")
+    assert sorted(d["_id"] for d in col.find()) == ["a", "b"]
+    col.insert_one({"_id": "c"})
+    assert sorted(d["_id"] for d in _reopen(col).find()) == ["a", "b", "c"]
+
+
+def test_insert_many_is_all_or_nothing(data_dir):
+    col = JsonCollection("t")
+    col.create_index("email", unique=True)
+    col.insert_one({"_id": "a", "email": "a@x"})
+
+    with pytest.raises(DuplicateKeyError):
+        col.insert_many([{"_id": "b"}, {"_id": "a"}])
+    with pytest.raises(DuplicateKeyError):
+        col.insert_many([{"_id": "c"}, {"_id": "c"}])
+    with pytest.raises(DuplicateKeyError):
+        col.insert_many([{"_id": "d", "email": "d@x"}, {"_id": "e", "email": "d@x"}])
+    with pytest.raises(DuplicateKeyError):
+        col.insert_many([{"_id": "f", "email": "a@x"}])
+
+    assert [d["_id"] for d in col.find()] == ["a"]
+    assert [d["_id"] for d in _reopen(col).find()] == ["a"]
+
+
+def test_update_one_upsert(data_dir):
+    col = JsonCollection("t")
+    result = col.update_one({"_id": "a"}, {"$set": {"n": 1}}, upsert=True)
+    assert (result.matched_count, result.upserted_id) == (0, "a")
+    result = col.update_one({"_id": "a"}, {"$set": {"n": 2}}, upsert=True)
+    assert (result.matched_count, result.upserted_id) == (1, None)
+    assert col.update_one({"_id": "zz"}, {"$set": {"n": 3}}).matched_count == 0
+
+    upserted = col.update_one({"email": "b@x"}, {"$set": {"n": 4}}, upsert=True).upserted_id
+    col = _reopen(col)
+    assert col.find_one({"_id": "a"}) == {"_id": "a", "n": 2}
+    assert col.find_one({"_id": upserted}) == {"_id": upserted, "email": "b@x", "n": 4}
+    assert col.find_one({"_id": "zz"}) is None
+
+
+# ---------------------------------------------------------------------------
+# Compaction
+# ---------------------------------------------------------------------------
+
+def test_background_compaction_folds_the_log_into_the_snapshot(data_dir):
+    col = JsonCollection("t", compact_every=5)
+    for i in range(12):
+        col.insert_one({"_id": f"d{i:02d}"})
+        _wait_for_compaction(col)
+
+    assert not (data_dir / "t.wal.compacting").exists()
+    assert len(_snapshot_ids(data_dir, "t")) == 10  # compacted at 5 and 10 writes
+    assert len((data_dir / "t.wal").read_text().splitlines()) == 2
+    assert len(_reopen(col).find()) == 12
+
+
+def test_failed_compaction_keeps_its_log_for_the_next_rotation(data_dir):
+    col = JsonCollection("t", compact_every=2)
+
+    def fail(payload):
+        raise OSError("disk full")
+
+    col._write_snapshot = fail
+    col.insert_many([{"_id": "a"}, {"_id": "b"}])
+    _wait_for_compaction(col)
+    assert (data_dir / "t.wal.compacting").exists()
+
+    col.insert_many([{"_id": "c"}, {"_id": "d"}])  # rotates again, appending to the unfolded log
+    _wait_for_compaction(col)
+    assert len((data_dir / "t.wal.compacting").read_text().splitlines()) == 4
+
+    del col._write_snapshot
+    assert sorted(d["_id"] for d in _reopen(col).find()) == ["a", "b", "c", "d"]
+
+
+def test_compaction_while_writes_are_in_flight(data_dir):
+    col = JsonCollection("t", compact_every=7)
+    col.insert_many([{"_id": f"seed{i}", "n": 0} for i in range(50)])
+
+    def writer(w):
+        for i in range(150):
+            col.insert_one({"_id": f"w{w}-{i}", "n": i})
+            if i % 3 == 0:
+                col.update_one({"_id": f"seed{(w + i) % 50}"}, {"$set": {"n": i}})
+            if i % 5 == 0:
+                col.delete_one({"_id": f"w{w}-{i // 2}"})
+
+    threads = [threading.Thread(target=writer, args=(w,)) for w in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    _wait_for_compaction(col)
+
+    expected = sorted((d["_id"], d["n"]) for d in col.find())
+    col = _reopen(col)
+    assert sorted((d["_id"], d["n"]) for d in col.find()) == expected
+
+
+# ---------------------------------------------------------------------------
+# Crash recovery and process ownership
+# ---------------------------------------------------------------------------
+
+def test_kill_after_log_append_before_compaction(data_dir):
+    proc = _run(data_dir, """
+        import os
+        from json_store import JsonCollection
+        col = JsonCollection("t", compact_every=1000)
+        for i in range(20):
+            col.insert_one({"_id": f"d{i}", "n": i})
+        col.update_one({"_id": "d3"}, {"$set": {"n": -3}})
+        os.kill(os.getpid(), 9)
+    """)
+    assert proc.returncode == -signal.SIGKILL
+
+    col = JsonCollection("t")
+    assert len(col.find()) == 20
+    assert col.find_one({"_id": "d3"})["n"] == -3
+
+
+def test_kill_during_compaction(data_dir):
+    proc = _run(data_dir, """
+        import os, sys, time
+        from json_store import JsonCollection
+        col = JsonCollection("t", compact_every=10)
+        col._write_snapshot = lambda payload: time.sleep(60)   # compaction never finishes
+        for i in range(15):
+            col.insert_one({"_id": f"d{i}"})
+        print("ready", flush=True)
+        time.sleep(60)
+    """, wait=False)
+    try:
+        assert proc.stdout.readline().strip() == "ready"
+        assert (data_dir / "t.wal.compacting").exists()
+    finally:
+        proc.kill()
+        proc.wait()
+
+    col = JsonCollection("t")
+    assert sorted(d["_id"] for d in col.find()) == sorted(f"d{i}" for i in range(15))
+    assert not (data_dir / "t.wal.compacting").exists()
+
+
+def test_second_process_is_refused(data_dir):
+    col = JsonCollection("t")
+    col.insert_one({"_id": "a"})
+
+    proc = _run(data_dir, """
+        from json_store import CollectionLockedError, JsonCollection
+        try:
+            JsonCollection("t")
+        except CollectionLockedError:
+            print("locked")
+    """)
+    assert proc.stdout.read().strip() == "locked"
+
+    # The owner's log is untouched and still written to.
+    col.insert_one({"_id": "b"})
+    assert sorted(d["_id"] for d in _reopen(col).find()) == ["a", "b"]
+
+
+def test_lock_is_released_on_close(data_dir):
+    col = JsonCollection("t")
+    with pytest.raises(CollectionLockedError):
+        JsonCollection("t")
+    col.close()
+    JsonCollection("t").close()
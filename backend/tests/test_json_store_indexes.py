@@ -0,0 +1,173 @@
+import random
+
+import pytest
+
+from json_store import DuplicateKeyError, JsonCollection
+
+
+@pytest.fixture
+def col(data_dir):
+    col = JsonCollection("t")
+    yield col
+    col.close()
+
+
+def _index_state(col):
+    return {field: {value: list(ids) for value, ids in index._buckets.items()}
+            for field, index in col._indexes.items()}
+
+
+def _scan(col, query):
+    return [d for d in col._docs.values() if all(d.get(k) == v for k, v in query.items())]
+
+
+# ---------------------------------------------------------------------------
+# Unique indexes
+# ---------------------------------------------------------------------------
+
+def test_unique_index_rejects_duplicates(col):
+    col.create_index("email", unique=True)
+    col.insert_one({"_id": "a", "email": "a@x"})
+    col.insert_one({"_id": "b", "email": "b@x"})
+
+    with pytest.raises(DuplicateKeyError):
+        col.insert_one({"_id": "c", "email": "a@x"})
+    with pytest.raises(DuplicateKeyError):
+        col.update_one({"_id": "b"}, {"$set": {"email": "a@x"}})
+    with pytest.raises(DuplicateKeyError):
+        col.update_one({"_id": "z"}, {"$set": {"email": "b@x"}}, upsert=True)
+
+    assert col.find_one({"_id": "c"}) is None
+    assert col.find_one({"_id": "z"}) is None
+    assert col.find_one({"_id": "b"})["email"] == "b@x"
+
+
+def test_unique_index_allows_own_value_and_missing_values(col):
+    col.create_index("email", unique=True)
+    col.insert_one({"_id": "a", "email": "a@x"})
+    col.update_one({"_id": "a"}, {"$set": {"email": "a@x", "n": 1}})
+    col.insert_many([{"_id": "b"}, {"_id": "c", "email": None}, {"_id": "d", "email": None}])
+    assert len(col.find()) == 4
+
+
+def test_unique_index_over_existing_duplicates_stays_non_unique(col):
+    col.insert_many([{"_id": "a", "email": "x"}, {"_id": "b", "email": "x"}])
+    col.create_index("email", unique=True)
+    assert not col._indexes["email"].unique
+    col.insert_one({"_id": "c", "email": "x"})
+    assert [d["_id"] for d in col.find({"email": "x"})] == ["a", "b", "c"]
+
+
+def test_freed_value_can_be_reused(col):
+    col.create_index("email", unique=True)
+    col.insert_one({"_id": "a", "email": "a@x"})
+    col.update_one({"_id": "a"}, {"$set": {"email": "new@x"}})
+    col.insert_one({"_id": "b", "email": "a@x"})
+    col.delete_one({"_id": "b"})
+    col.insert_one({"_id": "c", "email": "a@x"})
+    assert col.find_one({"email": "a@x"})["_id"] == "c"
+    assert col.find_one({"email": "new@x"})["_id"] == "a"
+
+
+# ---------------------------------------------------------------------------
+# Index state after failed writes
+# ---------------------------------------------------------------------------
+
+def test_rejected_writes_leave_indexes_unchanged(col):
+    col.create_index("email", unique=True)
+    col.create_index("status")
+    col.insert_many([
+        {"_id": "a", "email": "a@x", "status": "open"},
+        {"_id": "b", "email": "b@x", "status": "open"},
+    ])
+    before = _index_state(col)
+
+    with pytest.raises(DuplicateKeyError):
+        col.update_one({"_id": "b"}, {"$set": {"email": "a@x", "status": "closed"}})
+    with pytest.raises(DuplicateKeyError):
+        col.insert_many([{"_id": "c", "email": "c@x", "status": "new"}, {"_id": "d", "email": "a@x"}])
+    assert col.delete_one({"_id": "missing"}).deleted_count == 0
+    assert col.update_one({"_id": "missing"}, {"$set": {"status": "x"}}).matched_count == 0
+
+    assert _index_state(col) == before
+    assert [d["_id"] for d in col.find({"status": "open"})] == ["a", "b"]
+
+
+def test_failed_log_write_leaves_indexes_unchanged(col, monkeypatch):
+    col.create_index("status")
+    col.insert_many([{"_id": "a", "status": "open"}, {"_id": "b", "status": "open"}])
+    before = _index_state(col)
+
+    def fail(data):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(col._wal, "write", fail)
+    with pytest.raises(OSError):
+        col.update_one({"_id": "a"}, {"$set": {"status": "closed"}})
+    with pytest.raises(OSError):
+        col.delete_one({"_id": "b"})
+    with pytest.raises(OSError):
+        col.insert_one({"_id": "c", "status": "open"})
+
+    assert _index_state(col) == before
+    assert [d["_id"] for d in col.find({"status": "open"})] == ["a", "b"]
+    assert col.find({"status": "closed"}) == []
+
+
+# ---------------------------------------------------------------------------
+# Query planner
+# ---------------------------------------------------------------------------
+
+def test_plan_prefers_id_then_the_most_selective_index(col):
+    col.create_index("status")
+    col.create_index("owner")
+    col.insert_many([{"_id": i, "status": "open", "owner": f"o{i % 10}"} for i in range(100)])
+
+    assert col._plan({"_id": 5, "owner": "o5"})[0] == "_id"
+    assert col._plan({"status": "open", "owner": "o5"})[0] == "owner"
+    assert col._plan({"status": "open", "other": 1})[0] == "status"
+    assert col._plan({"other": 1})[0] == "scan"
+    assert col._plan({"owner": ["o5"]})[0] == "scan"  # unhashable values bypass the index
+
+
+def test_plan_matches_a_full_scan(col):
+    rng = random.Random(1234)
+    values = ["a", "b", "c", None, 1, 1.0, True, ["a"], {"k": "a"}]
+
+    def random_doc():
+        doc = {}
+        for field in ("status", "owner", "kind"):
+            if rng.random() < 0.85:
+                doc[field] = rng.choice(values)
+        return doc
+
+    col.create_index("status")
+    col.create_index("owner")
+    ids = []
+    for step in range(1500):
+        roll = rng.random()
+        if roll < 0.6 or not ids:
+            ids.append(col.insert_one(random_doc()).inserted_id)
+        elif roll < 0.85:
+            col.update_one({"_id": rng.choice(ids)}, {"$set": random_doc()})
+        else:
+            doc_id = ids.pop(rng.randrange(len(ids)))
+            col.delete_one({"_id": doc_id})
+        if step == 700:
+            col.create_index("kind")  # built over existing documents
+
+    for _ in range(400):
+        query = {field: rng.choice(values) for field in rng.sample(["status", "owner", "kind"], rng.randint(1, 3))}
+        expected = _scan(col, query)
+        assert col.find(query) == expected, query
+        assert col.find_one(query) == (expected[0] if expected else None)
+
+    # Indexes rebuilt from disk answer the same way.
+    col.close()
+    reopened = JsonCollection("t")
+    for field in ("status", "owner", "kind"):
+        reopened.create_index(field)
+    for _ in range(100):
+        query = {field: rng.choice(values) for field in rng.sample(["status", "owner", "kind"], 2)}
+        assert reopened.find(query) == _scan(reopened, query), query
+    reopened.close()
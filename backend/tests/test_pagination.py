@@ -0,0 +1,163 @@
+import json
+import random
+
+import pytest
+from flask import Flask
+
+import routes.termsheet_routes as termsheet_routes
+from json_store import JsonCollection
+
+
+@pytest.fixture
+def col(data_dir):
+    col = JsonCollection("termsheets")
+    yield col
+    col.close()
+
+
+def _walk(col, limit, sort=None, between_pages=None, **kwargs):
+    """Follow cursors to the end, calling *between_pages* after each page."""
+    seen, cursor = [], None
+    while True:
+        docs, cursor = col.find_page(sort=sort, limit=limit, after=cursor, **kwargs)
+        seen.extend(docs)
+        if cursor is None:
+            return seen
+        if between_pages:
+            between_pages()
+
+
+# ---------------------------------------------------------------------------
+# JsonCollection.find_page
+# ---------------------------------------------------------------------------
+
+@pytest.mark.parametrize("sort", [None, [("rank", 1)], [("rank", -1)]])
+def test_walk_is_stable_under_concurrent_writes(col, sort):
+    rng = random.Random(3)
+    # Few distinct ranks, so most pages end in the middle of a tie.
+    col.insert_many([{"_id": f"d{i:03d}", "rank": rng.choice([1, 2, 3, None])} for i in range(300)])
+    original = {d["_id"] for d in col.find()}
+    deleted, inserted = set(), set()
+    counter = iter(range(10_000))
+
+    def churn():
+        for _ in range(3):
+            doc_id = f"new{next(counter)}"
+            col.insert_one({"_id": doc_id, "rank": rng.choice([1, 2, 3, None])})
+            inserted.add(doc_id)
+        victim = rng.choice(sorted(original - deleted))
+        col.delete_one({"_id": victim})
+        deleted.add(victim)
+
+    seen = [d["_id"] for d in _walk(col, 7, sort=sort, between_pages=churn)]
+
+    assert len(seen) == len(set(seen)), "a document was returned twice"
+    assert original - deleted <= set(seen), "a document present throughout was skipped"
+    assert set(seen) <= original | inserted
+
+    # Every page continues from where the previous one stopped.
+    if sort:
+        field, direction = sort[0]
+        ranks = [(0 if r is None else r) for r in (col._docs[i]["rank"] for i in seen if i in col._docs)]
+        assert ranks == sorted(ranks, reverse=direction < 0)
+
+
+def test_ties_are_broken_by_insertion_order(col):
+    col.insert_many([{"_id": f"d{i:02d}", "rank": i % 3} for i in range(30)])
+    ascending = [d["_id"] for d in _walk(col, 4, sort=[("rank", 1)])]
+    descending = [d["_id"] for d in _walk(col, 4, sort=[("rank", -1)])]
+
+    assert ascending == [d["_id"] for d in sorted(col.find(), key=lambda d: d["rank"])]
+    # Descending is the exact reverse, ties included.
+    assert descending == ascending[::-1]
+
+
+def test_cursor_survives_deleting_its_document(col):
+    col.insert_many([{"_id": f"d{i}", "rank": i % 2} for i in range(10)])
+    for sort in (None, [("rank", -1)]):
+        first, cursor = col.find_page(sort=sort, limit=3)
+        first = [d["_id"] for d in first]
+        col.delete_one({"_id": first[-1]})
+        rest = [d["_id"] for d in col.find_page(sort=sort, after=cursor)[0]]
+        expected = [d["_id"] for d in col.find(sort=sort)]
+        assert rest == expected[expected.index(first[-2]) + 1:]
+        col.insert_one({"_id": first[-1], "rank": int(first[-1][1:]) % 2})
+
+
+def test_cursor_survives_a_restart(col):
+    col.insert_many([{"_id": f"d{i}", "rank": i % 4} for i in range(20)])
+    col.delete_one({"_id": "d0"})  # sequence numbers shift on reload
+    page, cursor = col.find_page(sort=[("rank", -1)], limit=6)
+    page = [d["_id"] for d in page]
+    col.close()
+
+    reopened = JsonCollection("termsheets")
+    rest, _ = reopened.find_page(sort=[("rank", -1)], after=cursor)
+    assert page + [d["_id"] for d in rest] == [d["_id"] for d in reopened.find(sort=[("rank", -1)])]
+    reopened.close()
+
+
+def test_projection(col):
+    col.insert_one({"_id": "a", "name": "x", "extractedText": "long", "status": "Pending"})
+    assert col.find(projection=["name"]) == [{"_id": "a", "name": "x"}]
+    assert col.find(projection=["-extractedText"]) == [{"_id": "a", "name": "x", "status": "Pending"}]
+    assert col.find(projection={"status": 0, "extractedText": 0}) == [{"_id": "a", "name": "x"}]
+    with pytest.raises(ValueError):
+        col.find_page(projection=["name", "-extractedText"])
+
+
+@pytest.mark.parametrize("cursor", ["garbage", "!!", "W10=", "eyJrIjogMX0="])
+def test_bad_cursor(col, cursor):
+    col.insert_one({"_id": "a"})
+    with pytest.raises(ValueError):
+        col.find_page(limit=1, after=cursor)
+
+
+# ---------------------------------------------------------------------------
+# GET /termsheets
+# ---------------------------------------------------------------------------
+
+@pytest.fixture
+def client(col, monkeypatch):
+    monkeypatch.setattr(termsheet_routes, "termsheet_collection", col)
+    app = Flask(__name__)
+    app.register_blueprint(termsheet_routes.termsheet_bp)
+    return app.test_client()
+
+
+@pytest.mark.parametrize("query", [
+    "limit=0", "limit=-5", "limit=abc", "limit=1.5",
+    "cursor=garbage", "limit=2&cursor=W10=",
+    "after_id=missing",
+    "fields=name,-extractedText",
+])
+def test_bad_requests(client, col, query):
+    col.insert_many([{"_id": f"d{i}", "a": i} for i in range(5)])
+    response = client.get(f"/termsheets?{query}")
+    assert response.status_code == 400
+    assert "error" in response.get_json()
+
+
+def test_route_pages_with_the_next_cursor_header(client, col):
+    col.insert_many([{"_id": f"d{i:03d}", "rank": i % 5, "extractedText": "x" * 100} for i in range(250)])
+
+    response = client.get("/termsheets")
+    assert len(response.get_json()) == termsheet_routes.DEFAULT_PAGE_SIZE
+    response = client.get("/termsheets?limit=100000")
+    assert len(response.get_json()) == 250
+
+    seen, url = [], "/termsheets?limit=40&sort=-rank&fields=-extractedText"
+    while True:
+        response = client.get(url)
+        assert response.status_code == 200
+        page = json.loads(response.data)
+        assert all("extractedText" not in d and "rank" in d for d in page)
+        seen.extend(d["_id"] for d in page)
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+        url = f"/termsheets?limit=40&sort=-rank&fields=-extractedText&cursor={cursor}"
+    assert seen == [d["_id"] for d in col.find(sort=[("rank", -1)])]
+
+    response = client.get("/termsheets?limit=3&after_id=d010&fields=rank,-_id")
+    assert response.get_json() == [{"_id": "d011", "rank": 1}, {"_id": "d012", "rank": 2}, {"_id": "d013", "rank": 3}]
@@ -0,0 +1,50 @@
+import pytest
+
+from pdf_text import iter_chunks
+
+CHUNK_SIZE = 6000
+OVERLAP = 1000
+
+
+def _split(text, pieces):
+    """*text* cut into *pieces* consecutive parts, as a page stream would deliver it."""
+    bounds = [i * len(text) // pieces for i in range(pieces + 1)]
+    return [text[start:end] for start, end in zip(bounds, bounds[1:])]
+
+
+def _chunk_lengths(length, pieces=1):
+    return [len(chunk) for chunk in iter_chunks(_split("x" * length, pieces), CHUNK_SIZE, OVERLAP)]
+
+
+@pytest.mark.parametrize("length", [1, 5000, 5001, 5500, 5999, 6000])
+@pytest.mark.parametrize("pieces", [1, 4])
+def test_text_up_to_chunk_size_is_one_chunk(length, pieces):
+    assert _chunk_lengths(length, pieces) == [length]
+
+
+@pytest.mark.parametrize("length, expected", [
+    (6001, [6000, 1001]),
+    (11000, [6000, 6000]),
+    (11001, [6000, 6000, 1001]),
+    (16000, [6000, 6000, 6000]),
+])
+@pytest.mark.parametrize("pieces", [1, 4])
+def test_chunks_stop_at_the_first_that_reaches_the_end(length, expected, pieces):
+    assert _chunk_lengths(length, pieces) == expected
+
+
+@pytest.mark.parametrize("pieces", [1, 3, 7, 40])
+def test_streamed_pieces_match_slicing_the_full_text(pieces):
+    text = "".join(chr(65 + i % 26) for i in range(23456))
+    chunks = list(iter_chunks(_split(text, pieces), CHUNK_SIZE, OVERLAP))
+    assert chunks == [text[0:6000], text[5000:11000], text[10000:16000], text[15000:21000], text[20000:]]
+
+
+def test_empty_text_has_no_chunks():
+    assert list(iter_chunks([], CHUNK_SIZE, OVERLAP)) == []
+    assert list(iter_chunks(["", ""], CHUNK_SIZE, OVERLAP)) == []
+
+
+def test_overlap_must_be_smaller_than_chunk_size():
+    with pytest.raises(ValueError):
+        list(iter_chunks(["x"], 100, 100))
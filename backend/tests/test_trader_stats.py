@@ -0,0 +1,115 @@
+import random
+from collections import defaultdict
+
+import pytest
+
+from json_store import JsonCollection
+from routes.stats_routes import TRADER_STATS, _trader_stats, _validation_counts
+
+TRADERS = ["t1@x", "t2@x", "t3@x", None, ["t1@x"]]
+FIELDS = ["Notional", "Currency", "Maturity", "Strike"]
+
+
+@pytest.fixture
+def col(data_dir):
+    col = JsonCollection("termsheets")
+    col.create_index("traderId")
+    col.create_aggregate(TRADER_STATS, "traderId", _validation_counts)
+    yield col
+    col.close()
+
+
+def _recount(docs):
+    """The per-trader totals computed from scratch."""
+    totals = defaultdict(lambda: {"documents": 0, "fully_validated": 0, "unvalidated_fields": 0})
+    for doc in docs:
+        trader = doc.get("traderId")
+        if trader is None or isinstance(trader, list):
+            continue
+        counts = _validation_counts(doc)
+        totals[trader]["documents"] += 1
+        totals[trader]["fully_validated"] += counts["fully_validated"]
+        totals[trader]["unvalidated_fields"] += counts["unvalidated_fields"]
+    return dict(totals)
+
+
+def _sheet(rng):
+    sheet = {"traderId": rng.choice(TRADERS), "status": "Pending"}
+    for field in rng.sample(FIELDS, rng.randint(0, len(FIELDS))):
+        sheet[field] = {"value": rng.random(), "validated": rng.random() < 0.6}
+    return sheet
+
+
+def test_counts_per_sheet():
+    sheet = {
+        "traderId": "t1@x",
+        "Notional": {"value": 1, "validated": True},
+        "Currency": {"value": "EUR", "validated": False},
+        "Strike": {"value": 2},  # not validated yet, but no flag either
+        "status": "Pending",
+    }
+    assert _validation_counts(sheet) == {"fully_validated": 0, "unvalidated_fields": 1}
+    sheet["Currency"]["validated"] = True
+    assert _validation_counts(sheet) == {"fully_validated": 1, "unvalidated_fields": 0}
+
+
+def test_aggregate_follows_inserts_updates_and_deletes(col):
+    rng = random.Random(21)
+    ids = []
+    for step in range(800):
+        roll = rng.random()
+        if roll < 0.4 or not ids:
+            ids.append(col.insert_one(_sheet(rng)).inserted_id)
+        elif roll < 0.55:
+            col.update_one({"_id": rng.choice(ids)}, {"$set": {"traderId": rng.choice(TRADERS)}})
+        elif roll < 0.8:
+            field = rng.choice(FIELDS)
+            value = {"value": rng.random(), "validated": rng.random() < 0.5}
+            col.update_one({"_id": rng.choice(ids)}, {"$set": {field: value}})
+        elif roll < 0.85:
+            col.update_one({"_id": rng.choice(ids)}, {"$set": {"status": "Validated"}})
+        else:
+            col.delete_one({"_id": ids.pop(rng.randrange(len(ids)))})
+
+        if step % 20 == 0:
+            assert col.aggregates(TRADER_STATS) == _recount(col.find()), step
+
+    expected = _recount(col.find())
+    assert col.aggregates(TRADER_STATS) == expected
+    for trader in ("t1@x", "t2@x", "t3@x"):
+        assert col.aggregate(TRADER_STATS, trader) == expected.get(trader)
+
+
+def test_group_key_change_moves_the_document(col):
+    col.insert_one({"_id": "a", "traderId": "t1@x", "Notional": {"validated": False}})
+    col.insert_one({"_id": "b", "traderId": "t1@x", "Notional": {"validated": True}})
+
+    col.update_one({"_id": "a"}, {"$set": {"traderId": "t2@x"}})
+    assert col.aggregate(TRADER_STATS, "t1@x") == {"documents": 1, "fully_validated": 1, "unvalidated_fields": 0}
+    assert col.aggregate(TRADER_STATS, "t2@x") == {"documents": 1, "fully_validated": 0, "unvalidated_fields": 1}
+
+    col.update_one({"_id": "a"}, {"$set": {"traderId": "t1@x", "Notional": {"validated": True}}})
+    assert col.aggregate(TRADER_STATS, "t2@x") is None
+    assert col.aggregate(TRADER_STATS, "t1@x")["fully_validated"] == 2
+
+    col.delete_one({"_id": "a"})
+    col.delete_one({"_id": "b"})
+    assert col.aggregates(TRADER_STATS) == {}
+
+
+def test_aggregate_is_rebuilt_on_reopen(col):
+    rng = random.Random(7)
+    col.insert_many([_sheet(rng) for _ in range(200)])
+    expected = col.aggregates(TRADER_STATS)
+    col.close()
+
+    reopened = JsonCollection("termsheets")
+    reopened.create_aggregate(TRADER_STATS, "traderId", _validation_counts)
+    assert reopened.aggregates(TRADER_STATS) == expected == _recount(reopened.find())
+    reopened.close()
+
+
+def test_trader_stats_response():
+    assert _trader_stats(None) == {"total_documents": 0, "validation_rate": 0, "total_unvalidated_fields": 0}
+    totals = {"documents": 3, "fully_validated": 2, "unvalidated_fields": 4}
+    assert _trader_stats(totals) == {"total_documents": 3, "validation_rate": 66.67, "total_unvalidated_fields": 4}
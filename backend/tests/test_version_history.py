@@ -0,0 +1,122 @@
+import json
+import random
+
+import pytest
+
+from base_extractor import BaseVersionedExtractor
+from config import VERSION_CHECKPOINT_EVERY
+from version_history import CHANGES_FILENAME, VersionHistory, apply_differences, content_hash
+from version_manifest import VersionManifest
+
+
+def _random_data(rng, previous=None):
+    """The next version of a trade's terms: a few fields added, changed or dropped."""
+    data = json.loads(json.dumps(previous)) if previous else {"Trade ID": "TS-001"}
+    for _ in range(rng.randint(0, 4)):
+        key = f"field{rng.randint(0, 12)}"
+        roll = rng.random()
+        if roll < 0.2:
+            data.pop(key, None)
+        elif roll < 0.5:
+            data[key] = {"value": rng.randint(0, 9), "validated": rng.random() < 0.5, "tags": ["a"] * rng.randint(0, 3)}
+        else:
+            data[key] = rng.choice([rng.random(), "text", None, [1, 2], {"nested": {"x": rng.randint(0, 3)}}])
+    return data
+
+
+def _history(folder):
+    (folder / "versions").mkdir(exist_ok=True)
+    return VersionHistory(str(folder), VersionManifest(str(folder)))
+
+
+def _record_all(history, infos, checkpoint_every, previous=None):
+    for info in infos:
+        diff = None
+        if previous is not None:
+            diff = BaseVersionedExtractor.compute_differences(
+                previous["data"], info["data"], info["version"], info["timestamp"],
+            )
+        with history.manifest.locked():
+            history.record(info, f"v{info['version']}_TS-001", diff, checkpoint_every=checkpoint_every)
+        previous = info
+
+
+def _infos(rng, count, first=1):
+    infos, data = [], None
+    for version in range(first, first + count):
+        data = _random_data(rng, data)
+        infos.append({"version": version, "timestamp": f"t{version}", "filename": f"f{version}.pdf", "data": data})
+    return infos
+
+
+@pytest.mark.parametrize("checkpoint_every", [1, 3, 10])
+def test_every_version_round_trips(tmp_path, checkpoint_every):
+    rng = random.Random(checkpoint_every)
+    history = _history(tmp_path)
+    infos = _infos(rng, 32)
+    _record_all(history, infos, checkpoint_every)
+
+    entries = history.versions()
+    checkpoints = [e["version"] for e in entries if e["file"]]
+    assert checkpoints == list(range(1, 33, checkpoint_every))
+    assert len(list((tmp_path / "versions").iterdir())) == len(checkpoints)
+
+    for info in infos:
+        assert history.get(info["version"]) == info
+    assert history.get(0) is None and history.get(33) is None
+
+    # A fresh reader (another process) sees the same history.
+    reopened = VersionHistory(str(tmp_path), VersionManifest(str(tmp_path)))
+    assert [reopened.get(info["version"]) for info in infos] == infos
+
+    data = infos[0]["data"]
+    for info, diff in zip(infos[1:], history.changes()):
+        data = apply_differences(data, diff)
+        assert data == info["data"]
+
+
+def test_legacy_folder_continues_with_changes(tmp_path):
+    """Full files from before the manifest, then delta-encoded versions."""
+    rng = random.Random(23)
+    legacy = _infos(rng, 4)
+    for info in legacy:
+        path = tmp_path / "TS-001" / "versions" / f"v{info['version']}_TS-001.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(info, indent=4))
+    (tmp_path / "TS-001" / "extracted_terms.json").write_text(json.dumps(legacy[-1], indent=4))
+
+    extractor = BaseVersionedExtractor(str(tmp_path))
+    saved, data = [], legacy[-1]["data"]
+    for i in range(25):
+        data = _random_data(rng, data) if i % 5 else data  # some saves repeat the previous content
+        info = {"filename": f"new{i}.pdf", "data": data}
+        result = extractor.save_version("TS-001", data, info, "TS-001")
+        assert result["version"] == 5 + i
+        saved.append(json.loads(json.dumps(info)))
+
+    trade_folder = tmp_path / "TS-001"
+    history = VersionHistory(str(trade_folder), VersionManifest(str(trade_folder)))
+    entries = history.versions()
+    assert [e["version"] for e in entries] == list(range(1, 30))
+    assert [e["version"] for e in entries if e["file"]] == [1, 2, 3, 4, *range(4 + VERSION_CHECKPOINT_EVERY, 30, VERSION_CHECKPOINT_EVERY)]
+    assert "changes_offset" not in entries[3] and "changes_offset" in entries[4]
+
+    for info in legacy + saved:
+        assert history.get(info["version"]) == info
+    assert [e["data_sha256"] for e in entries[4:]] == [content_hash(info["data"]) for info in saved]
+    assert json.loads((trade_folder / "extracted_terms.json").read_text()) == saved[-1]
+
+
+def test_torn_change_line_from_a_crash_is_skipped(tmp_path):
+    rng = random.Random(5)
+    history = _history(tmp_path)
+    infos = _infos(rng, 6)
+    _record_all(history, infos[:3], checkpoint_every=10)
+    with open(tmp_path / CHANGES_FILENAME, "ab") as fh:
+        fh.write(b'{"version": 4, "added": {"fie')  # crashed before the manifest entry
+
+    _record_all(history, infos[3:], checkpoint_every=10, previous=infos[2])
+
+    for info in infos:
+        assert history.get(info["version"]) == info
+    assert len(history.changes()) == 5
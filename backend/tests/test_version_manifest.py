@@ -0,0 +1,139 @@
+import json
+import os
+import subprocess
+import sys
+import textwrap
+import threading
+
+from version_manifest import MANIFEST_FILENAME, VersionManifest
+
+from conftest import BACKEND_DIR
+
+
+def _write_version(folder, name, version):
+    path = folder / "versions" / name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({"version": version, "timestamp": f"2024-01-{version:02d}", "data": {}}))
+
+
+def _lines(folder):
+    return (folder / MANIFEST_FILENAME).read_bytes().split(b"\n")
+
+
+# ---------------------------------------------------------------------------
+# Legacy folders
+# ---------------------------------------------------------------------------
+
+def test_legacy_versions_folder_is_indexed(tmp_path):
+    for version in (1, 2, 10):
+        _write_version(tmp_path, f"v{version}_TS-001.json", version)
+    _write_version(tmp_path, "v3.json", 3)
+    (tmp_path / "versions" / "notes.txt").write_text("not a version")
+    (tmp_path / "versions" / "vx_broken.json").write_text("{")
+
+    manifest = VersionManifest(str(tmp_path))
+    entries = manifest.entries()
+    assert [e["version"] for e in entries] == [1, 2, 3, 10]
+    assert [e["file"] for e in entries] == [
+        "versions/v1_TS-001.json", "versions/v2_TS-001.json", "versions/v3.json", "versions/v10_TS-001.json",
+    ]
+    assert entries[0]["timestamp"] == "2024-01-01"
+    assert all(len(e["sha256"]) == 64 and e["size"] > 0 for e in entries)
+    assert manifest.next_version() == 11
+
+    # Written once; a later reader parses the file instead of the folder.
+    _write_version(tmp_path, "v11_TS-001.json", 11)
+    assert [e["version"] for e in VersionManifest(str(tmp_path)).entries()] == [1, 2, 3, 10]
+
+
+def test_unreadable_legacy_file_is_still_indexed(tmp_path):
+    _write_version(tmp_path, "v1_a.json", 1)
+    (tmp_path / "versions" / "v2_a.json").write_text("{ torn")
+    entries = VersionManifest(str(tmp_path)).entries()
+    assert [(e["version"], e["timestamp"]) for e in entries] == [(1, "2024-01-01"), (2, None)]
+
+
+def test_empty_folder_has_no_versions(tmp_path):
+    manifest = VersionManifest(str(tmp_path))
+    assert manifest.entries() == []
+    assert manifest.latest() is None
+    assert manifest.next_version() == 1
+    assert not (tmp_path / MANIFEST_FILENAME).exists()
+
+
+# ---------------------------------------------------------------------------
+# Appending
+# ---------------------------------------------------------------------------
+
+def test_torn_last_line_is_ignored_then_cut(tmp_path):
+    manifest = VersionManifest(str(tmp_path))
+    with manifest.locked():
+        manifest.append({"version": 1})
+        manifest.append({"version": 2})
+    with open(tmp_path / MANIFEST_FILENAME, "ab") as fh:
+        fh.write(b'{"version": 3, "fi')  # a writer crashed mid-line
+
+    reader = VersionManifest(str(tmp_path))
+    assert [e["version"] for e in reader.entries()] == [1, 2]
+    assert reader.next_version() == 3
+
+    with reader.locked():
+        reader.append({"version": 3})
+    assert _lines(tmp_path) == [b'{"version": 1}', b'{"version": 2}', b'{"version": 3}', b""]
+    assert [e["version"] for e in manifest.entries()] == [1, 2, 3]
+
+
+def test_readers_pick_up_appends_from_other_instances(tmp_path):
+    writer, reader = VersionManifest(str(tmp_path)), VersionManifest(str(tmp_path))
+    for version in range(1, 6):
+        with writer.locked():
+            writer.append({"version": version})
+        assert reader.latest() == {"version": version}
+
+
+def test_threads_never_share_a_number(tmp_path):
+    manifest = VersionManifest(str(tmp_path))
+
+    def save():
+        for _ in range(25):
+            with manifest.locked():
+                manifest.append({"version": manifest.next_version()})
+
+    threads = [threading.Thread(target=save) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert [e["version"] for e in VersionManifest(str(tmp_path)).entries()] == list(range(1, 101))
+
+
+def test_two_processes_saving_one_trade(tmp_path):
+    script = textwrap.dedent("""
+        import sys
+        from base_extractor import BaseVersionedExtractor
+
+        extractor = BaseVersionedExtractor(sys.argv[1])
+        for i in range(30):
+            info = {"data": {"writer": sys.argv[2], "i": i}, "filename": f"{sys.argv[2]}-{i}.pdf"}
+            extractor.save_version("TS-001", info["data"], info, "TS-001")
+    """)
+    env = {**os.environ, "PYTHONPATH": BACKEND_DIR, "VERSION_CHECKPOINT_EVERY": "4"}
+    procs = [
+        subprocess.Popen([sys.executable, "-c", script, str(tmp_path), writer], env=env)
+        for writer in ("a", "b", "c")
+    ]
+    assert [proc.wait(timeout=120) for proc in procs] == [0, 0, 0]
+
+    from version_history import VersionHistory
+
+    trade_folder = tmp_path / "TS-001"
+    history = VersionHistory(str(trade_folder), VersionManifest(str(trade_folder)))
+    entries = history.versions()
+    assert [e["version"] for e in entries] == list(range(1, 91))
+
+    saved = [history.get(e["version"]) for e in entries]
+    assert sorted((v["data"]["writer"], v["data"]["i"]) for v in saved) == sorted(
+        (writer, i) for writer in "abc" for i in range(30)
+    )
+    latest = json.loads((trade_folder / "extracted_terms.json").read_text())
+    assert latest == saved[-1]
@@ -10,13 +10,12 @@ from __future__ import annotations
 
 import json
 from datetime import datetime
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Sequence
 
 from config import SHEET_AMORTISED, get_logger
 from validators.base_validator import (
-    compare_economic_factors,
-    extract_trade_id_field,
-    load_reference_swap,
+    validate_against_risk_file,
+    validate_batch_against_risk_file,
 )
 
 logger = get_logger(__name__)
@@ -49,56 +48,25 @@ HIGH_SEVERITY_FIELDS = [
     "maturity_date",
 ]
 
+INSTRUMENT_LABEL = "amortized schedule swap"
 
-# ---------------------------------------------------------------------------
-# Amortised-specific comparison override
-# ---------------------------------------------------------------------------
-
-def _compare_amortised_economic_factors(
-    current_swap: Dict[str, Any],
-    reference_swap: Dict[str, Any],
-) -> List[Dict[str, Any]]:
-    """Compare economic factors with special handling for JSON-array fields."""
-    anomalies: List[Dict[str, Any]] = []
-    json_fields = {"reduction_dates", "reduction_amounts"}
-
-    for field in ECONOMIC_FIELDS:
-        cur_key = _ci_key(current_swap, field)
-        ref_key = _ci_key(reference_swap, field)
-
-        if field in json_fields:
-            cur_val = _maybe_parse_json(current_swap.get(cur_key, ""))
-            ref_val = _maybe_parse_json(reference_swap.get(ref_key, ""))
-
-            if isinstance(cur_val, (list, dict)) and isinstance(ref_val, (list, dict)):
-                cur_str = json.dumps(cur_val, sort_keys=True)
-                ref_str = json.dumps(ref_val, sort_keys=True)
-            else:
-                cur_str = str(cur_val).strip()
-                ref_str = str(ref_val).strip()
-        else:
-            cur_str = str(current_swap.get(cur_key, "")).strip()
-            ref_str = str(reference_swap.get(ref_key, "")).strip()
-
-        if cur_str != ref_str:
-            severity = "high" if field in HIGH_SEVERITY_FIELDS else "medium"
-            anomalies.append({
-                "field": field,
-                "current_value": cur_str,
-                "reference_value": ref_str,
-                "issue": f"Mismatch in {field}",
-                "severity": severity,
-            })
-
-    return anomalies
-
+# Typed comparison (see validators.comparison); other fields compare as text.
+# Reduction schedules are JSON arrays, compared structurally.
+FIELD_TYPES = {
+    "initial_notional": "number",
+    "reduction_dates": "json",
+    "reduction_amounts": "json",
+    "fixed_rate": "number",
+    "residual_notional": "number",
+    "effective_date": "date",
+    "maturity_date": "date",
+    "spread": "number",
+}
 
-def _ci_key(data: Dict[str, Any], target: str) -> str:
-    for k in data:
-        if k.lower() == target.lower():
-            return k
-    return target
 
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
 
 def _maybe_parse_json(val: Any) -> Any:
     if isinstance(val, str) and val.startswith(("[", "{")):
@@ -288,38 +256,39 @@ def validate_payment_adjustment(current_swap: Dict[str, Any]) -> List[Dict[str,
 # Main entry point
 # ---------------------------------------------------------------------------
 
-def validate_amortized_swap_against_risk_file(current_swap: Dict[str, Any]):
-    """Validate an Amortised Schedule Swap. Returns ``(result_dict, http_status)``."""
-    tid_field = extract_trade_id_field(current_swap)
-    if tid_field is None:
-        return {"error": "tradeId is required"}, 400
-
-    trade_id = current_swap.get(tid_field)
-    if not trade_id:
-        return {"error": "tradeId is required"}, 400
-
-    logger.info("Validating amortized schedule swap with tradeId: %s", trade_id)
-
-    # Internal validations
-    internal_anomalies = (
+def _internal_checks(current_swap: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return (
         validate_amortization_schedule(current_swap)
         + validate_rate_specifications(current_swap)
         + validate_payment_adjustment(current_swap)
     )
 
-    # Reference comparison
-    reference_swap = load_reference_swap(trade_id, sheet_name=SHEET_AMORTISED)
 
-    if reference_swap is None:
-        msg = f"No reference amortized swap found in risk file for tradeId {trade_id}."
-        if internal_anomalies:
-            return {"valid": False, "anomalies": internal_anomalies, "message": msg + " Internal validation also found issues."}, 404
-        return {"valid": False, "message": msg}, 404
-
-    ref_anomalies = _compare_amortised_economic_factors(current_swap, reference_swap)
-    all_anomalies = internal_anomalies + ref_anomalies
+def validate_amortized_swap_against_risk_file(current_swap: Dict[str, Any]):
+    """Validate an Amortised Schedule Swap. Returns ``(result_dict, http_status)``."""
+    return validate_against_risk_file(
+        current_swap=current_swap,
+        economic_fields=ECONOMIC_FIELDS,
+        high_severity_fields=HIGH_SEVERITY_FIELDS,
+        sheet_name=SHEET_AMORTISED,
+        internal_anomalies=_internal_checks(current_swap),
+        instrument_label=INSTRUMENT_LABEL,
+        field_types=FIELD_TYPES,
+    )
 
-    if all_anomalies:
-        return {"valid": False, "anomalies": all_anomalies, "message": "Amortized schedule swap validation found issues"}, 200
 
-    return {"valid": True, "message": "Amortized schedule swap matches reference in risk file on all economic factors"}, 200
\ No newline at end of file
+def validate_amortized_swaps_against_risk_file(swaps: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Validate many Amortised Schedule Swaps in one pass.
+
+    Returns one result per swap, in order; see
+    ``validate_batch_against_risk_file``.
+    """
+    return validate_batch_against_risk_file(
+        swaps,
+        economic_fields=ECONOMIC_FIELDS,
+        high_severity_fields=HIGH_SEVERITY_FIELDS,
+        sheet_name=SHEET_AMORTISED,
+        internal_checks=_internal_checks,
+        instrument_label=INSTRUMENT_LABEL,
+        field_types=FIELD_TYPES,
+    )
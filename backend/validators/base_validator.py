@@ -4,22 +4,23 @@ Shared validation utilities used by all swap/instrument validators.
 Eliminates the copy-pasted ``load_reference_swap`` and
 ``compare_economic_factors`` functions that were duplicated across
 swap_validator, amortised_swaps, and cross_currency modules.
+
+Reference trades come from the configured ``ReferenceProvider`` (the risk
+workbook or an imported SQLite store, see ``reference_data``).
 """
 
 from __future__ import annotations
 
-import os
-from typing import Any, Dict, List, Optional, Sequence, Tuple
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence
 
 import pandas as pd
 
-from config import RISK_FILE, get_logger
+from config import get_logger
+from validators.comparison import get_comparison_plan
+from validators.reference_data import ExcelReferenceProvider, ReferenceProvider, get_reference_provider
 
 logger = get_logger(__name__)
 
-# Cached DataFrames keyed by (risk_file, sheet_name) → (mtime, DataFrame)
-_risk_cache: Dict[Tuple[str, str], Tuple[float, "pd.DataFrame"]] = {}
-
 
 # ---------------------------------------------------------------------------
 # Trade-ID helpers
@@ -39,89 +40,35 @@ def extract_trade_id_field(swap_data: Dict[str, Any]) -> Optional[str]:
 
 def load_reference_swap(
     trade_id: Any,
-    risk_file: str = RISK_FILE,
+    risk_file: str | None = None,
     sheet_name: str = "interest_risk_swap",
 ) -> Optional[Dict[str, Any]]:
     """
-    Load a reference swap row from the risk Excel file by *trade_id*.
+    Load a reference swap row by *trade_id*.
 
     Parameters
     ----------
     trade_id : Any
         Trade identifier to search for.
-    risk_file : str
-        Path to the risk system Excel workbook.
+    risk_file : str, optional
+        Read this risk Excel workbook instead of the configured
+        reference provider.
     sheet_name : str
-        Name of the worksheet to read.
+        Name of the worksheet (instrument family) to search.
 
     Returns
     -------
     dict or None
         The matching row as a dict, or ``None`` if not found.
     """
-    if not os.path.exists(risk_file):
-        logger.warning("Risk file not found: %s", risk_file)
-        return None
-
-    df = _read_risk_sheet(risk_file, sheet_name)
-    if df is None:
-        return None
-
-    # Locate the trade-ID column (case-insensitive)
-    trade_id_col = _find_trade_id_column(df)
-    if trade_id_col is None:
-        logger.warning("No tradeId column found. Available columns: %s", df.columns.tolist())
-        return None
-
-    df[trade_id_col] = df[trade_id_col].astype(str).str.strip()
-    trade_id_str = str(trade_id).strip()
-
-    # Exact match first, then case-insensitive fallback
-    match = df[df[trade_id_col] == trade_id_str]
-    if match.empty:
-        match = df[df[trade_id_col].str.lower() == trade_id_str.lower()]
-
-    if match.empty:
-        logger.info("No reference swap found for tradeId '%s' in sheet '%s'", trade_id_str, sheet_name)
-        return None
-
-    return match.iloc[0].to_dict()
-
-
-def _find_trade_id_column(df: pd.DataFrame) -> Optional[str]:
-    """Return the column name that represents the trade ID, or None."""
-    for col in df.columns:
-        if col.lower() == "tradeid":
-            return col
-    for col in df.columns:
-        if "trade" in col.lower() and "id" in col.lower():
-            return col
-    return None
-
-
-def _read_risk_sheet(risk_file: str, sheet_name: str) -> Optional["pd.DataFrame"]:
-    """Read *sheet_name* from the risk Excel file, caching by file mtime."""
-    cache_key = (risk_file, sheet_name)
-    try:
-        current_mtime = os.path.getmtime(risk_file)
-    except OSError:
-        logger.warning("Cannot stat risk file: %s", risk_file)
-        return None
+    record = _provider(risk_file).lookup(trade_id, sheet_name)
+    if record is None:
+        logger.info("No reference swap found for tradeId '%s' in sheet '%s'", str(trade_id).strip(), sheet_name)
+    return record
 
-    cached = _risk_cache.get(cache_key)
-    if cached is not None and cached[0] == current_mtime:
-        logger.debug("Using cached risk sheet %s/%s", risk_file, sheet_name)
-        return cached[1]
 
-    try:
-        df = pd.read_excel(risk_file, sheet_name=sheet_name)
-    except Exception:
-        logger.exception("Error reading risk file %s (sheet=%s)", risk_file, sheet_name)
-        return None
-
-    _risk_cache[cache_key] = (current_mtime, df)
-    logger.debug("Cached risk sheet %s/%s (mtime=%.2f)", risk_file, sheet_name, current_mtime)
-    return df
+def _provider(risk_file: str | None) -> ReferenceProvider:
+    return ExcelReferenceProvider(risk_file) if risk_file is not None else get_reference_provider()
 
 
 # ---------------------------------------------------------------------------
@@ -133,6 +80,7 @@ def compare_economic_factors(
     reference_swap: Dict[str, Any],
     economic_fields: Sequence[str],
     high_severity_fields: Sequence[str] | None = None,
+    field_types: Mapping[str, str] | None = None,
 ) -> List[Dict[str, Any]]:
     """
     Compare *current_swap* against *reference_swap* for each field in
@@ -148,37 +96,13 @@ def compare_economic_factors(
         Fields whose mismatch is ``"high"`` severity.  Fields not in this
         list default to ``"medium"`` severity.  If *None*, all mismatches
         are ``"high"``.
+    field_types : mapping, optional
+        ``field -> "number" | "date" | "json" | "bool"`` for typed
+        comparison (see ``validators.comparison``); other fields are
+        compared as stripped text.
     """
-    high_set = set(high_severity_fields) if high_severity_fields else None
-    anomalies: List[Dict[str, Any]] = []
-
-    for field in economic_fields:
-        cur_key = _case_insensitive_key(current_swap, field)
-        ref_key = _case_insensitive_key(reference_swap, field)
-
-        cur_val = str(current_swap.get(cur_key, "")).strip()
-        ref_val = str(reference_swap.get(ref_key, "")).strip()
-
-        if cur_val != ref_val:
-            severity = "high" if (high_set is None or field in high_set) else "medium"
-            anomalies.append({
-                "field": field,
-                "current_value": cur_val,
-                "reference_value": ref_val,
-                "issue": f"Mismatch in {field}",
-                "severity": severity,
-            })
-
-    return anomalies
-
-
-def _case_insensitive_key(data: Dict[str, Any], target: str) -> str:
-    """Return the actual key in *data* matching *target* (case-insensitive)."""
-    target_lower = target.lower()
-    for key in data:
-        if key.lower() == target_lower:
-            return key
-    return target
+    plan = get_comparison_plan(economic_fields, high_severity_fields, field_types)
+    return plan.compare(current_swap, reference_swap)
 
 
 # ---------------------------------------------------------------------------
@@ -192,6 +116,7 @@ def validate_against_risk_file(
     sheet_name: str,
     internal_anomalies: List[Dict[str, Any]] | None = None,
     instrument_label: str = "swap",
+    field_types: Mapping[str, str] | None = None,
 ):
     """
     Shared validation flow: extract trade ID → load reference → compare.
@@ -211,19 +136,30 @@ def validate_against_risk_file(
     all_anomalies = list(internal_anomalies or [])
 
     reference_swap = load_reference_swap(trade_id, sheet_name=sheet_name)
-    if reference_swap is None:
+    if reference_swap is not None:
+        all_anomalies.extend(
+            compare_economic_factors(current_swap, reference_swap, economic_fields, high_severity_fields, field_types)
+        )
+    return _validation_result(trade_id, all_anomalies, reference_swap is not None, instrument_label)
+
+
+def _validation_result(
+    trade_id: Any,
+    anomalies: List[Dict[str, Any]],
+    reference_found: bool,
+    instrument_label: str,
+):
+    """Build the ``(result_dict, http_status)`` pair for one validated trade."""
+    if not reference_found:
         msg = f"No reference {instrument_label} found in risk file for tradeId {trade_id}."
-        if all_anomalies:
-            return {"valid": False, "anomalies": all_anomalies, "message": msg + " Internal validation also found issues."}, 404
+        if anomalies:
+            return {"valid": False, "anomalies": anomalies, "message": msg + " Internal validation also found issues."}, 404
         return {"valid": False, "message": msg}, 404
 
-    ref_anomalies = compare_economic_factors(current_swap, reference_swap, economic_fields, high_severity_fields)
-    all_anomalies.extend(ref_anomalies)
-
-    if all_anomalies:
+    if anomalies:
         return {
             "valid": False,
-            "anomalies": all_anomalies,
+            "anomalies": anomalies,
             "message": f"{instrument_label.capitalize()} validation found issues",
         }, 200
 
@@ -231,3 +167,112 @@ def validate_against_risk_file(
         "valid": True,
         "message": f"{instrument_label.capitalize()} matches reference in risk file on all economic factors",
     }, 200
+
+
+# ---------------------------------------------------------------------------
+# Bulk validation
+# ---------------------------------------------------------------------------
+
+def validate_batch_against_risk_file(
+    swaps: Sequence[Dict[str, Any]],
+    economic_fields: Sequence[str],
+    high_severity_fields: Sequence[str] | None,
+    sheet_name: str,
+    internal_checks: Callable[[Dict[str, Any]], List[Dict[str, Any]]] | None = None,
+    instrument_label: str = "swap",
+    risk_file: str | None = None,
+    field_types: Mapping[str, str] | None = None,
+) -> List[Dict[str, Any]]:
+    """
+    Validate many trades against the risk file in one pass.
+
+    Equivalent to calling :func:`validate_against_risk_file` per trade, but
+    the reference trade IDs are normalised once and joined to the batch
+    with a single merge, and each economic field is compared as a column
+    rather than per trade.
+
+    Parameters
+    ----------
+    swaps : sequence of dict
+        The trades to validate.
+    economic_fields, high_severity_fields, sheet_name, instrument_label, field_types
+        As for :func:`validate_against_risk_file`.
+    internal_checks : callable, optional
+        ``swap -> anomalies`` run before the reference comparison.
+    risk_file : str, optional
+        Read this risk Excel workbook instead of the configured
+        reference provider.
+
+    Returns
+    -------
+    list of dict
+        One result per input trade, in input order: the single-trade
+        result dict plus ``tradeId`` and ``status`` (the HTTP status the
+        single-trade endpoint would have returned).
+    """
+    results: List[Dict[str, Any]] = [{} for _ in swaps]
+    trade_ids: Dict[int, Any] = {}
+
+    for pos, swap in enumerate(swaps):
+        tid_field = extract_trade_id_field(swap) if isinstance(swap, dict) else None
+        trade_id = swap.get(tid_field) if tid_field is not None else None
+        if not trade_id:
+            results[pos] = {"tradeId": trade_id, "error": "tradeId is required", "status": 400}
+            continue
+        trade_ids[pos] = trade_id
+
+    if not trade_ids:
+        return results
+
+    batch = pd.DataFrame({
+        "_pos": list(trade_ids),
+        "_key": [str(tid).strip() for tid in trade_ids.values()],
+    })
+    batch["_lower"] = batch["_key"].str.lower()
+    reference = _provider(risk_file).reference_values(
+        batch["_key"].drop_duplicates().tolist(), sheet_name, economic_fields,
+    )
+
+    if reference is None:
+        batch["_ref"] = -1
+    else:
+        # Exact trade-ID match first, then case-insensitive for the rest
+        # (first matching row wins in both, as in ``load_reference_swap``).
+        exact = reference[["_key", "_ref"]].drop_duplicates("_key")
+        batch = batch.merge(exact, on="_key", how="left")
+        missing = batch["_ref"].isna().to_numpy()
+        if missing.any():
+            folded = reference[["_lower", "_ref"]].drop_duplicates("_lower")
+            fallback = batch.loc[missing, ["_lower"]].merge(folded, on="_lower", how="left")
+            batch.loc[missing, "_ref"] = fallback["_ref"].to_numpy()
+        batch["_ref"] = batch["_ref"].fillna(-1).astype(int)
+
+    ref_rows = batch["_ref"].to_numpy()
+    found = ref_rows >= 0
+    swap_rows = batch["_pos"].to_numpy()
+    logger.info(
+        "Bulk-validating %d %s trades against sheet '%s' (%d with a reference row)",
+        len(swap_rows), instrument_label, sheet_name, int(found.sum()),
+    )
+
+    anomalies: Dict[int, List[Dict[str, Any]]] = {
+        int(pos): list(internal_checks(swaps[pos])) if internal_checks else [] for pos in swap_rows
+    }
+
+    if found.any():
+        matched = swap_rows[found]
+        matched_refs = ref_rows[found]
+        plan = get_comparison_plan(economic_fields, high_severity_fields, field_types)
+        current = plan.columns([swaps[pos] for pos in matched])
+        for field in economic_fields:
+            cur_vals = current[field]
+            ref_vals = reference[field].to_numpy()[matched_refs]
+            for i in plan.mismatches(field, cur_vals, ref_vals):
+                anomalies[int(matched[i])].append(plan.anomaly(field, cur_vals[i], ref_vals[i]))
+
+    for pos, has_reference in zip(swap_rows, found):
+        pos = int(pos)
+        result, status = _validation_result(trade_ids[pos], anomalies[pos], bool(has_reference), instrument_label)
+        results[pos] = {"tradeId": trade_ids[pos], **result, "status": status}
+
+    return results
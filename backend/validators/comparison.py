@@ -0,0 +1,311 @@
+"""
+Compiled, typed comparison of economic fields.
+
+A ``ComparisonPlan`` is built once per instrument (its economic fields,
+severities and field types) and reused for every trade:
+
+* **Key resolution** — the case-insensitive mapping from each economic
+  field to the actual key of a trade dict is computed once per distinct
+  key set and cached, instead of scanning every key for every field.
+  ``columns`` resolves it once per key set in a batch (trades from one
+  payload usually share one) and reads every field of a row in one call.
+* **Typed equality** — each field has a type that decides when two
+  values are equal:
+
+  ``text``    ``str(value).strip()`` compared exactly (the default);
+  ``number``  parsed as floats and compared with a small tolerance, so
+              ``"0.05"`` equals ``0.05`` and ``"1,000,000"`` equals
+              ``1000000.0``;
+  ``date``    parsed to a calendar date, so ``"2024-01-05"`` equals a
+              ``2024-01-05 00:00:00`` Excel timestamp;
+  ``json``    JSON arrays / objects compared structurally;
+  ``bool``    ``true`` / ``yes`` / ``1`` vs ``false`` / ``no`` / ``0``.
+
+  For typed fields an empty cell, ``NaN`` and a missing key all count as
+  "no value".  Values that do not parse as their type fall back to text
+  comparison.  Anomalies report ``str(value).strip()`` (JSON for list /
+  object values of JSON fields).
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import threading
+from datetime import date, datetime
+from operator import itemgetter
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Sequence, Tuple
+
+import numpy as np
+
+from config import get_logger
+
+logger = get_logger(__name__)
+
+FIELD_TYPES = ("text", "number", "date", "json", "bool")
+
+NUMBER_REL_TOL = 1e-9
+NUMBER_ABS_TOL = 1e-12
+
+# Distinct key sets remembered per plan before the cache is reset
+_MAX_KEY_SETS = 1024
+
+_MISSING = {"", "nan", "none", "null", "nat"}
+_TRUE = {"true", "yes", "y", "1"}
+_FALSE = {"false", "no", "n", "0"}
+_DATE_FORMATS = ("%d %b %Y", "%d %B %Y", "%b %d %Y", "%B %d %Y", "%d-%b-%Y", "%Y%m%d", "%Y/%m/%d")
+
+
+# ---------------------------------------------------------------------------
+# Normalisers: raw value → comparable value
+# ---------------------------------------------------------------------------
+
+def _is_missing(value: Any) -> bool:
+    if value is None:
+        return True
+    if isinstance(value, float):
+        return math.isnan(value)
+    return isinstance(value, str) and value.strip().lower() in _MISSING
+
+
+def _as_number(value: Any) -> Any:
+    if _is_missing(value):
+        return None
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    text = display(value)
+    try:
+        return float(text.replace(",", "").replace("_", ""))
+    except ValueError:
+        return text
+
+
+def _as_date(value: Any) -> Any:
+    if _is_missing(value) or str(value) == "NaT":
+        return None
+    if isinstance(value, datetime):  # includes pandas Timestamps
+        parsed = value
+    elif isinstance(value, date):
+        return date(value.year, value.month, value.day)
+    else:
+        text = display(value)
+        try:
+            parsed = datetime.fromisoformat(text)
+        except ValueError:
+            for fmt in _DATE_FORMATS:
+                try:
+                    parsed = datetime.strptime(text.replace(",", ""), fmt)
+                    break
+                except ValueError:
+                    continue
+            else:
+                return text
+    if parsed.time() == datetime.min.time() and parsed.tzinfo is None:
+        return date(parsed.year, parsed.month, parsed.day)
+    # Plain datetime, so a pandas Timestamp compares equal to a parsed string
+    return datetime(*parsed.timetuple()[:6], parsed.microsecond, tzinfo=parsed.tzinfo)
+
+
+def _as_json(value: Any) -> Any:
+    if isinstance(value, str) and value.strip().startswith(("[", "{")):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            pass
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, sort_keys=True, default=str)
+    return display(value)
+
+
+def _as_bool(value: Any) -> Any:
+    if isinstance(value, (bool, np.bool_)):
+        return bool(value)
+    if _is_missing(value):
+        return None
+    lowered = display(value).lower()
+    if lowered in _TRUE:
+        return True
+    if lowered in _FALSE:
+        return False
+    return lowered
+
+
+_NORMALISERS: Dict[str, Callable[[Any], Any]] = {
+    "number": _as_number,
+    "date": _as_date,
+    "json": _as_json,
+    "bool": _as_bool,
+}
+
+
+def _values_equal(a: Any, b: Any) -> bool:
+    if isinstance(a, float) and isinstance(b, float):
+        return math.isclose(a, b, rel_tol=NUMBER_REL_TOL, abs_tol=NUMBER_ABS_TOL)
+    # Same type only: a date never equals a datetime, nor a parsed value a string.
+    return type(a) is type(b) and a == b
+
+
+def display(value: Any) -> str:
+    """The string form used in anomaly reports (and for text comparison)."""
+    return str(value).strip()
+
+
+def _display_array(values: Sequence[Any]) -> np.ndarray:
+    """``display`` of every value, as an object array.
+
+    Inlined rather than mapped through ``display`` (or pandas string
+    methods, which turn ``None`` / ``NaN`` into missing values instead of
+    ``"None"`` / ``"nan"``): this loop runs once per value of every field.
+    """
+    return np.array([str(value).strip() for value in values], dtype=object)
+
+
+# ---------------------------------------------------------------------------
+# Plans
+# ---------------------------------------------------------------------------
+
+class ComparisonPlan:
+    """Field list, severities and types for one instrument, plus key-map cache."""
+
+    def __init__(
+        self,
+        economic_fields: Sequence[str],
+        high_severity_fields: Sequence[str] | None = None,
+        field_types: Mapping[str, str] | None = None,
+    ) -> None:
+        field_types = dict(field_types or {})
+        unknown = {t for t in field_types.values() if t not in FIELD_TYPES}
+        if unknown:
+            raise ValueError(f"Unknown field types {sorted(unknown)}; expected one of {FIELD_TYPES}")
+
+        self.fields: Tuple[str, ...] = tuple(economic_fields)
+        self.types: Dict[str, str] = {field: field_types.get(field, "text") for field in self.fields}
+        high_set = set(high_severity_fields) if high_severity_fields else None
+        self.severity: Dict[str, str] = {
+            field: "high" if (high_set is None or field in high_set) else "medium" for field in self.fields
+        }
+        self._lowered = [(field, field.lower()) for field in self.fields]
+        self._key_maps: Dict[Tuple[Any, ...], Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def key_map(self, keys: Iterable[Any]) -> Dict[str, Any]:
+        """Map each field to the first key of *keys* matching it case-insensitively.
+
+        Fields with no matching key map to themselves (so ``dict.get``
+        falls through to the default).  Cached per key sequence.
+        """
+        keys = tuple(keys)
+        resolved = self._key_maps.get(keys)
+        if resolved is not None:
+            return resolved
+
+        first: Dict[str, Any] = {}
+        for key in keys:
+            first.setdefault(str(key).lower(), key)
+        resolved = {field: first.get(lowered, field) for field, lowered in self._lowered}
+        with self._lock:
+            if len(self._key_maps) >= _MAX_KEY_SETS:
+                self._key_maps.clear()
+            self._key_maps[keys] = resolved
+        return resolved
+
+    def display(self, field: str, value: Any) -> str:
+        """How *value* is reported (JSON fields show lists / objects as JSON)."""
+        if self.types[field] == "json" and isinstance(value, (list, dict)):
+            return json.dumps(value, sort_keys=True, default=str)
+        return display(value)
+
+    def equal(self, field: str, current: Any, reference: Any) -> bool:
+        """Typed equality of two raw values (or their ``display`` strings) for *field*."""
+        if display(current) == display(reference):
+            return True
+        kind = self.types[field]
+        if kind == "text":
+            return False
+        normalise = _NORMALISERS[kind]
+        return _values_equal(normalise(current), normalise(reference))
+
+    def anomaly(self, field: str, current: Any, reference: Any) -> Dict[str, Any]:
+        return {
+            "field": field,
+            "current_value": self.display(field, current),
+            "reference_value": self.display(field, reference),
+            "issue": f"Mismatch in {field}",
+            "severity": self.severity[field],
+        }
+
+    def compare(self, current: Mapping[Any, Any], reference: Mapping[Any, Any]) -> List[Dict[str, Any]]:
+        """Anomalies for every economic field where *current* differs from *reference*."""
+        cur_keys = self.key_map(current)
+        ref_keys = self.key_map(reference)
+        anomalies: List[Dict[str, Any]] = []
+        for field in self.fields:
+            cur = current.get(cur_keys[field], "")
+            ref = reference.get(ref_keys[field], "")
+            if not self.equal(field, cur, ref):
+                anomalies.append(self.anomaly(field, cur, ref))
+        return anomalies
+
+    def _row_getter(self, keys: Tuple[Any, ...]) -> Callable[[Mapping[Any, Any]], Tuple[Any, ...]]:
+        """``row -> (value of each field, ...)`` for rows with exactly *keys*."""
+        key_map = self.key_map(keys)
+        resolved = [key_map[field] for field in self.fields]
+        present = set(keys)
+        if len(resolved) > 1 and all(key in present for key in resolved):
+            return itemgetter(*resolved)
+        return lambda row: tuple(row.get(key, "") for key in resolved)
+
+    def columns(self, rows: Sequence[Mapping[Any, Any]]) -> Dict[str, np.ndarray]:
+        """Raw values of every field across *rows* (``""`` if absent), as object arrays.
+
+        The key map is resolved once per distinct key sequence in *rows*,
+        not per row and field.
+        """
+        getters: Dict[Tuple[Any, ...], Callable[[Mapping[Any, Any]], Tuple[Any, ...]]] = {}
+        records = []
+        for row in rows:
+            keys = tuple(row)
+            getter = getters.get(keys)
+            if getter is None:
+                getter = getters[keys] = self._row_getter(keys)
+            records.append(getter(row))
+        values = zip(*records) if records else ((),) * len(self.fields)
+        return {
+            field: np.fromiter(column, dtype=object, count=len(rows))
+            for field, column in zip(self.fields, values)
+        }
+
+    def mismatches(self, field: str, current: np.ndarray, reference: np.ndarray) -> np.ndarray:
+        """Indices where two aligned arrays of values differ for *field*.
+
+        Text fields are compared as whole arrays; typed fields only
+        re-check the pairs whose ``display`` strings differ.
+        """
+        candidates = np.flatnonzero(_display_array(current) != _display_array(reference))
+        if self.types[field] == "text" or not len(candidates):
+            return candidates
+        return np.array(
+            [i for i in candidates if not self.equal(field, current[i], reference[i])], dtype=np.intp,
+        )
+
+
+_plans: Dict[Tuple[Any, ...], ComparisonPlan] = {}
+_plans_lock = threading.Lock()
+
+
+def get_comparison_plan(
+    economic_fields: Sequence[str],
+    high_severity_fields: Sequence[str] | None = None,
+    field_types: Mapping[str, str] | None = None,
+) -> ComparisonPlan:
+    """Return the compiled plan for this field list, building it once."""
+    cache_key = (
+        tuple(economic_fields),
+        tuple(high_severity_fields) if high_severity_fields else None,
+        tuple(sorted((field_types or {}).items())),
+    )
+    with _plans_lock:
+        plan = _plans.get(cache_key)
+        if plan is None:
+            plan = _plans[cache_key] = ComparisonPlan(economic_fields, high_severity_fields, field_types)
+        return plan
@@ -7,13 +7,12 @@ validations (notional consistency, principal exchange, leg rate types).
 
 from __future__ import annotations
 
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Sequence
 
 from config import SHEET_CROSS_CURRENCY, get_logger
 from validators.base_validator import (
-    compare_economic_factors,
-    extract_trade_id_field,
-    load_reference_swap,
+    validate_against_risk_file,
+    validate_batch_against_risk_file,
 )
 
 logger = get_logger(__name__)
@@ -53,6 +52,22 @@ HIGH_SEVERITY_FIELDS = [
     "maturity_date",
 ]
 
+INSTRUMENT_LABEL = "currency swap"
+
+# Typed comparison (see validators.comparison); other fields compare as text
+FIELD_TYPES = {
+    "base_notional_amount": "number",
+    "quote_notional_amount": "number",
+    "principal_exchange_initial": "bool",
+    "principal_exchange_final": "bool",
+    "base_leg_fixed_rate": "number",
+    "quote_leg_fixed_rate": "number",
+    "basis_spread": "number",
+    "fx_spot_rate": "number",
+    "effective_date": "date",
+    "maturity_date": "date",
+}
+
 
 # ---------------------------------------------------------------------------
 # Domain-specific validations
@@ -157,34 +172,29 @@ def validate_leg_rate_types(current_swap: Dict[str, Any]) -> List[Dict[str, Any]
 
 def validate_currency_swap_against_risk_file(current_swap: Dict[str, Any]):
     """Validate a Cross-Currency Swap. Returns ``(result_dict, http_status)``."""
-    tid_field = extract_trade_id_field(current_swap)
-    if tid_field is None:
-        return {"error": "tradeId is required"}, 400
-
-    trade_id = current_swap.get(tid_field)
-    if not trade_id:
-        return {"error": "tradeId is required"}, 400
-
-    logger.info("Validating currency swap with tradeId: %s", trade_id)
-
-    # Internal validations
-    notional_anomalies = validate_currency_notionals(current_swap)
-
-    # Reference comparison
-    reference_swap = load_reference_swap(trade_id, sheet_name=SHEET_CROSS_CURRENCY)
-
-    if reference_swap is None:
-        msg = f"No reference currency swap found in risk file for tradeId {trade_id}."
-        if notional_anomalies:
-            return {"valid": False, "anomalies": notional_anomalies, "message": msg + " Internal validation also found issues."}, 404
-        return {"valid": False, "message": msg}, 404
-
-    economic_anomalies = compare_economic_factors(
-        current_swap, reference_swap, ECONOMIC_FIELDS, HIGH_SEVERITY_FIELDS
+    return validate_against_risk_file(
+        current_swap=current_swap,
+        economic_fields=ECONOMIC_FIELDS,
+        high_severity_fields=HIGH_SEVERITY_FIELDS,
+        sheet_name=SHEET_CROSS_CURRENCY,
+        internal_anomalies=validate_currency_notionals(current_swap),
+        instrument_label=INSTRUMENT_LABEL,
+        field_types=FIELD_TYPES,
     )
 
-    all_anomalies = notional_anomalies + economic_anomalies
-    if all_anomalies:
-        return {"valid": False, "anomalies": all_anomalies, "message": "Currency swap validation found issues"}, 200
 
-    return {"valid": True, "message": "Currency swap matches reference swap in risk file on all economic factors"}, 200
\ No newline at end of file
+def validate_currency_swaps_against_risk_file(swaps: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Validate many Cross-Currency Swaps in one pass.
+
+    Returns one result per swap, in order; see
+    ``validate_batch_against_risk_file``.
+    """
+    return validate_batch_against_risk_file(
+        swaps,
+        economic_fields=ECONOMIC_FIELDS,
+        high_severity_fields=HIGH_SEVERITY_FIELDS,
+        sheet_name=SHEET_CROSS_CURRENCY,
+        internal_checks=validate_currency_notionals,
+        instrument_label=INSTRUMENT_LABEL,
+        field_types=FIELD_TYPES,
+    )
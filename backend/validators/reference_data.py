@@ -0,0 +1,487 @@
+"""
+Reference-data providers for the validators.
+
+``load_reference_swap`` and bulk validation read reference trades through
+a ``ReferenceProvider``, chosen by ``REFERENCE_BACKEND``:
+
+* ``excel`` (default) — the risk workbook (``RISK_FILE``).  Each sheet is
+  loaded once per file mtime, from the columnar snapshot in
+  ``risk_snapshot`` when one exists, into a ``RiskSheet`` indexed by
+  normalised trade ID.
+* ``sqlite`` — an indexed SQLite store (``REFERENCE_DB``) with one row per
+  (sheet, trade ID), so a large risk book need not fit in a DataFrame and
+  can be updated incrementally.  Fill it from the workbook with::
+
+      python -m validators.reference_data [--risk-file X] [--db Y] [--sheet S ...] [--upsert]
+
+Every provider resolves a trade ID the same way: the stripped ID exactly,
+then case-insensitively; the first row in sheet order wins when IDs
+repeat.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from config import (
+    REFERENCE_BACKEND,
+    REFERENCE_DB,
+    RISK_FILE,
+    SHEET_AMORTISED,
+    SHEET_CROSS_CURRENCY,
+    SHEET_IRS,
+    get_logger,
+)
+from validators import risk_snapshot
+
+logger = get_logger(__name__)
+
+# Indexed sheets keyed by (risk_file, sheet_name) → (mtime, RiskSheet)
+_risk_cache: Dict[Tuple[str, str], Tuple[float, "RiskSheet"]] = {}
+_risk_lock = threading.Lock()
+
+# Bound parameters per ``IN (...)`` query (SQLite's default limit is 999)
+_IN_BATCH = 500
+
+
+# ---------------------------------------------------------------------------
+# Provider interface
+# ---------------------------------------------------------------------------
+
+class ReferenceProvider:
+    """Source of reference trades, grouped by sheet (instrument family)."""
+
+    def lookup(self, trade_id: Any, sheet_name: str) -> Optional[Dict[str, Any]]:
+        """Return the reference row for *trade_id*, or ``None``."""
+        raise NotImplementedError
+
+    def lookup_many(self, trade_ids: Iterable[Any], sheet_name: str) -> Dict[str, Dict[str, Any]]:
+        """Return ``{stripped trade ID: row}`` for the IDs that were found."""
+        found: Dict[str, Dict[str, Any]] = {}
+        for trade_id in trade_ids:
+            record = self.lookup(trade_id, sheet_name)
+            if record is not None:
+                found[str(trade_id).strip()] = record
+        return found
+
+    def reference_values(
+        self,
+        trade_ids: Sequence[str],
+        sheet_name: str,
+        economic_fields: Sequence[str],
+    ) -> Optional["pd.DataFrame"]:
+        """
+        Return reference rows for bulk validation as a frame of strings.
+
+        Columns are ``_key`` / ``_lower`` (stripped / lower-cased trade ID),
+        ``_ref`` (row number) and one per economic field holding
+        ``str(value).strip()`` exactly as ``compare_economic_factors``
+        would compute it, or ``""`` if the row has no such column.  Only
+        rows for *trade_ids* (stripped) are required; ``_key`` is the
+        requested ID, so an exact join on it also covers case-insensitive
+        matches.  ``None`` if the source is unavailable.
+        """
+        found = self.lookup_many(trade_ids, sheet_name)
+        keys = list(found)
+        values: Dict[str, Any] = {
+            "_key": keys,
+            "_lower": [key.lower() for key in keys],
+            "_ref": np.arange(len(keys)),
+        }
+        for field in economic_fields:
+            target = field.lower()
+            column = []
+            for record in found.values():
+                key = next((k for k in record if str(k).lower() == target), None)
+                column.append(str(record[key]).strip() if key is not None else "")
+            values[field] = column
+        return pd.DataFrame(values)
+
+
+# ---------------------------------------------------------------------------
+# Excel workbook
+# ---------------------------------------------------------------------------
+
+def _normalised_trade_ids(ids: "pd.Series") -> "pd.Series":
+    return ids.astype(str).str.strip()
+
+
+def _find_trade_id_column(df: pd.DataFrame) -> Optional[str]:
+    """Return the column name that represents the trade ID, or None."""
+    for col in df.columns:
+        if str(col).lower() == "tradeid":
+            return col
+    for col in df.columns:
+        if "trade" in str(col).lower() and "id" in str(col).lower():
+            return col
+    return None
+
+
+class RiskSheet:
+    """A risk-file worksheet indexed by normalised trade ID.
+
+    Built once per file mtime.  ``lookup`` is a dict probe: the exact
+    (stripped) trade ID first, then its lower-cased form; the first row
+    wins when IDs repeat.
+    """
+
+    def __init__(self, frame: "pd.DataFrame") -> None:
+        self.frame = frame
+        self.trade_id_col = _find_trade_id_column(frame)
+        self.trade_ids: Optional["pd.Series"] = None
+        self._exact: Dict[str, Dict[str, Any]] = {}
+        self._folded: Dict[str, Dict[str, Any]] = {}
+        self._reference_values: Dict[Tuple[str, ...], "pd.DataFrame"] = {}
+        if self.trade_id_col is None:
+            return
+
+        # Normalise into a new Series: the frame is shared, never mutated.
+        self.trade_ids = _normalised_trade_ids(frame[self.trade_id_col])
+        columns = [frame[col].tolist() for col in frame.columns]
+        for key, values in zip(self.trade_ids.tolist(), zip(*columns)):
+            if not isinstance(key, str):
+                continue  # missing trade ID
+            record = dict(zip(frame.columns, values))
+            record[self.trade_id_col] = key
+            self._exact.setdefault(key, record)
+            self._folded.setdefault(key.lower(), record)
+
+    def records(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Yield ``(trade ID, row)`` for the first row of each ID, in sheet order."""
+        return iter(self._exact.items())
+
+    def lookup(self, trade_id: Any) -> Optional[Dict[str, Any]]:
+        """Return a copy of the row for *trade_id*, or ``None``."""
+        key = str(trade_id).strip()
+        record = self._exact.get(key)
+        if record is None:
+            record = self._folded.get(key.lower())
+        return dict(record) if record is not None else None
+
+    def reference_values(self, economic_fields: Sequence[str]) -> "pd.DataFrame":
+        """
+        Return the normalised trade IDs and *economic_fields* as strings.
+
+        Columns are ``_key`` / ``_lower`` (stripped / lower-cased trade ID),
+        ``_ref`` (row number) and one per economic field holding
+        ``str(value).strip()`` exactly as :func:`compare_economic_factors`
+        would compute it, or ``""`` if the sheet has no such column; see
+        ``ReferenceProvider.reference_values``.  Covers the whole sheet and
+        is memoised per field list for the sheet's lifetime.
+        """
+        fields = tuple(economic_fields)
+        cached = self._reference_values.get(fields)
+        if cached is not None:
+            return cached
+
+        df, trade_ids = self.frame, self.trade_ids
+        values: Dict[str, Any] = {
+            "_key": trade_ids,
+            "_lower": trade_ids.str.lower(),
+            "_ref": np.arange(len(df)),
+        }
+        columns = {}
+        for col in df.columns:
+            columns.setdefault(str(col).lower(), col)
+        for field in fields:
+            col = columns.get(field.lower())
+            if col is None:
+                values[field] = ""
+            elif col == self.trade_id_col:
+                values[field] = trade_ids.fillna("nan")
+            else:
+                # tolist() + str() matches Series.map(str), at a fraction of the cost
+                values[field] = [str(value).strip() for value in df[col].tolist()]
+        frame = pd.DataFrame(values).reset_index(drop=True)
+        self._reference_values[fields] = frame
+        return frame
+
+
+def _load_risk_sheet(risk_file: str, sheet_name: str) -> Optional[RiskSheet]:
+    """Return the indexed *sheet_name*, or ``None`` (with a warning) if unusable."""
+    if not os.path.exists(risk_file):
+        logger.warning("Risk file not found: %s", risk_file)
+        return None
+
+    sheet = _read_risk_sheet(risk_file, sheet_name)
+    if sheet is None:
+        return None
+
+    if sheet.trade_id_col is None:
+        logger.warning("No tradeId column found. Available columns: %s", sheet.frame.columns.tolist())
+        return None
+    return sheet
+
+
+def _read_risk_sheet(risk_file: str, sheet_name: str) -> Optional[RiskSheet]:
+    """Read and index *sheet_name* from the risk Excel file, caching by file mtime."""
+    cache_key = (risk_file, sheet_name)
+    try:
+        current_mtime = os.path.getmtime(risk_file)
+    except OSError:
+        logger.warning("Cannot stat risk file: %s", risk_file)
+        return None
+
+    with _risk_lock:
+        cached = _risk_cache.get(cache_key)
+        if cached is not None and cached[0] == current_mtime:
+            logger.debug("Using cached risk sheet %s/%s", risk_file, sheet_name)
+            return cached[1]
+
+        df = risk_snapshot.load_sheet(risk_file, sheet_name)
+        if df is None:
+            # No snapshot of this version yet (the refresh job builds it).
+            try:
+                df = pd.read_excel(risk_file, sheet_name=sheet_name)
+            except Exception:
+                logger.exception("Error reading risk file %s (sheet=%s)", risk_file, sheet_name)
+                return None
+
+        sheet = RiskSheet(df)
+        _risk_cache[cache_key] = (current_mtime, sheet)
+    logger.debug(
+        "Cached risk sheet %s/%s (mtime=%.2f, %d trade IDs)",
+        risk_file, sheet_name, current_mtime, len(sheet._exact),
+    )
+    return sheet
+
+
+class ExcelReferenceProvider(ReferenceProvider):
+    """Reference trades read from the sheets of a risk Excel workbook."""
+
+    def __init__(self, risk_file: str = RISK_FILE) -> None:
+        self.risk_file = risk_file
+
+    def lookup(self, trade_id: Any, sheet_name: str) -> Optional[Dict[str, Any]]:
+        sheet = _load_risk_sheet(self.risk_file, sheet_name)
+        return sheet.lookup(trade_id) if sheet is not None else None
+
+    def reference_values(
+        self,
+        trade_ids: Sequence[str],
+        sheet_name: str,
+        economic_fields: Sequence[str],
+    ) -> Optional["pd.DataFrame"]:
+        sheet = _load_risk_sheet(self.risk_file, sheet_name)
+        return sheet.reference_values(economic_fields) if sheet is not None else None
+
+
+def refresh_risk_cache(
+    risk_file: str = RISK_FILE,
+    sheet_names: Sequence[str] = (SHEET_IRS, SHEET_AMORTISED, SHEET_CROSS_CURRENCY),
+) -> None:
+    """Snapshot *risk_file* if it changed and pre-load the validators' sheets.
+
+    Run periodically in the background, so the first validation after the
+    workbook changes finds its sheet already indexed.
+    """
+    if not os.path.exists(risk_file):
+        return
+    try:
+        risk_snapshot.refresh_snapshot(risk_file)
+    except Exception:
+        logger.exception("Error snapshotting risk file %s", risk_file)
+    available = set(risk_snapshot.sheet_names(risk_file))
+    for sheet_name in sheet_names:
+        if sheet_name in available:
+            _read_risk_sheet(risk_file, sheet_name)
+
+
+# ---------------------------------------------------------------------------
+# SQLite store
+# ---------------------------------------------------------------------------
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS reference_trades (
+    sheet          TEXT    NOT NULL,
+    trade_id       TEXT    NOT NULL,
+    trade_id_lower TEXT    NOT NULL,
+    row_no         INTEGER NOT NULL,
+    record         TEXT    NOT NULL,
+    PRIMARY KEY (sheet, trade_id)
+);
+CREATE INDEX IF NOT EXISTS reference_trades_lower
+    ON reference_trades (sheet, trade_id_lower, row_no);
+"""
+
+
+class SQLiteReferenceProvider(ReferenceProvider):
+    """Reference trades in an indexed SQLite table.
+
+    Rows are stored as JSON keyed by ``(sheet, trade_id)``, with the
+    lower-cased ID indexed for case-insensitive lookups and ``row_no``
+    preserving sheet order.  Values that are not JSON types (timestamps)
+    are stored as their ``str()``, which is what validation compares.
+    """
+
+    def __init__(self, db_path: str = REFERENCE_DB) -> None:
+        self.db_path = db_path
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def lookup(self, trade_id: Any, sheet_name: str) -> Optional[Dict[str, Any]]:
+        key = str(trade_id).strip()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT record FROM reference_trades WHERE sheet = ? AND trade_id = ?",
+                (sheet_name, key),
+            ).fetchone()
+            if row is None:
+                row = self._conn.execute(
+                    "SELECT record FROM reference_trades WHERE sheet = ? AND trade_id_lower = ? "
+                    "ORDER BY row_no LIMIT 1",
+                    (sheet_name, key.lower()),
+                ).fetchone()
+        return json.loads(row[0]) if row is not None else None
+
+    def lookup_many(self, trade_ids: Iterable[Any], sheet_name: str) -> Dict[str, Dict[str, Any]]:
+        keys = list(dict.fromkeys(str(tid).strip() for tid in trade_ids))
+        exact: Dict[str, str] = {}
+        folded: Dict[str, str] = {}
+        with self._lock:
+            for batch in _batches(keys):
+                rows = self._conn.execute(
+                    "SELECT trade_id, record FROM reference_trades "
+                    f"WHERE sheet = ? AND trade_id IN ({','.join('?' * len(batch))})",
+                    (sheet_name, *batch),
+                )
+                exact.update(rows)
+            missing = list(dict.fromkeys(k.lower() for k in keys if k not in exact))
+            for batch in _batches(missing):
+                rows = self._conn.execute(
+                    "SELECT trade_id_lower, record FROM reference_trades "
+                    f"WHERE sheet = ? AND trade_id_lower IN ({','.join('?' * len(batch))}) "
+                    "ORDER BY row_no DESC",
+                    (sheet_name, *batch),
+                )
+                folded.update(rows)  # descending, so the first row is written last
+
+        found: Dict[str, Dict[str, Any]] = {}
+        for key in keys:
+            record = exact.get(key) or folded.get(key.lower())
+            if record is not None:
+                found[key] = json.loads(record)
+        return found
+
+    def sheets(self) -> List[str]:
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT DISTINCT sheet FROM reference_trades")]
+
+    def replace_sheet(self, sheet_name: str, records: Iterable[Tuple[str, Dict[str, Any]]]) -> int:
+        """Replace every row of *sheet_name* with *records*; return the row count."""
+        rows = [
+            (sheet_name, key, key.lower(), row_no, _dumps(record))
+            for row_no, (key, record) in enumerate(records)
+        ]
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM reference_trades WHERE sheet = ?", (sheet_name,))
+            self._conn.executemany(
+                "INSERT INTO reference_trades (sheet, trade_id, trade_id_lower, row_no, record) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+        return len(rows)
+
+    def upsert(self, sheet_name: str, records: Iterable[Tuple[str, Dict[str, Any]]]) -> int:
+        """Insert or update rows of *sheet_name*; new trade IDs go last in sheet order."""
+        rows = [(sheet_name, key, key.lower(), sheet_name, _dumps(record)) for key, record in records]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO reference_trades (sheet, trade_id, trade_id_lower, row_no, record) "
+                "VALUES (?, ?, ?, (SELECT COALESCE(MAX(row_no), -1) + 1 FROM reference_trades WHERE sheet = ?), ?) "
+                "ON CONFLICT (sheet, trade_id) DO UPDATE SET record = excluded.record",
+                rows,
+            )
+        return len(rows)
+
+
+def _batches(items: List[str]) -> Iterator[List[str]]:
+    for start in range(0, len(items), _IN_BATCH):
+        yield items[start:start + _IN_BATCH]
+
+
+def _dumps(record: Dict[str, Any]) -> str:
+    return json.dumps(record, ensure_ascii=False, default=str)
+
+
+def import_workbook(
+    risk_file: str = RISK_FILE,
+    db_path: str = REFERENCE_DB,
+    sheet_names: Sequence[str] | None = None,
+    upsert: bool = False,
+) -> Dict[str, int]:
+    """Load sheets of *risk_file* into the SQLite store at *db_path*.
+
+    By default each imported sheet replaces its previous contents; with
+    *upsert*, rows are added or updated and rows missing from the
+    workbook are kept.  Returns ``{sheet: rows written}``.
+    """
+    if not os.path.exists(risk_file):
+        raise FileNotFoundError(f"Risk file not found: {risk_file}")
+
+    risk_snapshot.refresh_snapshot(risk_file)
+    if sheet_names is None:
+        sheet_names = risk_snapshot.sheet_names(risk_file) or pd.ExcelFile(risk_file).sheet_names
+
+    provider = SQLiteReferenceProvider(db_path)
+    counts: Dict[str, int] = {}
+    for sheet_name in sheet_names:
+        sheet = _load_risk_sheet(risk_file, sheet_name)
+        if sheet is None:
+            continue
+        write = provider.upsert if upsert else provider.replace_sheet
+        counts[sheet_name] = write(sheet_name, sheet.records())
+        logger.info("Imported %d reference trades from %s/%s", counts[sheet_name], risk_file, sheet_name)
+    return counts
+
+
+# ---------------------------------------------------------------------------
+# Process-wide provider
+# ---------------------------------------------------------------------------
+
+_provider: ReferenceProvider | None = None
+_provider_lock = threading.Lock()
+
+
+def get_reference_provider() -> ReferenceProvider:
+    """Return the process-wide provider selected by ``REFERENCE_BACKEND``."""
+    global _provider
+    with _provider_lock:
+        if _provider is None:
+            if REFERENCE_BACKEND == "excel":
+                _provider = ExcelReferenceProvider()
+            elif REFERENCE_BACKEND == "sqlite":
+                _provider = SQLiteReferenceProvider()
+            else:
+                raise ValueError(f"Unknown REFERENCE_BACKEND '{REFERENCE_BACKEND}' (expected 'excel' or 'sqlite')")
+        return _provider
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Import the risk workbook into the SQLite reference store.")
+    parser.add_argument("--risk-file", default=RISK_FILE, help="workbook to import")
+    parser.add_argument("--db", default=REFERENCE_DB, help="SQLite database to write")
+    parser.add_argument("--sheet", action="append", help="sheet to import (repeatable; default all)")
+    parser.add_argument("--upsert", action="store_true", help="add / update rows instead of replacing each sheet")
+    args = parser.parse_args()
+
+    counts = import_workbook(args.risk_file, args.db, args.sheet, args.upsert)
+    for sheet_name, count in counts.items():
+        print(f"{sheet_name}: {count} trades")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+Registry of instrument validators, keyed by derivative type.
+
+Each trade names its instrument in ``derivative_type`` or
+``instrumentType`` (any case, as extracted or as classified, e.g.
+``"Interest Rate Swap"`` / ``"InterestRateSwap"`` / ``"IRS"``).
+``validate_trade`` routes one trade to its validator; ``validate_trades``
+groups a mixed batch by instrument and runs each group through that
+validator's bulk path, so every instrument family is looked up once
+against the shared reference index.
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from config import get_logger
+from validators import amortised_swaps, cross_currency, swap_validator
+from validators.base_validator import extract_trade_id_field
+
+logger = get_logger(__name__)
+
+# Trade keys naming the instrument, in order of precedence (compared normalised)
+TYPE_FIELDS = ("derivative_type", "instrumentType")
+
+SingleValidator = Callable[[Dict[str, Any]], Tuple[Dict[str, Any], int]]
+BatchValidator = Callable[[Sequence[Dict[str, Any]]], List[Dict[str, Any]]]
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+
+def _normalise(name: Any) -> str:
+    """``"Amortised Schedule Swap"`` → ``"amortizedscheduleswap"``."""
+    return _NON_ALNUM.sub("", str(name).lower().replace("amortis", "amortiz"))
+
+
+class InstrumentValidator:
+    """Single-trade and bulk validation entry points for one instrument."""
+
+    def __init__(self, name: str, validate: SingleValidator, validate_batch: BatchValidator) -> None:
+        self.name = name
+        self.validate = validate
+        self.validate_batch = validate_batch
+
+
+_registry: Dict[str, InstrumentValidator] = {}
+_registry_lock = threading.Lock()
+
+
+def register_validator(
+    name: str,
+    validate: SingleValidator,
+    validate_batch: BatchValidator,
+    aliases: Iterable[str] = (),
+) -> InstrumentValidator:
+    """Register the validator for derivative type *name* (and its *aliases*)."""
+    entry = InstrumentValidator(name, validate, validate_batch)
+    with _registry_lock:
+        for key in (name, *aliases):
+            _registry[_normalise(key)] = entry
+    return entry
+
+
+def instrument_types() -> List[str]:
+    """Canonical names of the registered derivative types."""
+    with _registry_lock:
+        return sorted({entry.name for entry in _registry.values()})
+
+
+def get_validator(derivative_type: Any) -> Optional[InstrumentValidator]:
+    """Return the validator registered for *derivative_type*, or ``None``."""
+    return _registry.get(_normalise(derivative_type))
+
+
+def instrument_type(trade: Dict[str, Any]) -> Optional[Any]:
+    """The trade's derivative type, from the first non-empty type field."""
+    wanted = {_normalise(field): rank for rank, field in enumerate(TYPE_FIELDS)}
+    found: Dict[int, Any] = {}
+    for key, value in trade.items():
+        rank = wanted.get(_normalise(key))
+        if rank is not None and value not in (None, "") and rank not in found:
+            found[rank] = value
+    return found[min(found)] if found else None
+
+
+def _resolve(trade: Any) -> Tuple[Optional[InstrumentValidator], Optional[str]]:
+    """``(validator, None)`` or ``(None, error message)`` for *trade*."""
+    if not isinstance(trade, dict):
+        return None, "Each trade must be a JSON object"
+    derivative_type = instrument_type(trade)
+    if derivative_type is None:
+        return None, "derivative_type or instrumentType is required"
+    validator = get_validator(derivative_type)
+    if validator is None:
+        return None, (
+            f"Unsupported derivative type '{derivative_type}'. "
+            f"Supported types are: {', '.join(instrument_types())}"
+        )
+    return validator, None
+
+
+# ---------------------------------------------------------------------------
+# Dispatch
+# ---------------------------------------------------------------------------
+
+def validate_trade(trade: Dict[str, Any]):
+    """Validate one trade with its instrument's validator.
+
+    Returns ``(result_dict, http_status)``; ``400`` if the derivative type
+    is missing or has no registered validator.
+    """
+    validator, error = _resolve(trade)
+    if validator is None:
+        return {"error": error}, 400
+    result, status = validator.validate(trade)
+    return {"derivative_type": validator.name, **result}, status
+
+
+def validate_trades(trades: Sequence[Any]) -> List[Dict[str, Any]]:
+    """Validate a batch of trades of any mix of instruments.
+
+    Trades are grouped by derivative type and each group is validated in
+    bulk.  Returns one result per trade, in input order: the
+    ``validate_batch`` result (``tradeId``, result fields, ``status``)
+    plus ``derivative_type``.  Trades with a missing or unsupported type
+    get ``status`` ``400`` and an ``error``.
+    """
+    results: List[Dict[str, Any]] = [{} for _ in trades]
+    groups: Dict[str, Tuple[InstrumentValidator, List[int]]] = {}
+
+    for pos, trade in enumerate(trades):
+        validator, error = _resolve(trade)
+        if validator is None:
+            tid_field = extract_trade_id_field(trade) if isinstance(trade, dict) else None
+            trade_id = trade.get(tid_field) if tid_field is not None else None
+            results[pos] = {"tradeId": trade_id, "error": error, "status": 400}
+            continue
+        groups.setdefault(validator.name, (validator, []))[1].append(pos)
+
+    for name, (validator, positions) in groups.items():
+        logger.info("Validating %d trades as %s", len(positions), name)
+        for pos, result in zip(positions, validator.validate_batch([trades[pos] for pos in positions])):
+            results[pos] = {"derivative_type": name, **result}
+
+    return results
+
+
+register_validator(
+    "Interest Rate Swap",
+    swap_validator.validate_swap_against_risk_file,
+    swap_validator.validate_swaps_against_risk_file,
+    aliases=("IRS", "Swap", "Vanilla Swap"),
+)
+register_validator(
+    "Cross Currency Swap",
+    cross_currency.validate_currency_swap_against_risk_file,
+    cross_currency.validate_currency_swaps_against_risk_file,
+    aliases=("CCS", "Currency Swap", "XCCY Swap"),
+)
+register_validator(
+    "Amortised Schedule Swap",
+    amortised_swaps.validate_amortized_swap_against_risk_file,
+    amortised_swaps.validate_amortized_swaps_against_risk_file,
+    aliases=("Amortised Swap", "Amortising Swap", "Amortizing Swap"),
+)
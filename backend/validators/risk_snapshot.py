@@ -0,0 +1,229 @@
+"""
+Columnar on-disk snapshot of the risk workbook.
+
+Parsing ``risk_system.xlsx`` with openpyxl takes seconds, and each sheet
+used to be parsed separately by the first validation request after the
+file changed.  ``refresh_snapshot`` — run in the background by the
+scheduler — parses every sheet in one pass and writes each column as a
+``.npy`` file; ``load_sheet`` rebuilds a sheet from those files in
+milliseconds.
+
+Layout under ``RISK_SNAPSHOT_DIR``::
+
+    <workbook>-<path hash>/<mtime_ns>-<size>/manifest.json
+                                             <sheet #>_<column #>.npy | .pkl
+
+A version directory is renamed into place only once complete, and is
+used only while the workbook's mtime and size still match its name.
+Columns are stored by kind:
+
+* ``array`` — numeric, boolean and datetime columns, memory-mapped on load;
+* ``string`` — all-string columns, as a fixed-width array plus a null mask;
+* ``pickle`` — anything else (mixed types, extension dtypes), pickled.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from config import RISK_SNAPSHOT_DIR, get_logger
+
+logger = get_logger(__name__)
+
+SNAPSHOT_FORMAT = 1
+
+_refresh_lock = threading.Lock()
+
+
+# ---------------------------------------------------------------------------
+# Paths
+# ---------------------------------------------------------------------------
+
+def _workbook_dir(risk_file: str, snapshot_dir: str) -> str:
+    path = os.path.abspath(risk_file)
+    digest = hashlib.sha256(path.encode("utf-8")).hexdigest()[:12]
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(snapshot_dir, f"{stem}-{digest}")
+
+
+def _version_name(st: os.stat_result) -> str:
+    return f"{st.st_mtime_ns}-{st.st_size}"
+
+
+def _current_version_dir(risk_file: str, snapshot_dir: str) -> Optional[str]:
+    """The snapshot directory matching the workbook as it is now, if built."""
+    try:
+        st = os.stat(risk_file)
+    except OSError:
+        return None
+    path = os.path.join(_workbook_dir(risk_file, snapshot_dir), _version_name(st))
+    return path if os.path.exists(os.path.join(path, "manifest.json")) else None
+
+
+# ---------------------------------------------------------------------------
+# Column encoding
+# ---------------------------------------------------------------------------
+
+def _is_string_column(series: "pd.Series") -> bool:
+    if series.dtype != object and not isinstance(series.dtype, pd.StringDtype):
+        return False
+    values = series.to_numpy(dtype=object)
+    mask = series.isna().to_numpy()
+    return all(isinstance(v, str) for v in values[~mask]) and all(
+        isinstance(v, float) for v in values[mask]  # NaN, not None / NaT
+    )
+
+
+def _write_column(series: "pd.Series", base: str) -> Dict[str, Any]:
+    """Write *series* under *base* (no extension); return its manifest entry."""
+    dtype = series.dtype
+    if isinstance(dtype, np.dtype) and dtype.kind in "biufcmM":
+        np.save(base + ".npy", series.to_numpy(), allow_pickle=False)
+        return {"kind": "array", "file": os.path.basename(base) + ".npy"}
+
+    if _is_string_column(series):
+        mask = series.isna().to_numpy()
+        values = series.to_numpy(dtype=object).copy()
+        values[mask] = ""
+        np.save(base + ".npy", values.astype(str) if len(values) else np.array([], dtype="<U1"), allow_pickle=False)
+        np.save(base + ".mask.npy", mask, allow_pickle=False)
+        return {
+            "kind": "string",
+            "file": os.path.basename(base) + ".npy",
+            "mask": os.path.basename(base) + ".mask.npy",
+            "dtype": str(dtype),
+        }
+
+    series.to_pickle(base + ".pkl")
+    return {"kind": "pickle", "file": os.path.basename(base) + ".pkl"}
+
+
+def _read_column(entry: Dict[str, Any], directory: str) -> Any:
+    path = os.path.join(directory, entry["file"])
+    kind = entry["kind"]
+    if kind == "array":
+        # A plain ndarray view of the mapping, so pandas never sees np.memmap.
+        return np.asarray(np.load(path, mmap_mode="r", allow_pickle=False))
+    if kind == "string":
+        values = np.load(path, mmap_mode="r", allow_pickle=False).astype(object)
+        values[np.load(os.path.join(directory, entry["mask"]), allow_pickle=False)] = np.nan
+        return pd.Series(values, dtype=entry["dtype"])
+    return pd.read_pickle(path)
+
+
+# ---------------------------------------------------------------------------
+# Build / load
+# ---------------------------------------------------------------------------
+
+def _write_sheet(df: "pd.DataFrame", index: int, directory: str) -> Dict[str, Any]:
+    columns: List[Dict[str, Any]] = []
+    for position, name in enumerate(df.columns):
+        entry = _write_column(df.iloc[:, position], os.path.join(directory, f"{index}_{position}"))
+        entry["name"] = name
+        columns.append(entry)
+    return {"rows": len(df), "columns": columns}
+
+
+def refresh_snapshot(risk_file: str, snapshot_dir: str = RISK_SNAPSHOT_DIR) -> bool:
+    """Build the snapshot for *risk_file* if it is missing or stale.
+
+    Returns ``True`` if a new snapshot was written.  Older versions of
+    the workbook's snapshot are removed.  Concurrent calls build at most
+    once.
+    """
+    with _refresh_lock:
+        try:
+            before = os.stat(risk_file)
+        except OSError:
+            return False
+        if _current_version_dir(risk_file, snapshot_dir) is not None:
+            return False
+
+        workbook_dir = _workbook_dir(risk_file, snapshot_dir)
+        os.makedirs(workbook_dir, exist_ok=True)
+        sheets = pd.read_excel(risk_file, sheet_name=None)
+
+        after = os.stat(risk_file)
+        if _version_name(after) != _version_name(before):
+            logger.info("Risk file %s changed while being read; snapshot deferred", risk_file)
+            return False
+
+        tmp_dir = tempfile.mkdtemp(dir=workbook_dir, prefix=".tmp-")
+        try:
+            manifest = {
+                "format": SNAPSHOT_FORMAT,
+                "source": os.path.abspath(risk_file),
+                "sheets": {},
+            }
+            for index, (name, df) in enumerate(sheets.items()):
+                if not all(isinstance(c, (str, int, float)) for c in df.columns):
+                    logger.warning("Sheet %s has non-scalar column names; not snapshotted", name)
+                    continue
+                manifest["sheets"][name] = _write_sheet(df, index, tmp_dir)
+            with open(os.path.join(tmp_dir, "manifest.json"), "w", encoding="utf-8") as fh:
+                json.dump(manifest, fh, indent=2)
+
+            version_dir = os.path.join(workbook_dir, _version_name(before))
+            os.rename(tmp_dir, version_dir)
+        except Exception:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+
+        for entry in os.scandir(workbook_dir):
+            # ".tmp-*" may be another process's build in progress.
+            if entry.is_dir() and entry.path != version_dir and not entry.name.startswith("."):
+                shutil.rmtree(entry.path, ignore_errors=True)
+
+    logger.info("Snapshotted risk file %s (%d sheets)", risk_file, len(manifest["sheets"]))
+    return True
+
+
+def sheet_names(risk_file: str, snapshot_dir: str = RISK_SNAPSHOT_DIR) -> List[str]:
+    """Sheets in the current snapshot of *risk_file* (empty if there is none)."""
+    version_dir = _current_version_dir(risk_file, snapshot_dir)
+    if version_dir is None:
+        return []
+    try:
+        with open(os.path.join(version_dir, "manifest.json"), "r", encoding="utf-8") as fh:
+            return list(json.load(fh)["sheets"])
+    except (OSError, ValueError, KeyError):
+        return []
+
+
+def load_sheet(risk_file: str, sheet_name: str, snapshot_dir: str = RISK_SNAPSHOT_DIR) -> Optional["pd.DataFrame"]:
+    """Return *sheet_name* from the current snapshot, or ``None`` if there is none.
+
+    Array columns are memory-mapped read-only; callers must not mutate
+    the frame.
+    """
+    version_dir = _current_version_dir(risk_file, snapshot_dir)
+    if version_dir is None:
+        return None
+    try:
+        with open(os.path.join(version_dir, "manifest.json"), "r", encoding="utf-8") as fh:
+            manifest = json.load(fh)
+        if manifest.get("format") != SNAPSHOT_FORMAT:
+            return None
+        sheet = manifest["sheets"].get(sheet_name)
+        if sheet is None:
+            return None
+        columns = {
+            position: _read_column(entry, version_dir) for position, entry in enumerate(sheet["columns"])
+        }
+    except (OSError, ValueError, KeyError):
+        # A snapshot being pruned or a partial / corrupt file: read the workbook.
+        logger.warning("Unreadable risk snapshot %s — falling back to the workbook", version_dir, exc_info=True)
+        return None
+
+    df = pd.DataFrame(columns, index=pd.RangeIndex(sheet["rows"]), copy=False)
+    df.columns = [entry["name"] for entry in sheet["columns"]]
+    return df
@@ -7,10 +7,13 @@ and economic factor comparison.
 
 from __future__ import annotations
 
-from typing import Any, Dict
+from typing import Any, Dict, List, Sequence
 
 from config import SHEET_IRS, get_logger
-from validators.base_validator import validate_against_risk_file
+from validators.base_validator import (
+    validate_against_risk_file,
+    validate_batch_against_risk_file,
+)
 
 logger = get_logger(__name__)
 
@@ -26,6 +29,14 @@ ECONOMIC_FIELDS = [
     "discount_curve",
 ]
 
+# Typed comparison (see validators.comparison); other fields compare as text
+FIELD_TYPES = {
+    "effective_date": "date",
+    "maturity_date": "date",
+    "notional_amount": "number",
+    "fixed_rate": "number",
+}
+
 
 def validate_swap_against_risk_file(current_swap: Dict[str, Any]):
     """Validate an Interest Rate Swap against the risk system file.
@@ -38,4 +49,21 @@ def validate_swap_against_risk_file(current_swap: Dict[str, Any]):
         high_severity_fields=None,  # all mismatches are high severity
         sheet_name=SHEET_IRS,
         instrument_label="swap",
-    )
\ No newline at end of file
+        field_types=FIELD_TYPES,
+    )
+
+
+def validate_swaps_against_risk_file(swaps: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Validate many Interest Rate Swaps in one pass.
+
+    Returns one result per swap, in order; see
+    ``validate_batch_against_risk_file``.
+    """
+    return validate_batch_against_risk_file(
+        swaps,
+        economic_fields=ECONOMIC_FIELDS,
+        high_severity_fields=None,
+        sheet_name=SHEET_IRS,
+        instrument_label="swap",
+        field_types=FIELD_TYPES,
+    )
@@ -0,0 +1,199 @@
+"""
+Delta-encoded version history of a trade.
+
+Versions are stored as full checkpoints plus diffs in between:
+
+* every ``VERSION_CHECKPOINT_EVERY``-th version (and the first) is a
+  **checkpoint** — the full ``version_info`` in ``versions/v<n>_<stem>.json``;
+* every version after the first appends its ``compute_differences`` diff,
+  plus its metadata (``filename`` / ``subject`` …), as one line of
+  ``changes.jsonl``.  Versions between checkpoints have no file of their
+  own.
+
+The trade's manifest records where each version lives: ``file`` for a
+checkpoint, and ``changes_offset`` / ``changes_size`` for its line in
+``changes.jsonl``.  Rebuilding a version reads the nearest checkpoint at
+or before it and replays at most ``VERSION_CHECKPOINT_EVERY - 1`` diffs;
+``changes()`` returns the whole diff history.
+
+Entries written before this format (a full file per version, no diff
+line) are all checkpoints.
+"""
+
+from __future__ import annotations
+
+import bisect
+import hashlib
+import json
+import os
+import tempfile
+from typing import Any, Dict, List, Optional
+
+from config import VERSION_CHECKPOINT_EVERY, get_logger
+from version_manifest import VersionManifest, get_manifest
+
+logger = get_logger(__name__)
+
+CHANGES_FILENAME = "changes.jsonl"
+
+
+def apply_differences(data: Dict[str, Any], diff: Dict[str, Any]) -> Dict[str, Any]:
+    """Return *data* with a ``compute_differences`` diff applied (old → new)."""
+    data = dict(data)
+    for key in diff.get("removed", {}):
+        data.pop(key, None)
+    data.update(diff.get("added", {}))
+    for key, change in diff.get("modified", {}).items():
+        data[key] = change["new"]
+    return data
+
+
+def content_hash(data: Any) -> str:
+    """SHA-256 of *data* in canonical JSON form (key order does not matter)."""
+    canonical = json.dumps(data, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _is_checkpoint(entry: Dict[str, Any]) -> bool:
+    return bool(entry.get("file"))
+
+
+class VersionHistory:
+    """Reads and appends the versions of one trade folder."""
+
+    def __init__(self, trade_folder: str, manifest: VersionManifest | None = None) -> None:
+        self.trade_folder = trade_folder
+        self.manifest = manifest or get_manifest(trade_folder)
+        self.changes_path = os.path.join(trade_folder, CHANGES_FILENAME)
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    def record(
+        self,
+        version_info: Dict[str, Any],
+        name: str,
+        diff: Optional[Dict[str, Any]],
+        checkpoint_every: int = VERSION_CHECKPOINT_EVERY,
+        data_sha256: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Store *version_info* as version ``version_info["version"]``.
+
+        *name* is the version's file stem (``v<n>_<stem>``) and *diff* its
+        changes from the previous version (``None`` for the first).
+        *data_sha256* is the ``content_hash`` of its data, kept in the
+        manifest so an identical next version can skip the diff.  Must be
+        called inside ``manifest.locked()``.  Returns the manifest entry.
+        """
+        version = version_info["version"]
+        latest = self.manifest.latest()
+        since_checkpoint = version - latest.get("checkpoint", latest["version"]) if latest else 0
+        checkpoint = diff is None or latest is None or since_checkpoint >= max(1, checkpoint_every)
+
+        entry: Dict[str, Any] = {
+            "version": version,
+            "name": name,
+            "timestamp": version_info.get("timestamp"),
+            "checkpoint": version if checkpoint else latest.get("checkpoint", latest["version"]),
+            "file": None,
+            "data_sha256": data_sha256,
+        }
+        if checkpoint:
+            payload = json.dumps(version_info, indent=4, ensure_ascii=False).encode("utf-8")
+            entry["file"] = f"versions/{name}.json"
+            write_atomic(payload, os.path.join(self.trade_folder, entry["file"]))
+            entry["size"] = len(payload)
+            entry["sha256"] = hashlib.sha256(payload).hexdigest()
+        if diff is not None:
+            meta = {key: value for key, value in version_info.items() if key != "data"}
+            line = json.dumps({**diff, "meta": meta}, ensure_ascii=False, default=str).encode("utf-8")
+            entry["changes_offset"] = self._append_change(line)
+            entry["changes_size"] = len(line)
+            if not checkpoint:
+                entry["size"] = len(line)
+                entry["sha256"] = hashlib.sha256(line).hexdigest()
+
+        self.manifest.append(entry)
+        return entry
+
+    def _append_change(self, line: bytes) -> int:
+        """Append *line* to ``changes.jsonl`` and return its byte offset."""
+        fd = os.open(self.changes_path, os.O_RDWR | os.O_CREAT | os.O_APPEND, 0o644)
+        try:
+            offset = os.fstat(fd).st_size
+            if offset and os.pread(fd, 1, offset - 1) != b"\n":
+                # Left over from a crash between this write and the manifest's.
+                os.write(fd, b"\n")
+                offset += 1
+            os.write(fd, line + b"\n")
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        return offset
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    def versions(self) -> List[Dict[str, Any]]:
+        """Manifest entries of every version, oldest first."""
+        return self.manifest.entries()
+
+    def get(self, version: int) -> Optional[Dict[str, Any]]:
+        """Rebuild the full ``version_info`` of *version*, or ``None`` if unknown."""
+        entries = self.manifest.entries()
+        numbers = [entry["version"] for entry in entries]
+        index = bisect.bisect_left(numbers, version)
+        if index == len(numbers) or numbers[index] != version:
+            return None
+        return self._rebuild(entries, index)
+
+    def _rebuild(self, entries: List[Dict[str, Any]], index: int) -> Dict[str, Any]:
+        start = index
+        while not _is_checkpoint(entries[start]):
+            start -= 1
+            if start < 0:
+                raise ValueError(f"No checkpoint before version {entries[index]['version']} in {self.trade_folder}")
+
+        with open(os.path.join(self.trade_folder, entries[start]["file"]), "r", encoding="utf-8") as fh:
+            version_info = json.load(fh)
+        if start == index:
+            return version_info
+
+        data = version_info.get("data", {})
+        with open(self.changes_path, "rb") as fh:
+            for entry in entries[start + 1:index + 1]:
+                change = self._read_change(fh, entry)
+                data = apply_differences(data, change)
+        return {**change["meta"], "data": data}
+
+    @staticmethod
+    def _read_change(fh, entry: Dict[str, Any]) -> Dict[str, Any]:
+        fh.seek(entry["changes_offset"])
+        return json.loads(fh.read(entry["changes_size"]))
+
+    def changes(self) -> List[Dict[str, Any]]:
+        """Every recorded diff (``compute_differences`` format), oldest first."""
+        entries = [entry for entry in self.manifest.entries() if "changes_offset" in entry]
+        if not entries:
+            return []
+        diffs = []
+        with open(self.changes_path, "rb") as fh:
+            for entry in entries:
+                change = self._read_change(fh, entry)
+                change.pop("meta", None)
+                diffs.append(change)
+        return diffs
+
+
+def write_atomic(payload: bytes, path: str) -> None:
+    """Write *payload* to a temp file and rename it over *path*."""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(payload)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
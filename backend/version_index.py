@@ -0,0 +1,165 @@
+"""
+In-memory index over the versioned termsheets in ``metadata/`` and
+``email_metadata/``, for the version history endpoints.
+
+Nothing is rescanned per request:
+
+* the trade folders of each source are listed again only when the
+  source directory's mtime changes (a trade was added or removed);
+* each trade's version list is its cached ``VersionManifest``, which
+  re-reads only lines appended since the last request;
+* rebuilt versions are kept in a small LRU, keyed by the manifest entry's
+  hash, so repeated history views skip reading checkpoints and replaying
+  diffs.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from base_extractor import BaseVersionedExtractor
+from config import EMAIL_METADATA_DIR, METADATA_DIR, get_logger
+from version_history import VersionHistory
+from version_manifest import MANIFEST_FILENAME, get_manifest
+
+logger = get_logger(__name__)
+
+# Rebuilt versions kept in memory (each holds one full version_info)
+_MAX_CACHED_VERSIONS = 256
+
+
+def parse_timestamp(value: Any) -> Optional[datetime]:
+    """Parse an ISO timestamp as naive local time (how versions are stamped)."""
+    try:
+        parsed = datetime.fromisoformat(str(value))
+    except ValueError:
+        return None
+    return parsed.astimezone().replace(tzinfo=None) if parsed.tzinfo else parsed
+
+
+def version_summary(entry: Dict[str, Any]) -> Dict[str, Any]:
+    """The public fields of a manifest entry."""
+    return {
+        "version": entry["version"],
+        "name": entry.get("name") or os.path.splitext(os.path.basename(entry.get("file") or ""))[0],
+        "timestamp": entry.get("timestamp"),
+        "checkpoint": bool(entry.get("file")),
+    }
+
+
+class VersionIndex:
+    """Trades and versions of every source directory (``pdf``, ``email``)."""
+
+    def __init__(self, roots: Dict[str, str]) -> None:
+        self.roots = dict(roots)
+        self._lock = threading.Lock()
+        self._listings: Dict[str, Tuple[int, Dict[str, str]]] = {}
+        self._cache: "OrderedDict[Tuple[str, int, Any], Dict[str, Any]]" = OrderedDict()
+
+    # ------------------------------------------------------------------
+    # Trades
+    # ------------------------------------------------------------------
+
+    def trades(self, source: str) -> Dict[str, str]:
+        """``{trade_id: trade folder}`` for *source* (``KeyError`` if unknown)."""
+        root = self.roots[source]
+        try:
+            mtime = os.stat(root).st_mtime_ns
+        except FileNotFoundError:
+            return {}
+        with self._lock:
+            cached = self._listings.get(source)
+            if cached is not None and cached[0] == mtime:
+                return cached[1]
+
+        folders = {}
+        for entry in os.scandir(root):
+            if entry.is_dir() and (
+                os.path.exists(os.path.join(entry.path, MANIFEST_FILENAME))
+                or os.path.isdir(os.path.join(entry.path, "versions"))
+            ):
+                folders[entry.name] = entry.path
+        with self._lock:
+            self._listings[source] = (mtime, folders)
+        logger.debug("Indexed %d trades under %s", len(folders), root)
+        return folders
+
+    def summaries(self, source: str) -> List[Dict[str, Any]]:
+        """One line per trade: version count and latest version."""
+        out = []
+        for trade_id, folder in sorted(self.trades(source).items()):
+            entries = get_manifest(folder).entries()
+            if not entries:
+                continue
+            out.append({
+                "trade_id": trade_id,
+                "versions": len(entries),
+                "latest_version": entries[-1]["version"],
+                "updated": entries[-1].get("timestamp"),
+            })
+        return out
+
+    def history(self, source: str, trade_id: str) -> Optional[VersionHistory]:
+        """The trade's history, or ``None`` if *source* has no such trade."""
+        folder = self.trades(source).get(trade_id)
+        return VersionHistory(folder) if folder is not None else None
+
+    # ------------------------------------------------------------------
+    # Versions
+    # ------------------------------------------------------------------
+
+    def get(self, history: VersionHistory, version: int) -> Optional[Dict[str, Any]]:
+        """The full ``version_info`` of *version* (shared; do not mutate)."""
+        entries = history.versions()
+        entry = next((e for e in reversed(entries) if e["version"] == version), None)
+        if entry is None:
+            return None
+        key = (history.trade_folder, version, entry.get("sha256"))
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                return cached
+
+        version_info = history.get(version)
+        with self._lock:
+            self._cache[key] = version_info
+            while len(self._cache) > _MAX_CACHED_VERSIONS:
+                self._cache.popitem(last=False)
+        return version_info
+
+    def as_of(self, history: VersionHistory, timestamp: datetime) -> Optional[Dict[str, Any]]:
+        """The latest version saved at or before *timestamp*, or ``None``."""
+        for entry in reversed(history.versions()):
+            saved = parse_timestamp(entry.get("timestamp"))
+            if saved is not None and saved <= timestamp:
+                return self.get(history, entry["version"])
+        return None
+
+    def diff(self, history: VersionHistory, from_version: int, to_version: int) -> Optional[Dict[str, Any]]:
+        """``compute_differences`` from one version to another, or ``None`` if either is unknown."""
+        old = self.get(history, from_version)
+        new = self.get(history, to_version)
+        if old is None or new is None:
+            return None
+        differences = BaseVersionedExtractor.compute_differences(
+            old.get("data", {}), new.get("data", {}), to_version, new.get("timestamp"),
+        )
+        return {"from_version": from_version, **differences}
+
+
+_index: VersionIndex | None = None
+_index_lock = threading.Lock()
+
+
+def get_version_index() -> VersionIndex:
+    """Return the process-wide index of ``METADATA_DIR`` and ``EMAIL_METADATA_DIR``."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = VersionIndex({"pdf": METADATA_DIR, "email": EMAIL_METADATA_DIR})
+        return _index
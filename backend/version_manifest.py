@@ -0,0 +1,218 @@
+"""
+Per-trade manifest of saved versions.
+
+Each trade folder holds ``manifest.jsonl``: one JSON line per version,
+appended as the version is saved::
+
+    {"version": 3, "file": "versions/v3_TS-001.json", "size": 812,
+     "sha256": "...", "timestamp": "2024-05-01T10:00:00"}
+
+The manifest replaces listing and parsing every file in ``versions/``:
+
+* **Next version in O(1)** — manifests are cached per trade and read
+  incrementally, from the byte offset reached last time, so only lines
+  appended since (by this or another process) are parsed.
+* **Atomic appends** — each entry is one ``write`` to a file opened with
+  ``O_APPEND``; a torn final line left by a crash is ignored by readers
+  and cut off by the next writer.
+* **Concurrent writers** — ``locked()`` serialises savers of one trade
+  across threads (a lock) and processes (``flock`` on ``.lock`` in the
+  trade folder), so two ingest workers never take the same number.
+
+Trade folders written before the manifest existed are indexed from their
+``versions/`` directory the first time they are opened.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import json
+import os
+import re
+import threading
+from typing import Any, Dict, Iterator, List, Optional
+
+from config import get_logger
+
+try:
+    import fcntl
+except ImportError:  # Windows: in-process locking only
+    fcntl = None
+
+logger = get_logger(__name__)
+
+MANIFEST_FILENAME = "manifest.jsonl"
+LOCK_FILENAME = ".lock"
+
+_VERSION_FILE = re.compile(r"^v(\d+)(?:_|\.json$)")
+
+
+def _sha256(path: str) -> str:
+    with open(path, "rb") as fh:
+        return hashlib.sha256(fh.read()).hexdigest()
+
+
+class VersionManifest:
+    """The append-only version log of one trade folder."""
+
+    def __init__(self, trade_folder: str) -> None:
+        self.trade_folder = trade_folder
+        self.path = os.path.join(trade_folder, MANIFEST_FILENAME)
+        self._lock = threading.RLock()
+        self._entries: List[Dict[str, Any]] = []
+        self._offset = 0
+        self._inode: Optional[int] = None
+        self._bootstrapped = False
+        self._depth = 0  # nesting of locked() in the thread holding _lock
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    def _refresh(self) -> None:
+        """Parse lines appended since the last read.  Call with ``_lock`` held."""
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            self._entries, self._offset, self._inode = [], 0, None
+            return
+        if st.st_ino != self._inode or st.st_size < self._offset:
+            # Replaced (bootstrap) or truncated: read from the start.
+            self._entries, self._offset, self._inode = [], 0, st.st_ino
+        if st.st_size == self._offset:
+            return
+
+        with open(self.path, "rb") as fh:
+            fh.seek(self._offset)
+            chunk = fh.read(st.st_size - self._offset)
+        complete = chunk.rfind(b"\n") + 1  # a torn last line waits for its newline
+        for line in chunk[:complete].splitlines():
+            if not line.strip():
+                continue
+            try:
+                self._entries.append(json.loads(line))
+            except ValueError:
+                logger.warning("Skipping unreadable manifest line in %s", self.path)
+        self._offset += complete
+
+    def entries(self) -> List[Dict[str, Any]]:
+        """Every version entry, oldest first."""
+        with self._lock:
+            self._bootstrap()
+            self._refresh()
+            return list(self._entries)
+
+    def latest(self) -> Optional[Dict[str, Any]]:
+        """The newest version entry, or ``None`` for a trade with no versions."""
+        with self._lock:
+            self._bootstrap()
+            self._refresh()
+            return dict(self._entries[-1]) if self._entries else None
+
+    def next_version(self) -> int:
+        """The number the next saved version gets.
+
+        Only stable while ``locked()`` is held by the caller.
+        """
+        latest = self.latest()
+        return latest["version"] + 1 if latest else 1
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    @contextlib.contextmanager
+    def locked(self) -> Iterator["VersionManifest"]:
+        """Hold the trade's write lock (across threads and processes)."""
+        with self._lock:
+            if fcntl is None or self._depth:
+                # flock is per open file: re-locking from this thread would deadlock.
+                self._depth += 1
+                try:
+                    yield self
+                finally:
+                    self._depth -= 1
+                return
+            with open(os.path.join(self.trade_folder, LOCK_FILENAME), "a") as lock_fh:
+                fcntl.flock(lock_fh, fcntl.LOCK_EX)
+                self._depth += 1
+                try:
+                    yield self
+                finally:
+                    self._depth -= 1
+                    fcntl.flock(lock_fh, fcntl.LOCK_UN)
+
+    def append(self, entry: Dict[str, Any]) -> None:
+        """Append *entry* as one line.  Call inside ``locked()``."""
+        with self._lock:
+            self._bootstrap()
+            self._refresh()
+            line = (json.dumps(entry, ensure_ascii=False, default=str) + "\n").encode("utf-8")
+            fd = os.open(self.path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+            try:
+                if os.fstat(fd).st_size > self._offset:
+                    logger.warning("Dropping torn final line of %s", self.path)
+                    os.ftruncate(fd, self._offset)
+                os.write(fd, line)
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+            self._refresh()
+
+    def _bootstrap(self) -> None:
+        """Index a pre-manifest trade folder from its ``versions/`` files, once."""
+        if self._bootstrapped:
+            return
+        self._bootstrapped = True
+        if os.path.exists(self.path):
+            return
+        versions_folder = os.path.join(self.trade_folder, "versions")
+        try:
+            names = os.listdir(versions_folder)
+        except FileNotFoundError:
+            return
+        found = [(int(m.group(1)), name) for name in names for m in [_VERSION_FILE.match(name)] if m]
+        if not found:
+            return
+
+        with self.locked():
+            if os.path.exists(self.path):  # another process got there first
+                return
+            lines = []
+            for version, name in sorted(found):
+                path = os.path.join(versions_folder, name)
+                timestamp = None
+                try:
+                    with open(path, "r", encoding="utf-8") as fh:
+                        timestamp = json.load(fh).get("timestamp")
+                except (OSError, ValueError, AttributeError):
+                    logger.warning("Could not read version file %s", path)
+                lines.append(json.dumps({
+                    "version": version,
+                    "file": f"versions/{name}",
+                    "size": os.path.getsize(path),
+                    "sha256": _sha256(path),
+                    "timestamp": timestamp,
+                }, ensure_ascii=False) + "\n")
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as fh:
+                fh.write("".join(lines))
+                fh.flush()
+                os.fsync(fh.fileno())
+            os.replace(tmp_path, self.path)
+        logger.info("Indexed %d existing versions of %s", len(lines), self.trade_folder)
+
+
+_manifests: Dict[str, VersionManifest] = {}
+_manifests_lock = threading.Lock()
+
+
+def get_manifest(trade_folder: str) -> VersionManifest:
+    """Return the process-wide manifest for *trade_folder*."""
+    key = os.path.abspath(trade_folder)
+    with _manifests_lock:
+        manifest = _manifests.get(key)
+        if manifest is None:
+            manifest = _manifests[key] = VersionManifest(key)
+        return manifest
@@ -5,10 +5,14 @@ import { motion } from "framer-motion";
 import { useQuery } from "@tanstack/react-query";
 import { api } from "@/lib/api";
 
+// Columns this view renders; the feed only needs the newest page
+const ACTIVITY_FIELDS = ["id", "name", "size", "uploadDate", "status", "progress"];
+
 export default function ProcessingStatus() {
   const { data: documents = [], isLoading } = useQuery({
-    queryKey: ['termsheets'],
-    queryFn: () => api.getTermsheets(),
+    queryKey: ['termsheets', 'activity'],
+    queryFn: async () =>
+      (await api.getTermsheetsPage({ fields: ACTIVITY_FIELDS, sort: "-uploadDate" })).items,
     refetchInterval: 5000,
   });
 
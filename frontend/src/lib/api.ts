@@ -1,6 +1,13 @@
 import { ScannedDocument } from "@/types";
 
+export interface TermsheetPage {
+    items: ScannedDocument[];
+    nextCursor: string | null;
+}
+
 const API_BASE_URL = "http://localhost:5000";
+const JOB_POLL_INTERVAL_MS = 1000;
+const TERMSHEET_PAGE_SIZE = 50;
 
 export const api = {
     /**
@@ -20,18 +27,51 @@ export const api = {
             throw new Error(error.error || "Failed to process termsheet");
         }
 
-        return response.json();
+        // Extraction runs as a background job; poll until it finishes.
+        const { job_id } = await response.json();
+        for (;;) {
+            await new Promise((resolve) => setTimeout(resolve, JOB_POLL_INTERVAL_MS));
+            const jobResponse = await fetch(`${API_BASE_URL}/jobs/${job_id}`);
+            if (!jobResponse.ok) {
+                throw new Error("Failed to fetch extraction status");
+            }
+            const job = await jobResponse.json();
+            if (job.status === "succeeded") {
+                return job.result;
+            }
+            if (job.status === "failed") {
+                throw new Error(job.error || "Failed to process termsheet");
+            }
+        }
     },
 
     /**
-     * Fetch all processed termsheets.
+     * Fetch one page of processed termsheets.
+     *
+     * `fields` lists the columns to return (or `-field` to leave one out);
+     * pass the returned `nextCursor` back as `cursor` for the next page.
      */
-    async getTermsheets(): Promise<ScannedDocument[]> {
-        const response = await fetch(`${API_BASE_URL}/termsheets`);
+    async getTermsheetsPage(
+        options: { fields?: string[]; cursor?: string | null; limit?: number; sort?: string } = {},
+    ): Promise<TermsheetPage> {
+        const params = new URLSearchParams({ limit: String(options.limit ?? TERMSHEET_PAGE_SIZE) });
+        if (options.fields?.length) {
+            params.set("fields", options.fields.join(","));
+        }
+        if (options.cursor) {
+            params.set("cursor", options.cursor);
+        }
+        if (options.sort) {
+            params.set("sort", options.sort);
+        }
+        const response = await fetch(`${API_BASE_URL}/termsheets?${params}`);
         if (!response.ok) {
             throw new Error("Failed to fetch termsheets");
         }
-        return response.json();
+        return {
+            items: await response.json(),
+            nextCursor: response.headers.get("X-Next-Cursor"),
+        };
     },
 
     /**
@@ -43,5 +83,55 @@ export const api = {
             throw new Error("Failed to fetch trader statistics");
         }
         return response.json();
+    },
+
+    /**
+     * Fetch statistics for every trader, keyed by trader ID.
+     */
+    async getAllTraderStats(): Promise<Record<string, any>> {
+        const response = await fetch(`${API_BASE_URL}/trader_stats/all`);
+        if (!response.ok) {
+            throw new Error("Failed to fetch trader statistics");
+        }
+        return response.json();
+    },
+
+    /**
+     * List the saved versions of a trade.
+     */
+    async getTradeVersions(tradeId: string, source: "pdf" | "email" = "pdf"): Promise<any> {
+        const response = await fetch(
+            `${API_BASE_URL}/versions/${encodeURIComponent(tradeId)}?source=${source}`
+        );
+        if (!response.ok) {
+            throw new Error("Failed to fetch trade versions");
+        }
+        return response.json();
+    },
+
+    /**
+     * Fetch a trade as saved in one version.
+     */
+    async getTradeVersion(tradeId: string, version: number, source: "pdf" | "email" = "pdf"): Promise<any> {
+        const response = await fetch(
+            `${API_BASE_URL}/versions/${encodeURIComponent(tradeId)}/${version}?source=${source}`
+        );
+        if (!response.ok) {
+            throw new Error("Failed to fetch trade version");
+        }
+        return response.json();
+    },
+
+    /**
+     * Diff two versions of a trade.
+     */
+    async diffTradeVersions(tradeId: string, from: number, to: number, source: "pdf" | "email" = "pdf"): Promise<any> {
+        const response = await fetch(
+            `${API_BASE_URL}/versions/${encodeURIComponent(tradeId)}/diff?from=${from}&to=${to}&source=${source}`
+        );
+        if (!response.ok) {
+            throw new Error("Failed to diff trade versions");
+        }
+        return response.json();
     }
 };
@@ -15,7 +15,7 @@ import {
 } from "lucide-react";
 import { cn } from "@/lib/utils";
 import { motion, AnimatePresence } from "framer-motion";
-import { useQuery } from "@tanstack/react-query";
+import { useInfiniteQuery } from "@tanstack/react-query";
 import { api } from "@/lib/api";
 
 const statusConfig = {
@@ -41,16 +41,22 @@ const statusConfig = {
   }
 };
 
+// Columns the table and DocumentViewer render (not the extracted text)
+const REGISTRY_FIELDS = ["id", "name", "size", "uploadDate", "status", "expectedTerms", "highlightedTerms"];
+
 function Alldocs() {
   const [selectedDocument, setSelectedDocument] = useState<any>(null);
   const [statusFilter, setStatusFilter] = useState('');
   const [searchQuery, setSearchQuery] = useState('');
 
-  const { data: documents = [], isLoading, refetch } = useQuery({
-    queryKey: ['termsheets'],
-    queryFn: () => api.getTermsheets(),
+  const { data, isLoading, fetchNextPage, hasNextPage, isFetchingNextPage } = useInfiniteQuery({
+    queryKey: ['termsheets', 'registry'],
+    queryFn: ({ pageParam }) => api.getTermsheetsPage({ fields: REGISTRY_FIELDS, cursor: pageParam }),
+    initialPageParam: null as string | null,
+    getNextPageParam: (lastPage) => lastPage.nextCursor,
     refetchInterval: 5000, // Poll every 5s to show processing updates
   });
+  const documents = data?.pages.flatMap((page) => page.items) ?? [];
 
   const filteredDocuments = documents
     .filter((doc: any) => (statusFilter ? doc.status === statusFilter : true))
@@ -158,6 +164,19 @@ function Alldocs() {
               ))}
             </AnimatePresence>
 
+            {hasNextPage && (
+              <div className="flex justify-center pt-4">
+                <button
+                  onClick={() => fetchNextPage()}
+                  disabled={isFetchingNextPage}
+                  className="flex items-center gap-3 px-6 py-3 rounded-2xl bg-white/5 border border-white/10 text-white/60 hover:text-white hover:bg-white/10 transition-all font-semibold text-xs uppercase tracking-widest disabled:opacity-50"
+                >
+                  {isFetchingNextPage && <Loader2 className="h-4 w-4 animate-spin" />}
+                  <span>Load more</span>
+                </button>
+              </div>
+            )}
+
             {!isLoading && filteredDocuments.length === 0 && (
               <div className="p-20 text-center rounded-[3rem] bg-white/[0.01] border border-dashed border-white/10">
                 <p className="text-white/20 font-medium uppercase tracking-widest text-xs">No matching artifacts found in registry</p>